@@ -0,0 +1,102 @@
+"""
+bench_async.py: Zátěžový test asynchronního API (task_manager_aio) při různém
+počtu souběžných klientů v porovnání se synchronním voláním.
+
+Každý klient opakovaně přidá úkol a načte první stránku úkolů. Vypisuje
+propustnost (operací za sekundu) pro synchronní cestu a pro asynchronní
+cestu s rostoucí souběžností.
+
+Spuštění (MySQL podle .env.test, případně bez serveru přes sqlite/memory):
+    python benchmarks/bench_async.py --concurrency 1 4 16 64 --operations 2000
+    python benchmarks/bench_async.py --backend sqlite
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from dotenv import load_dotenv
+
+from src.task_manager_aio import AsyncTaskManager
+from src.task_manager_db import (
+    add_task,
+    create_connection_pool,
+    get_tasks_page,
+    initialize_database,
+    pooled_connection,
+)
+
+
+def run_sync(pool, operations):
+    """Provede operace postupně jedním připojením; vrátí operace za sekundu."""
+
+    start = time.perf_counter()
+    with pooled_connection(pool) as connection:
+        for i in range(operations // 2):
+            add_task(connection, f"Sync {i}", "Popis", "pending")
+            get_tasks_page(connection, limit=20)
+    return operations / (time.perf_counter() - start)
+
+
+async def run_async(pool, operations, concurrency):
+    """Provede operace s daným počtem souběžných klientů; vrátí operace za sekundu."""
+
+    async def client(tasks, count):
+        for i in range(count):
+            await tasks.add_task(f"Async {i}", "Popis", "pending")
+            await tasks.get_tasks_page(limit=20)
+
+    per_client = max(operations // 2 // concurrency, 1)
+    async with AsyncTaskManager(pool) as tasks:
+        start = time.perf_counter()
+        await asyncio.gather(*(client(tasks, per_client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return per_client * concurrency * 2 / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--backend", choices=["mysql", "sqlite", "memory"], default="mysql")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--operations", type=int, default=2000)
+    parser.add_argument("--pool-size", type=int, default=16)
+    args = parser.parse_args()
+
+    temp_dir = None
+    if args.backend == "mysql":
+        load_dotenv(dotenv_path=os.path.join(ROOT, ".env.test"))
+        host, user = os.getenv("DB_HOST"), os.getenv("DB_USER")
+        password, db_name = os.getenv("DB_PASSWORD"), os.getenv("DB_NAME") + "_bench"
+    else:
+        host = user = password = None
+        temp_dir = tempfile.TemporaryDirectory()
+        db_name = os.path.join(temp_dir.name, "bench.db")
+
+    initialize_database(host, user, password, db_name, args.backend)
+    pool = create_connection_pool(
+        host, user, password, db_name, args.pool_size, "bench_async", args.backend
+    )
+    try:
+        print(f"{'mode':<8} {'clients':>8} {'ops/s':>10}")
+        print(f"{'sync':<8} {1:>8} {run_sync(pool, args.operations):>10.1f}")
+        for concurrency in args.concurrency:
+            ops = asyncio.run(run_async(pool, args.operations, concurrency))
+            print(f"{'async':<8} {concurrency:>8} {ops:>10.1f}")
+    finally:
+        if args.backend == "mysql":
+            with pooled_connection(pool) as connection:
+                cursor = connection.cursor()
+                cursor.execute(f"DROP DATABASE {db_name}")
+                cursor.close()
+        if temp_dir:
+            temp_dir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
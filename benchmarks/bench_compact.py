@@ -0,0 +1,140 @@
+"""
+bench_compact.py: Porovnání paměti a rychlosti get_tasks() se slovníky
+a s kompaktními záznamy Task (compact=True) na velké tabulce úkolů.
+
+Pro každý režim změří dobu načtení celého výpisu (nejlepší z --repeat běhů)
+a pomocí tracemalloc paměť, kterou výsledek zabírá, i špičku během načítání.
+
+Spuštění (konfigurace MySQL se bere ze souboru .env.test, používá se samostatná
+databáze s příponou _bench, která se na konci smaže; backendy sqlite a memory
+běží bez serveru v dočasném souboru, resp. v paměti):
+    python benchmarks/bench_compact.py --rows 1000000
+    python benchmarks/bench_compact.py --backend sqlite --rows 1000000 --output compact.json
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.task_manager_db import (
+    add_tasks,
+    close_connection,
+    connect_to_database,
+    count_tasks_by_state,
+    get_tasks,
+    initialize_database,
+)
+
+STATES = ("pending", "in_progress", "completed")
+
+
+def seed(connection, rows):
+    """Doplní tabulku úkolů na zadaný počet řádků."""
+
+    missing = rows - sum(count_tasks_by_state(connection).values())
+    add_tasks(
+        connection,
+        (
+            (f"Úkol {i}", f"Popis úkolu {i}", STATES[i % len(STATES)])
+            for i in range(max(missing, 0))
+        ),
+        chunk_size=5000,
+    )
+
+
+def measure(connection, compact, repeat):
+    """Změří jeden režim get_tasks(): dobu načtení a paměť výsledku."""
+
+    seconds = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        tasks = get_tasks(connection, compact=compact)
+        seconds.append(time.perf_counter() - start)
+        count = len(tasks)
+        del tasks
+
+    gc.collect()
+    tracemalloc.start()
+    tasks = get_tasks(connection, compact=compact)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del tasks
+
+    best = min(seconds)
+    return {
+        "rows": count,
+        "seconds": round(best, 3),
+        "rows_per_s": round(count / best) if best else None,
+        "retained_mb": round(retained / 2**20, 1),
+        "peak_mb": round(peak / 2**20, 1),
+        "bytes_per_row": round(retained / count) if count else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--backend", choices=["mysql", "sqlite", "memory"], default="mysql")
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="soubor pro výsledky JSON (výchozí stdout)")
+    args = parser.parse_args()
+
+    temp_dir = None
+    if args.backend == "mysql":
+        from dotenv import load_dotenv
+
+        load_dotenv(dotenv_path=os.path.join(ROOT, ".env.test"))
+        host, user = os.getenv("DB_HOST"), os.getenv("DB_USER")
+        password = os.getenv("DB_PASSWORD")
+        db_name = os.getenv("DB_NAME") + "_bench"
+    else:
+        host = user = password = None
+        temp_dir = tempfile.TemporaryDirectory()
+        db_name = os.path.join(temp_dir.name, "bench.db")
+
+    initialize_database(host, user, password, db_name, args.backend)
+    connection = connect_to_database(host, user, password, db_name, args.backend)
+    try:
+        seed(connection, args.rows)
+        results = {
+            "dict": measure(connection, False, args.repeat),
+            "compact": measure(connection, True, args.repeat),
+        }
+    finally:
+        if args.backend == "mysql":
+            cursor = connection.cursor()
+            cursor.execute(f"DROP DATABASE {db_name}")
+            cursor.close()
+        close_connection(connection)
+        if temp_dir:
+            temp_dir.cleanup()
+
+    print(
+        f"{'mode':<8} {'rows':>9} {'s':>8} {'rows/s':>10} {'MB':>8} {'peak MB':>8} {'B/row':>6}",
+        file=sys.stderr,
+    )
+    for mode, stats in results.items():
+        print(
+            f"{mode:<8} {stats['rows']:>9} {stats['seconds']:>8.3f} {stats['rows_per_s']:>10} "
+            f"{stats['retained_mb']:>8.1f} {stats['peak_mb']:>8.1f} {stats['bytes_per_row']:>6}",
+            file=sys.stderr,
+        )
+    output = json.dumps({"backend": args.backend, "results": results}, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
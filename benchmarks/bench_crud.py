@@ -0,0 +1,215 @@
+"""
+bench_crud.py: Benchmark CRUD funkcí modulu task_manager_db pro různé
+velikosti tabulky úkolů.
+
+Pro každou velikost tabulky změří add_task(), get_tasks(), update_task_state()
+a delete_task() - percentily latence, propustnost a špičkovou paměť procesu
+(RSS). Výsledky zapíše jako JSON, aby je šlo porovnat mezi commity.
+
+Spuštění (konfigurace MySQL se bere ze souboru .env.test, používá se samostatná
+databáze s příponou _bench, která se na konci smaže; backendy sqlite a memory
+běží bez serveru v dočasném souboru, resp. v paměti):
+    python benchmarks/bench_crud.py --sizes 1000 10000 --output vysledky.json
+    python benchmarks/bench_crud.py --backend sqlite --sizes 1000 10000 100000 1000000
+    python benchmarks/bench_crud.py --compare stare.json nove.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from dotenv import load_dotenv
+
+from src.task_manager_db import (
+    add_task,
+    add_tasks,
+    close_connection,
+    connect_to_database,
+    count_tasks_by_state,
+    delete_task,
+    get_tasks,
+    initialize_database,
+    update_task_state,
+)
+
+
+def peak_rss_mb():
+    """Vrátí dosavadní špičkovou paměť procesu v MB."""
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux vrací kilobajty, macOS bajty
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def summarize(samples):
+    """Spočítá percentily latence (ms) a propustnost ze vzorků v sekundách."""
+
+    ms = sorted(sample * 1000 for sample in samples)
+    if len(ms) > 1:
+        quantiles = statistics.quantiles(ms, n=100, method="inclusive")
+    else:
+        quantiles = ms * 99
+    return {
+        "calls": len(ms),
+        "p50_ms": round(quantiles[49], 4),
+        "p95_ms": round(quantiles[94], 4),
+        "p99_ms": round(quantiles[98], 4),
+        "max_ms": round(ms[-1], 4),
+        "ops_per_s": round(len(ms) / sum(samples), 1),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+
+def timed(func, arguments):
+    """Zavolá func pro každou položku arguments a vrátí seznam dob trvání."""
+
+    samples = []
+    for argument in arguments:
+        start = time.perf_counter()
+        func(argument)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def seed(connection, size):
+    """Doplní tabulku úkolů na zadaný počet řádků."""
+
+    missing = size - sum(count_tasks_by_state(connection).values())
+    add_tasks(
+        connection,
+        ((f"Úkol {i}", f"Popis úkolu {i}", "pending") for i in range(max(missing, 0))),
+        chunk_size=5000,
+    )
+
+
+def latest_ids(connection, count):
+    """Vrátí ID posledních count úkolů."""
+
+    return [task["id"] for task in get_tasks(connection, order="desc", limit=count)]
+
+
+def bench_size(connection, size, repeat, list_repeat):
+    """Změří všechny operace pro jednu velikost tabulky."""
+
+    seed(connection, size)
+    results = {}
+    results["add_task"] = summarize(
+        timed(lambda i: add_task(connection, f"Nový {i}", "Popis", "pending"), range(repeat))
+    )
+    results["get_tasks"] = summarize(
+        timed(lambda _: get_tasks(connection), range(list_repeat))
+    )
+    ids = latest_ids(connection, repeat)
+    results["update_task_state"] = summarize(
+        timed(lambda task_id: update_task_state(connection, task_id, "completed"), ids)
+    )
+    # smazáním nově přidaných úkolů se tabulka vrátí na původní velikost
+    results["delete_task"] = summarize(
+        timed(lambda task_id: delete_task(connection, task_id), ids)
+    )
+    return results
+
+
+def git_commit():
+    """Vrátí zkrácený hash aktuálního commitu, pokud je k dispozici."""
+
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(old_path, new_path):
+    """Vypíše poměr p50 latencí mezi dvěma výsledky (nový / starý)."""
+
+    with open(old_path, encoding="utf-8") as file:
+        old = json.load(file)
+    with open(new_path, encoding="utf-8") as file:
+        new = json.load(file)
+
+    print(f"{'rows':>10} {'operation':<18} {'old p50':>10} {'new p50':>10} {'ratio':>7}")
+    for size, operations in new["results"].items():
+        for operation, stats in operations.items():
+            before = old["results"].get(size, {}).get(operation)
+            if before:
+                ratio = stats["p50_ms"] / before["p50_ms"] if before["p50_ms"] else 0
+                print(
+                    f"{size:>10} {operation:<18} {before['p50_ms']:>10.3f} "
+                    f"{stats['p50_ms']:>10.3f} {ratio:>7.2f}"
+                )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--backend", choices=["mysql", "sqlite", "memory"], default="mysql")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--list-repeat", type=int, default=5)
+    parser.add_argument("--output", help="soubor pro výsledky JSON (výchozí stdout)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"))
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    temp_dir = None
+    if args.backend == "mysql":
+        load_dotenv(dotenv_path=os.path.join(ROOT, ".env.test"))
+        host, user = os.getenv("DB_HOST"), os.getenv("DB_USER")
+        password = os.getenv("DB_PASSWORD")
+        db_name = os.getenv("DB_NAME") + "_bench"
+    else:
+        host = user = password = None
+        temp_dir = tempfile.TemporaryDirectory()
+        db_name = os.path.join(temp_dir.name, "bench.db")
+
+    initialize_database(host, user, password, db_name, args.backend)
+    connection = connect_to_database(host, user, password, db_name, args.backend)
+    try:
+        results = {}
+        for size in sorted(args.sizes):
+            results[str(size)] = bench_size(connection, size, args.repeat, args.list_repeat)
+            print(f"rows={size} hotovo", file=sys.stderr)
+    finally:
+        if args.backend == "mysql":
+            cursor = connection.cursor()
+            cursor.execute(f"DROP DATABASE {db_name}")
+            cursor.close()
+        close_connection(connection)
+        if temp_dir:
+            temp_dir.cleanup()
+
+    report = {
+        "backend": args.backend,
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
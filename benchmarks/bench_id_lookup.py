@@ -0,0 +1,95 @@
+"""
+bench_id_lookup.py: Měření latence update_task_state() a delete_task()
+v závislosti na velikosti tabulky úkolů.
+
+Kontrola ID jde přes primární klíč, takže latence by měla zůstat
+přibližně konstantní i při rostoucím počtu řádků.
+
+Spuštění (konfigurace se bere ze souboru .env.test):
+    python benchmarks/bench_id_lookup.py --sizes 1000 10000 100000
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+
+from src.task_manager_db import (
+    close_connection,
+    connect_to_database,
+    delete_task,
+    initialize_database,
+    update_task_state,
+)
+
+
+def seed_tasks(connection, count):
+    """Doplní tabulku úkolů na zadaný počet řádků."""
+
+    cursor = connection.cursor()
+    cursor.execute("SELECT COUNT(*) FROM tasks")
+    missing = count - cursor.fetchone()[0]
+    rows = [(f"Úkol {i}", f"Popis {i}", "pending") for i in range(max(missing, 0))]
+    for start in range(0, len(rows), 5000):
+        cursor.executemany(
+            "INSERT INTO tasks (name, description, state) VALUES (%s, %s, %s)",
+            rows[start : start + 5000],
+        )
+        connection.commit()
+    cursor.close()
+
+
+def measure(func, repeat):
+    """Vrátí medián latence volání func v milisekundách."""
+
+    samples = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        func(i)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    load_dotenv(dotenv_path=".env.test")
+    host, user = os.getenv("DB_HOST"), os.getenv("DB_USER")
+    password, db_name = os.getenv("DB_PASSWORD"), os.getenv("DB_NAME")
+
+    initialize_database(host, user, password, db_name)
+    connection = connect_to_database(host, user, password, db_name)
+    try:
+        print(f"{'rows':>10} {'update ms':>10} {'delete ms':>10}")
+        for size in sorted(args.sizes):
+            seed_tasks(connection, size)
+            cursor = connection.cursor()
+            cursor.execute("SELECT id FROM tasks ORDER BY id LIMIT %s", (args.repeat,))
+            ids = [row[0] for row in cursor.fetchall()]
+            cursor.close()
+
+            update_ms = measure(
+                lambda i: update_task_state(connection, ids[i % len(ids)], "completed"),
+                args.repeat,
+            )
+            delete_ms = measure(
+                lambda i: delete_task(connection, ids[i % len(ids)]), len(ids)
+            )
+            print(f"{size:>10} {update_ms:>10.3f} {delete_ms:>10.3f}")
+    finally:
+        cursor = connection.cursor()
+        cursor.execute(f"DROP DATABASE {db_name}")
+        cursor.close()
+        close_connection(connection)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+bench_prepared.py: Mikrobenchmark připravených dotazů (server-side prepared
+statements) v add_task() a update_task_state().
+
+Porovná latenci jednoho volání pro opakované vkládání a změny stavu:
+- "text"     - nový kurzor pro každé volání, server dotaz pokaždé parsuje
+               (chování před zavedením cache připravených dotazů),
+- "prepared" - funkce modulu task_manager_db, které dotaz připraví jednou
+               pro připojení a dál posílají jen parametry.
+
+Spuštění (konfigurace se bere ze souboru .env.test, používá se samostatná
+databáze s příponou _bench, která se na konci smaže):
+    python benchmarks/bench_prepared.py --calls 10000
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from dotenv import load_dotenv
+
+from src.task_manager_db import (
+    add_task,
+    close_connection,
+    connect_to_database,
+    get_tasks,
+    initialize_database,
+    update_task_state,
+)
+
+
+def text_insert(connection, i):
+    """Vloží úkol s novým kurzorem a bez připraveného dotazu."""
+
+    cursor = connection.cursor()
+    try:
+        cursor.execute(
+            "INSERT INTO tasks (name, description, state) VALUES (%s, %s, %s)",
+            (f"Úkol {i}", "Popis", "pending"),
+        )
+        connection.commit()
+    finally:
+        cursor.close()
+
+
+def text_update(connection, task_id):
+    """Změní stav úkolu s novým kurzorem a bez připraveného dotazu."""
+
+    cursor = connection.cursor()
+    try:
+        cursor.execute(
+            "UPDATE tasks SET state = %s WHERE id = %s", ("completed", task_id)
+        )
+        connection.commit()
+    finally:
+        cursor.close()
+
+
+def timed(func, arguments):
+    """Zavolá func pro každou položku arguments a vrátí doby trvání v µs."""
+
+    samples = []
+    for argument in arguments:
+        start = time.perf_counter()
+        func(argument)
+        samples.append((time.perf_counter() - start) * 1_000_000)
+    return samples
+
+
+def report(operation, mode, samples):
+    """Vypíše medián, průměr a 99. percentil latence."""
+
+    p99 = statistics.quantiles(samples, n=100)[98]
+    print(
+        f"{operation:<8} {mode:<9} {statistics.median(samples):>10.1f} "
+        f"{statistics.fmean(samples):>10.1f} {p99:>10.1f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=10000)
+    args = parser.parse_args()
+
+    load_dotenv(dotenv_path=os.path.join(ROOT, ".env.test"))
+    host, user = os.getenv("DB_HOST"), os.getenv("DB_USER")
+    password, db_name = os.getenv("DB_PASSWORD"), os.getenv("DB_NAME") + "_bench"
+
+    initialize_database(host, user, password, db_name)
+    connection = connect_to_database(host, user, password, db_name)
+    try:
+        print(f"{'op':<8} {'mode':<9} {'p50 µs':>10} {'mean µs':>10} {'p99 µs':>10}")
+        calls = range(args.calls)
+        report("insert", "text", timed(lambda i: text_insert(connection, i), calls))
+        report(
+            "insert",
+            "prepared",
+            timed(lambda i: add_task(connection, f"Úkol {i}", "Popis", "pending"), calls),
+        )
+
+        ids = [task["id"] for task in get_tasks(connection, order="desc", limit=args.calls)]
+        report("update", "text", timed(lambda task_id: text_update(connection, task_id), ids))
+        report(
+            "update",
+            "prepared",
+            timed(lambda task_id: update_task_state(connection, task_id, "pending"), ids),
+        )
+    finally:
+        cursor = connection.cursor()
+        cursor.execute(f"DROP DATABASE {db_name}")
+        cursor.close()
+        close_connection(connection)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,352 @@
+"""
+load_test.py: Zátěžový test modulu task_manager_db s více souběžnými uživateli.
+
+Spustí zadaný počet procesů a v každém zadaný počet vláken (uživatelů), která
+po stanovenou dobu provádějí náhodnou směs operací add_task, get_tasks,
+update_task_state a delete_task nad jednou databází. Každý proces má vlastní
+pool připojení a každá operace si připojení zapůjčí přes pooled_connection()
+stejně jako aplikace. Vypisuje propustnost, latenci p50/p99 podle operace,
+počty chyb (zvlášť uváznutí a vypršení čekání na zámek) a využití připojení
+(doba čekání na volné připojení, nejvyšší počet současně zapůjčených).
+
+Změny a mazání míří na náhodná ID od 1 po nejvyšší známé ID, uživatelé se
+proto navzájem přetahují o stejné řádky; úkol smazaný jiným uživatelem se
+počítá jako "not_found", ne jako selhání databáze.
+
+Spuštění (MySQL podle .env.test v samostatné databázi s příponou _load, která
+se na konci smaže; sqlite v dočasném souboru; memory jen vlákna v jednom
+procesu):
+    python benchmarks/load_test.py --processes 4 --threads 8 --duration 30
+    python benchmarks/load_test.py --backend sqlite --mix add=20,get=60,update=15,delete=5
+    python benchmarks/load_test.py --pool-size 2 --threads 16 --output zatez.json
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from dotenv import load_dotenv
+
+from src.task_manager_db import (
+    TASK_STATES,
+    add_task,
+    add_tasks,
+    close_connection,
+    connect_to_database,
+    create_connection_pool,
+    delete_task,
+    get_tasks,
+    initialize_database,
+    pooled_connection,
+    update_task_state,
+)
+
+OPERATIONS = ("add", "get", "update", "delete")
+
+# Chyby souběhu podle kódu chyby MySQL.
+LOCK_ERRNOS = {1213: "deadlock", 1205: "lock_wait_timeout"}
+
+
+def parse_mix(text):
+    """Převede zápis směsi operací (např. "add=25,get=50") na slovník vah."""
+
+    mix = dict.fromkeys(OPERATIONS, 0)
+    for part in text.split(","):
+        name, _, weight = (item.strip() for item in part.partition("="))
+        if name not in mix or not weight.isdigit():
+            raise argparse.ArgumentTypeError(f"invalid mix item: {part!r}")
+        mix[name] = int(weight)
+    if not any(mix.values()):
+        raise argparse.ArgumentTypeError("mix has no operations")
+    return mix
+
+
+def classify(error):
+    """Zařadí výjimku operace do skupiny pro souhrn chyb."""
+
+    if getattr(error, "errno", None) in LOCK_ERRNOS:
+        return LOCK_ERRNOS[error.errno]
+    if "database is locked" in str(error):  # SQLite po vypršení busy_timeout
+        return "lock_wait_timeout"
+    if "pool exhausted" in str(error):
+        return "pool_exhausted"
+    if str(error) == "Invalid task ID.":
+        return "not_found"
+    return type(error).__name__
+
+
+class ProcessStats:
+    """Výsledky uživatelů jednoho procesu; metody volají souběžně vlákna."""
+
+    def __init__(self, max_id):
+        self.latencies = {operation: [] for operation in OPERATIONS}
+        self.errors = Counter()  # (operace, druh chyby) -> počet
+        self.pool_waits = []
+        self.in_use = 0
+        self.peak_in_use = 0
+        self.max_id = max_id
+        self._lock = threading.Lock()
+
+    def acquired(self, wait):
+        """Zaznamená zapůjčení připojení a dobu čekání na něj."""
+
+        with self._lock:
+            self.pool_waits.append(wait)
+            self.in_use += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+
+    def released(self):
+        """Zaznamená vrácení připojení do poolu."""
+
+        with self._lock:
+            self.in_use -= 1
+
+    def task_added(self, task_id):
+        """Rozšíří rozsah ID, na která míří změny a mazání."""
+
+        with self._lock:
+            self.max_id = max(self.max_id, task_id)
+
+    def result(self):
+        """Vrátí výsledky jako slovník, který lze předat mezi procesy."""
+
+        return {
+            "latencies": self.latencies,
+            "errors": [[operation, kind, n] for (operation, kind), n in self.errors.items()],
+            "pool_waits": self.pool_waits,
+            "peak_in_use": self.peak_in_use,
+        }
+
+
+def run_operation(operation, connection, rng, stats, page_size):
+    """Provede jednu operaci s náhodnými parametry."""
+
+    if operation == "add":
+        task_id = add_task(connection, f"Zátěž {rng.random():.6f}", "Popis", "pending")
+        stats.task_added(task_id)
+    elif operation == "get":
+        get_tasks(connection, state=rng.choice(TASK_STATES), limit=page_size)
+    elif operation == "update":
+        update_task_state(connection, rng.randint(1, stats.max_id), rng.choice(TASK_STATES))
+    else:
+        delete_task(connection, rng.randint(1, stats.max_id))
+
+
+def run_user(pool, config, deadline, seed, stats):
+    """Jeden uživatel: do vypršení času opakuje náhodné operace ze směsi."""
+
+    rng = random.Random(seed)
+    operations, weights = zip(*config["mix"].items())
+    while time.perf_counter() < deadline:
+        operation = rng.choices(operations, weights)[0]
+        requested = time.perf_counter()
+        try:
+            with pooled_connection(pool, timeout=config["pool_timeout"]) as connection:
+                start = time.perf_counter()
+                stats.acquired(start - requested)
+                try:
+                    run_operation(operation, connection, rng, stats, config["page_size"])
+                finally:
+                    stats.released()
+        except Exception as e:  # zátěžový test počítá všechny chyby
+            stats.errors[operation, classify(e)] += 1
+            continue
+        stats.latencies[operation].append(time.perf_counter() - start)
+
+
+def run_process(index, config):
+    """Spustí uživatele jednoho procesu a vrátí jejich výsledky.
+    Args:
+        index (int): Pořadí procesu (název poolu, semínko generátoru).
+        config (dict): Nastavení testu (viz main).
+    Returns:
+        dict: Výsledky procesu (viz ProcessStats.result).
+    """
+
+    pool = create_connection_pool(
+        *config["database"],
+        pool_size=config["pool_size"],
+        pool_name=f"load_test_{index}",
+        backend=config["backend"],
+    )
+    stats = ProcessStats(config["seed_tasks"])
+    deadline = time.perf_counter() + config["duration"]
+    threads = [
+        threading.Thread(
+            target=run_user, args=(pool, config, deadline, index * 1000 + n, stats)
+        )
+        for n in range(config["threads"])
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return stats.result()
+
+
+def percentile(samples, q):
+    """Vrátí percentil q (0-100) vzorků v milisekundách, 0 bez vzorků."""
+
+    if len(samples) < 2:
+        return samples[0] * 1000 if samples else 0.0
+    return statistics.quantiles(samples, n=100, method="inclusive")[q - 1] * 1000
+
+
+def summarize(results, elapsed):
+    """Sloučí výsledky procesů do souhrnu testu."""
+
+    errors = Counter()
+    for result in results:
+        for operation, kind, count in result["errors"]:
+            errors[operation, kind] += count
+    operations = {}
+    for operation in OPERATIONS:
+        samples = [s for result in results for s in result["latencies"][operation]]
+        failed = {"errors": 0, "not_found": 0}
+        for (name, kind), count in errors.items():
+            if name == operation:
+                failed["not_found" if kind == "not_found" else "errors"] += count
+        if not samples and not any(failed.values()):
+            continue
+        operations[operation] = {
+            "calls": len(samples),
+            "ops_per_s": round(len(samples) / elapsed, 1),
+            "p50_ms": round(percentile(samples, 50), 3),
+            "p99_ms": round(percentile(samples, 99), 3),
+            "errors": failed["errors"],
+            "not_found": failed["not_found"],
+        }
+    waits = [wait for result in results for wait in result["pool_waits"]]
+    total_calls = sum(item["calls"] for item in operations.values())
+    return {
+        "elapsed_s": round(elapsed, 2),
+        "ops_per_s": round(total_calls / elapsed, 1),
+        "operations": operations,
+        "errors": {f"{operation}/{kind}": count for (operation, kind), count in errors.items()},
+        "deadlocks": sum(count for (_, kind), count in errors.items() if kind == "deadlock"),
+        "connections": {
+            "peak_in_use": sum(result["peak_in_use"] for result in results),
+            "wait_p50_ms": round(percentile(waits, 50), 3),
+            "wait_p99_ms": round(percentile(waits, 99), 3),
+            "pool_exhausted": sum(
+                count for (_, kind), count in errors.items() if kind == "pool_exhausted"
+            ),
+        },
+    }
+
+
+def print_summary(summary, config):
+    """Vypíše souhrn testu jako tabulku."""
+
+    print(
+        f"backend={config['backend']} processes={config['processes']} "
+        f"threads={config['threads']} pool_size={config['pool_size']} "
+        f"duration={summary['elapsed_s']} s"
+    )
+    print(
+        f"{'operation':<10} {'calls':>9} {'ops/s':>10} {'p50 ms':>9} {'p99 ms':>9} "
+        f"{'errors':>7} {'missing':>8}"
+    )
+    for operation, item in summary["operations"].items():
+        print(
+            f"{operation:<10} {item['calls']:>9} {item['ops_per_s']:>10.1f} "
+            f"{item['p50_ms']:>9.3f} {item['p99_ms']:>9.3f} {item['errors']:>7} "
+            f"{item['not_found']:>8}"
+        )
+    print(f"{'total':<10} {'':>9} {summary['ops_per_s']:>10.1f}")
+    for name, count in sorted(summary["errors"].items()):
+        print(f"error {name}: {count}")
+    connections = summary["connections"]
+    print(
+        f"connections: {config['processes']} x {config['pool_size']}, "
+        f"peak in use {connections['peak_in_use']}, "
+        f"wait p50 {connections['wait_p50_ms']:.3f} ms, p99 {connections['wait_p99_ms']:.3f} ms, "
+        f"exhausted {connections['pool_exhausted']}, deadlocks {summary['deadlocks']}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--backend", choices=["mysql", "sqlite", "memory"], default="mysql")
+    parser.add_argument("--processes", type=int, default=1)
+    parser.add_argument("--threads", type=int, default=8, help="uživatelů v jednom procesu")
+    parser.add_argument("--pool-size", type=int, default=8, help="připojení v poolu procesu")
+    parser.add_argument("--pool-timeout", type=float, default=5.0)
+    parser.add_argument("--duration", type=float, default=10.0, help="délka testu v sekundách")
+    parser.add_argument(
+        "--mix", type=parse_mix, default=parse_mix("add=25,get=50,update=20,delete=5")
+    )
+    parser.add_argument("--seed-tasks", type=int, default=1000, help="úkolů před začátkem testu")
+    parser.add_argument("--page-size", type=int, default=20, help="limit pro get_tasks")
+    parser.add_argument("--output", help="soubor JSON se souhrnem")
+    args = parser.parse_args()
+    if args.backend == "memory" and args.processes > 1:
+        parser.error("memory backend cannot be shared between processes")
+
+    temp_dir = None
+    if args.backend == "mysql":
+        load_dotenv(dotenv_path=os.path.join(ROOT, ".env.test"))
+        host, user = os.getenv("DB_HOST"), os.getenv("DB_USER")
+        password, db_name = os.getenv("DB_PASSWORD"), os.getenv("DB_NAME") + "_load"
+    else:
+        host = user = password = None
+        temp_dir = tempfile.TemporaryDirectory()
+        db_name = os.path.join(temp_dir.name, "load.db")
+
+    config = {
+        "database": (host, user, password, db_name),
+        "backend": args.backend,
+        "processes": args.processes,
+        "threads": args.threads,
+        "pool_size": args.pool_size,
+        "pool_timeout": args.pool_timeout,
+        "duration": args.duration,
+        "mix": args.mix,
+        "seed_tasks": max(args.seed_tasks, 1),
+        "page_size": args.page_size,
+    }
+    initialize_database(host, user, password, db_name, args.backend)
+    connection = connect_to_database(host, user, password, db_name, args.backend)
+    try:
+        add_tasks(
+            connection,
+            ((f"Výchozí {i}", "Popis", "pending") for i in range(config["seed_tasks"])),
+        )
+
+        start = time.perf_counter()
+        if args.processes == 1:
+            # jeden proces běží přímo, memory backend tak vidí připravená data
+            results = [run_process(0, config)]
+        else:
+            with ProcessPoolExecutor(args.processes) as executor:
+                futures = [executor.submit(run_process, i, config) for i in range(args.processes)]
+                results = [future.result() for future in futures]
+        summary = summarize(results, time.perf_counter() - start)
+    finally:
+        if args.backend == "mysql":
+            cursor = connection.cursor()
+            cursor.execute(f"DROP DATABASE {db_name}")
+            cursor.close()
+        close_connection(connection)
+        if temp_dir:
+            temp_dir.cleanup()
+
+    print_summary(summary, config)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump({"config": {**config, "database": None}, **summary}, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
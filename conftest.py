@@ -4,6 +4,8 @@ import pytest
 from dotenv import load_dotenv
 import os
 
+from src.task_manager_db import create_connection_pool, initialize_database
+
 
 def connect_to_db(host, user, password, database):
     try:
@@ -15,35 +17,8 @@ def connect_to_db(host, user, password, database):
 
 
 def init_database(host, user, password, db_name):
-    try:
-        connection = mysql.connector.connect(
-            host=host,
-            user=user,
-            password=password,
-        )
-
-        cursor = connection.cursor()
-        cursor.execute(f"CREATE DATABASE IF NOT EXISTS {db_name}")
-        connection.database = db_name
-        cursor.execute(
-            f"""
-            CREATE TABLE IF NOT EXISTS tasks (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                name VARCHAR(100) NOT NULL,
-                description VARCHAR(255) NOT NULL,
-                state ENUM('pending', 'in_progress', 'completed') NOT NULL DEFAULT 'pending',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """
-        )
-
-        connection.commit()
-        print(f"Database '{db_name}' and table 'tasks' initialized.")
-    except Error as e:
-        raise RuntimeError(f"Database initialization failed: {e}")
-    finally:
-        if connection:
-            connection.close()
+    # schéma testovací DB vytváříme stejnými migracemi jako aplikace
+    initialize_database(host, user, password, db_name)
 
 
 def clear_database(conn, db_name):
@@ -79,3 +54,16 @@ def conn():
     clear_database(conn, DB_NAME)
     print("\n☘️ FIXTURE - CLOSE")
     conn.close()
+
+
+@pytest.fixture
+def pool(conn):
+    # pool nad stejnou testovací DB, kterou vytvořila fixture conn
+    return create_connection_pool(
+        os.getenv("DB_HOST"),
+        os.getenv("DB_USER"),
+        os.getenv("DB_PASSWORD"),
+        os.getenv("DB_NAME"),
+        pool_size=1,
+        pool_name="task_manager_test",
+    )
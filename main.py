@@ -6,11 +6,18 @@ email: jan.blaha@bcas.cz
 """
 
 from src.task_manager_db import *
-from dotenv import load_dotenv
+from src.task_io import import_tasks
+from contextlib import contextmanager
 import os
+import sys
+import time
+
+VELIKOST_STRANKY = 20  # počet úkolů zobrazených na jedné stránce
 
 
 def get_db_config():
+    from dotenv import load_dotenv  # načítá se až pro interaktivní aplikaci
+
     load_dotenv()
 
     DB_USER = os.getenv("DB_USER")
@@ -21,6 +28,38 @@ def get_db_config():
     return DB_USER, DB_PASSWORD, DB_HOST, DB_NAME
 
 
+def get_pool_config():
+    """Načte konfiguraci poolu připojení ze stejného souboru .env.
+    Returns:
+        dict: Parametry pro create_connection_pool().
+    """
+
+    DB_USER, DB_PASSWORD, DB_HOST, DB_NAME = get_db_config()
+
+    return {
+        "host": DB_HOST,
+        "user": DB_USER,
+        "password": DB_PASSWORD,
+        "database": DB_NAME,
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "5")),
+        "backend": get_db_backend(),
+        "connect_timeout": int(os.getenv("DB_CONNECT_TIMEOUT", CONNECT_TIMEOUT)),
+        "read_timeout": int(os.getenv("DB_READ_TIMEOUT", READ_TIMEOUT)),
+    }
+
+
+def get_db_backend():
+    """Načte typ úložiště (mysql, sqlite, memory) z klíče DB_BACKEND v .env.
+    Returns:
+        str: Typ úložiště, výchozí je 'mysql'.
+    """
+
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    return os.getenv("DB_BACKEND", "mysql").lower()
+
+
 def vrat_cislo(prompt: str, min_hodnota: int, max_hodnota: int) -> int:
     """Vrátí platné celé číslo zadané uživatelem v daném rozsahu.
     Args:
@@ -42,6 +81,21 @@ def vrat_cislo(prompt: str, min_hodnota: int, max_hodnota: int) -> int:
             print("Neplatný vstup. Zadejte prosím celé číslo.")
 
 
+def vybrat_vlastnika() -> str:
+    """Určí vlastníka (uživatele nebo projekt), jehož úkoly aplikace spravuje.
+    Vlastník se bere z klíče TASK_OWNER v .env, jinak se na něj program zeptá.
+    Returns:
+        str: Vlastník úkolů, prázdný text pro společný seznam.
+    """
+
+    vlastnik = os.getenv("TASK_OWNER")
+    while vlastnik is None or len(vlastnik) > 50:
+        if vlastnik is not None:
+            print("Název je příliš dlouhý, zadejte nejvýše 50 znaků.")
+        vlastnik = input("Zadejte uživatele nebo projekt (Enter pro společný seznam): ").strip()
+    return vlastnik
+
+
 def stav_map(stav: str) -> str:
     """Převede stav úkolu (pending, in_progress, completed) na český výraz.
     Args:
@@ -53,21 +107,31 @@ def stav_map(stav: str) -> str:
     return mapping.get(stav, "neznámý stav")
 
 
-def hlavni_menu():
-    """Zobrazí hlavní menu aplikace."""
+def hlavni_menu(connection=None, vlastnik: str | None = None):
+    """Zobrazí hlavní menu aplikace.
+    Args:
+        connection: Připojení k databázi pro souhrn počtu úkolů podle stavu.
+        vlastnik (str): Vlastník úkolů, None pro všechny úkoly.
+    """
 
-    print("\nSprávce úkolů - Hlavní menu")
+    print("\nSprávce úkolů - Hlavní menu" + (f" ({vlastnik})" if vlastnik else ""))
+    if connection:
+        pocty = count_tasks_by_state(connection, vlastnik)
+        print(", ".join(f"{pocet} {stav_map(stav)}" for stav, pocet in pocty.items()))
     print("1. Přidat nový úkol")
     print("2. Zobrazit úkoly")
     print("3. Aktualizovat úkol")
     print("4. Odstranit úkol")
-    print("5. Ukončit program")
+    print("5. Importovat úkoly ze souboru")
+    print("6. Vyhledat úkoly")
+    print("7. Ukončit program")
 
 
-def pridat_ukol(connection):
+def pridat_ukol(connection, vlastnik: str | None = None):
     """Přidá nový úkol do seznamu úkolů.
     Args:
         connection: Připojení k databázi.
+        vlastnik (str): Vlastník nového úkolu, None pro společný seznam.
     Returns:
         None
     """
@@ -84,85 +148,351 @@ def pridat_ukol(connection):
         print("Popis úkolu je příliš dlouhý. Bude zkrácen na maximálně 255 znaků.")
         popis_ukolu = popis_ukolu[:255]
 
-    add_task(connection, nazev_ukolu, popis_ukolu, "pending")
+    add_task(connection, nazev_ukolu, popis_ukolu, "pending", vlastnik)
 
     print(f"Úkol '{nazev_ukolu}' byl přidán.")
 
 
-def zobrazit_ukoly(connection, caption: str = "\nSeznam úkolů:"):
-    """Zobrazí všechny úkoly v seznamu úkolů.
+def zobrazit_ukoly(
+    connection,
+    caption: str = "\nSeznam úkolů:",
+    vyber: str | None = None,
+    stav: str | None = None,
+    vice: bool = False,
+    vlastnik: str | None = None,
+):
+    """Zobrazí úkoly po stránkách a umožní mezi stránkami listovat.
+    Stránky se načítají stránkováním podle klíče (get_tasks_page), takže
+    se nikdy nenačítá celá tabulka úkolů.
     Args:
         connection: Připojení k databázi.
+        caption (str): Nadpis seznamu.
+        vyber (str): Výzva pro výběr úkolu číslem, None pro pouhé zobrazení.
+        stav (str): Zobrazí jen úkoly v daném stavu, None pro všechny.
+        vice (bool): Povolí výběr více úkolů zápisem typu 1,4,7-12
+            (i z různých zobrazených stránek).
+        vlastnik (str): Zobrazí jen úkoly daného vlastníka, None pro všechny.
     Returns:
-        dict: Seznam úkolů.
+        dict: Vybraný úkol (při vice=True seznam úkolů), nebo None, pokud
+            uživatel nic nevybral.
     """
 
-    tasks = get_tasks(connection)
-    print(caption)
-    if not tasks:
-        print("Žádné úkoly k zobrazení.")
-
-    for i, task in enumerate(tasks, 1):
-        print(
-            f"{i}. {task['name']} - {task['description']} ({stav_map(task['state'])}) z {task['created_at']}"
+    zacatky = [(None, None)]  # klíče, za kterými začínají navštívené stránky
+    zobrazene = {}  # čísla dosud zobrazených úkolů pro výběr více úkolů
+    while True:
+        after_created_at, after_id = zacatky[-1]
+        tasks = get_tasks_page(
+            connection, after_created_at, after_id, VELIKOST_STRANKY + 1, stav, vlastnik
         )
-    return tasks
+        dalsi_stranka = len(tasks) > VELIKOST_STRANKY
+        tasks = tasks[:VELIKOST_STRANKY]
+
+        print(caption)
+        if not tasks:
+            print("Žádné úkoly k zobrazení.")
+            return None
+
+        prvni_cislo = (len(zacatky) - 1) * VELIKOST_STRANKY + 1
+        for i, task in enumerate(tasks, prvni_cislo):
+            zobrazene[i] = task
+            print(
+                f"{i}. {task['name']} - {task['description']} ({stav_map(task['state'])}) z {task['created_at']}"
+            )
+
+        moznosti = []
+        if dalsi_stranka:
+            moznosti.append("[d] další stránka")
+        if len(zacatky) > 1:
+            moznosti.append("[p] předchozí stránka")
+        if not moznosti and not vyber:
+            return None
+        moznosti.append("[k] konec")
+        if vyber:
+            moznosti.insert(0, f"{vyber} ({prvni_cislo}-{prvni_cislo + len(tasks) - 1})")
+
+        volba = input(", ".join(moznosti) + ": ").strip().lower()
+        if volba == "d" and dalsi_stranka:
+            zacatky.append((tasks[-1]["created_at"], tasks[-1]["id"]))
+        elif volba == "p" and len(zacatky) > 1:
+            zacatky.pop()
+        elif volba == "k":
+            return None
+        elif (
+            vice
+            and (cisla := rozparsovat_vyber(volba, len(zobrazene)))
+            and zobrazene.keys() >= set(cisla)
+        ):
+            return [zobrazene[cislo] for cislo in cisla]
+        elif vyber and volba.isdigit() and 0 <= int(volba) - prvni_cislo < len(tasks):
+            return tasks[int(volba) - prvni_cislo]
+        else:
+            print("Neplatná volba, zkuste to znovu.")
 
 
-def aktualizovat_ukol(connection):
-    """Aktualizuje stav vybraného úkolu.
+def rozparsovat_vyber(text: str, nejvyse: int) -> list[int]:
+    """Převede zápis výběru úkolů (např. "1,4,7-12") na seznam čísel.
+    Args:
+        text (str): Čísla a rozsahy oddělené čárkou.
+        nejvyse (int): Nejvyšší počet vybraných čísel (zobrazených úkolů);
+            větší rozsahy se odmítnou bez rozepsání do paměti.
+    Returns:
+        list[int]: Vzestupně seřazená čísla bez duplicit, nebo prázdný
+            seznam, pokud zápis není platný.
+    """
+
+    cisla = set()
+    for cast in text.replace(" ", "").split(","):
+        od, _, do = cast.partition("-")
+        if not od.isdigit() or (do and not do.isdigit()):
+            return []
+        od, do = int(od), int(do or od)
+        if od > do or do - od >= nejvyse:
+            return []
+        cisla.update(range(od, do + 1))
+        if len(cisla) > nejvyse:
+            return []
+    return sorted(cisla)
+
+
+def vybrat_stav() -> str | None:
+    """Zeptá se uživatele na volitelný filtr stavu úkolů.
+    Returns:
+        str: Vybraný stav, nebo None pro všechny úkoly.
+    """
+
+    print("Filtr stavu: 0. Vše, 1. Nezahájeno, 2. Probíhá, 3. Hotovo")
+    volba = vrat_cislo("Vyberte možnost (0-3): ", 0, 3)
+    return {0: None, 1: "pending", 2: "in_progress", 3: "completed"}[volba]
+
+
+def aktualizovat_ukol(connection, vlastnik: str | None = None):
+    """Aktualizuje stav vybraných úkolů.
+    Lze vybrat jeden úkol i více úkolů najednou (např. 1,4,7-12).
     Args:
         connection: Připojení k databázi.
+        vlastnik (str): Vlastník úkolů, None pro všechny úkoly.
     Returns:
         None
     """
-    tasks = zobrazit_ukoly(connection, "\nSeznam úkolů k aktualizaci:")
+    tasks = zobrazit_ukoly(
+        connection,
+        "\nSeznam úkolů k aktualizaci:",
+        "Zadejte čísla úkolů k aktualizaci (např. 1,4,7-12)",
+        vice=True,
+        vlastnik=vlastnik,
+    )
 
     if not tasks:
-        print("Žádné úkoly k aktualizaci.")
+        print("Žádný úkol nebyl aktualizován.")
         return
 
-    index = vrat_cislo("Zadejte číslo úkolu k aktualizaci: ", 1, len(tasks)) - 1
-    if 0 <= index < len(tasks):
-        print(f"Zadejte nový stav úkolu {tasks[index]['name']}:")
-        print("1. Probíhající")
-        print("2. Dokončený")
-        novy_stav = vrat_cislo("Vyberte možnost (1-2): ", 1, 2)
-        stav = {1: "in_progress", 2: "completed"}
-
-        if stav[novy_stav]:
-            update_task_state(connection, tasks[index]["id"], stav[novy_stav])
-            print(f"Úkol '{tasks[index]['name']}' byl aktualizován.")
-        else:
-            print("Neplatný stav úkolu.")
+    nazvy = ", ".join(f"'{task['name']}'" for task in tasks)
+    print(f"Zadejte nový stav úkolů {nazvy}:")
+    print("1. Probíhající")
+    print("2. Dokončený")
+    novy_stav = vrat_cislo("Vyberte možnost (1-2): ", 1, 2)
+    stav = {1: "in_progress", 2: "completed"}
+
+    if stav[novy_stav]:
+        # úkoly se změní, jen pokud je mezitím nezměnil jiný uživatel
+        verze = {task["id"]: task["version"] for task in tasks}
+        try:
+            pocet, chybejici = update_task_states(
+                connection, stav[novy_stav], expected_versions=verze, owner=vlastnik
+            )
+        except TaskConflictError as e:
+            zmenene = ", ".join(f"'{task['name']}'" for task in tasks if task["id"] in e.task_ids)
+            print(f"Úkoly {zmenene} mezitím změnil jiný uživatel, nic nebylo aktualizováno.")
+            print("Zobrazte seznam znovu a změnu zopakujte.")
+            return
+        print(f"Aktualizováno úkolů: {pocet}.")
+        vypsat_chybejici(tasks, chybejici)
     else:
-        print("Neplatný výběr úkolu.")
+        print("Neplatný stav úkolu.")
 
 
-def odstranit_ukol(connection):
-    """ "
-    Odstraní vybraný úkol ze seznamu úkolů.
+def odstranit_ukol(connection, vlastnik: str | None = None):
+    """Odstraní vybrané úkoly ze seznamu úkolů.
+    Lze vybrat jeden úkol i více úkolů najednou (např. 1,4,7-12).
     Args:
         connection: Připojení k databázi.
+        vlastnik (str): Vlastník úkolů, None pro všechny úkoly.
     Returns:
         None
     """
-    tasks = zobrazit_ukoly(connection, "\nSeznam úkolů k odstranění:")
+    tasks = zobrazit_ukoly(
+        connection,
+        "\nSeznam úkolů k odstranění:",
+        "Zadejte čísla úkolů k odstranění (např. 1,4,7-12)",
+        vice=True,
+        vlastnik=vlastnik,
+    )
 
     if not tasks:
-        print("Žádné úkoly k odstranění.")
+        print("Žádný úkol nebyl odstraněn.")
         return
 
-    index = vrat_cislo("Zadejte číslo úkolu k odstranění: ", 1, len(tasks)) - 1
-    if 0 <= index < len(tasks):
-        delete_task(connection, tasks[index]["id"])
-        print(f"Úkol '{tasks[index]['name']}' byl odstraněn.")
-    else:
-        print("Neplatný výběr úkolu.")
+    pocet, chybejici = delete_tasks(connection, [task["id"] for task in tasks], owner=vlastnik)
+    print(f"Odstraněno úkolů: {pocet}.")
+    vypsat_chybejici(tasks, chybejici)
+
+
+def vypsat_chybejici(tasks: list, chybejici: list):
+    """Vypíše vybrané úkoly, které mezitím z databáze zmizely.
+    Args:
+        tasks (list): Vybrané úkoly.
+        chybejici (list): ID úkolů, které v databázi nebyly nalezeny.
+    """
+
+    for task in tasks:
+        if task["id"] in chybejici:
+            print(f"Úkol '{task['name']}' už neexistuje.")
+
+
+def importovat_ukoly(connection, vlastnik: str | None = None):
+    """Hromadně importuje úkoly ze souboru JSONL, CSV, TSV nebo Parquet.
+    Soubor může být komprimovaný (.gz, .zst). Přerušený import lze spustit
+    znovu a naváže za poslední uloženou dávkou.
+    Args:
+        connection: Připojení k databázi.
+        vlastnik (str): Vlastník importovaných úkolů, None pro společný seznam.
+    Returns:
+        None
+    """
+
+    cesta = input("Zadejte cestu k souboru (.jsonl, .csv, .tsv, .parquet): ").strip()
+    try:
+        pocet, chyby = import_tasks(
+            connection, cesta, checkpoint=cesta, owner=vlastnik
+        )
+    except (OSError, RuntimeError, ValueError) as e:
+        print(f"Import se nezdařil: {e}")
+        return
 
+    print(f"Importováno úkolů: {pocet}.")
+    for radek, chyba in chyby:
+        print(f"Záznam {radek + 1} nebyl importován: {chyba}")
 
-def main():
-    """Hlavní funkce programu."""
+
+def vyhledat_ukoly(connection, vlastnik: str | None = None):
+    """Vyhledá úkoly podle slov v názvu nebo popisu a vypíše je podle relevance.
+    Args:
+        connection: Připojení k databázi.
+        vlastnik (str): Hledá jen v úkolech vlastníka, None ve všech úkolech.
+    Returns:
+        None
+    """
+
+    while not (dotaz := input("Zadejte hledaný text: ").strip()):
+        print("Hledaný text nemůže být prázdný.")
+    try:
+        tasks = search_tasks(connection, dotaz, VELIKOST_STRANKY, vlastnik)
+    except ValueError:
+        print("Hledaný text musí obsahovat alespoň jedno slovo.")
+        return
+
+    if not tasks:
+        print("Žádný úkol neodpovídá hledanému textu.")
+        return
+    print(f"\nNalezené úkoly ({len(tasks)}):")
+    for i, task in enumerate(tasks, 1):
+        print(
+            f"{i}. {task['name']} - {task['description']} ({stav_map(task['state'])}) z {task['created_at']}"
+        )
+
+
+@contextmanager
+def sledovat_akci(metrics):
+    """V režimu --debug vypíše po akci souhrn volání databáze (doba, počet
+    vrácených řádků a dotazů na server).
+    Args:
+        metrics: Zapnuté metriky (TaskMetrics), nebo None.
+    """
+
+    if metrics is None:
+        yield
+        return
+    with metrics.collect() as volani:
+        yield
+    for call in volani:
+        print(
+            f"[debug] {call.operation}: {call.seconds * 1000:.1f} ms, "
+            f"řádků {call.rows}, dotazů {call.round_trips}"
+        )
+
+
+def provest_akci(pool, metrics, akce, *args, **kwargs):
+    """Provede akci menu s připojením zapůjčeným z poolu.
+    Pokud je databázový server nedostupný, akci přeskočí a program běží
+    dál; při další akci se připojení zkusí obnovit znovu.
+    Args:
+        pool: Pool připojení, v offline režimu místní replika (TaskReplica).
+        metrics: Zapnuté metriky (TaskMetrics), nebo None.
+        akce (callable): Funkce akce, dostane připojení jako první argument.
+    """
+
+    if isinstance(pool, TaskReplica):  # offline režim, akce pracuje s místní replikou
+        with sledovat_akci(metrics):
+            akce(pool, *args, **kwargs)
+        return
+    try:
+        with pooled_connection(pool) as conn, sledovat_akci(metrics):
+            akce(conn, *args, **kwargs)
+    except ServerUnreachableError:
+        print("\nDatabázový server není dostupný, akci zopakujte později.")
+    except PoolExhaustedError:
+        print("\nVšechna připojení k databázi jsou obsazená, akci zopakujte později.")
+
+
+def synchronizovat(replika, pool=None):
+    """Synchronizuje místní repliku se serverem (offline režim).
+    Pokud je server nedostupný, program pracuje dál s replikou a změny
+    odešle při některé z dalších synchronizací.
+    Args:
+        replika: Místní replika úkolů (TaskReplica).
+        pool: Pool připojení k serveru, None pokud ho zatím nejde vytvořit.
+    Returns:
+        Pool připojení k serveru, nebo None.
+    """
+
+    try:
+        pool = pool or create_connection_pool(**get_pool_config())
+        with pooled_connection(pool) as conn:
+            vysledek = sync_replica(replika, conn)
+    except (ServerUnreachableError, PoolExhaustedError):
+        cekajici = len(replika.pending_changes())
+        print(f"\nServer není dostupný, pracujete offline (neodeslané změny: {cekajici}).")
+        return pool
+    if vysledek["conflicts"]:
+        print(
+            f"\nSynchronizace: {vysledek['conflicts']} konfliktů vyřešeno ve prospěch "
+            "serveru (úkol tam mezitím změnil jiný klient)."
+        )
+    return pool
+
+
+def vypsat_metriky(metrics):
+    """Vypíše souhrn metrik za celý běh programu (režim --debug).
+    Args:
+        metrics: Zapnuté metriky (TaskMetrics).
+    """
+
+    print(
+        f"\n{'operace':<22} {'volání':>7} {'p50 ms':>8} {'p99 ms':>8} "
+        f"{'řádků':>7} {'dotazů':>7}"
+    )
+    for operace, m in metrics.snapshot().items():
+        print(
+            f"{operace:<22} {m['calls']:>7} {m['latency_p50_ms']:>8.1f} "
+            f"{m['latency_p99_ms']:>8.1f} {m['rows']:>7} {m['round_trips']:>7}"
+        )
+
+
+def main(debug=False):
+    """Hlavní funkce programu.
+    Args:
+        debug (bool): Vypisovat po každé akci souhrn volání databáze.
+    """
 
     DB_USER, DB_PASSWORD, DB_HOST, DB_NAME = (
         get_db_config()
@@ -170,42 +500,83 @@ def main():
 
     print("Vítejte v programu Task manager.")
 
-    # Připojení k databázi
+    # cache čtení úkolů lze vypnout proměnnou TASK_CACHE=0 v souboru .env
+    if os.getenv("TASK_CACHE", "1") != "0":
+        enable_task_cache(ttl=float(os.getenv("TASK_CACHE_TTL", "10")))
+
+    # režim --debug: metriky volání databáze, pomalé dotazy (nad SLOW_QUERY_MS)
+    # se vypisují na stderr
+    metrics = enable_metrics(float(os.getenv("SLOW_QUERY_MS", "100"))) if debug else None
+
+    # offline režim: akce pracují s místní replikou, která se se serverem
+    # synchronizuje každých TASK_SYNC_INTERVAL sekund
+    replika_cesta = os.getenv("TASK_REPLICA")
+    interval = float(os.getenv("TASK_SYNC_INTERVAL", "60"))
+
+    # Vytvoření poolu připojení k databázi
+    pool = None
     try:
-        conn = connect_to_database(
-            host=DB_HOST, user=DB_USER, password=DB_PASSWORD, database=DB_NAME
-        )
-    except ConnectionError:  # pokud připojení selže, inicializujeme databázi
+        pool = create_connection_pool(**get_pool_config())
+        with pooled_connection(pool) as conn:
+            check_schema(conn)
+    except SchemaMissingError:  # databáze nebo její tabulky chybí, inicializujeme je
         initialize_database(
-            DB_HOST, DB_USER, DB_PASSWORD, DB_NAME
+            DB_HOST, DB_USER, DB_PASSWORD, DB_NAME, get_db_backend()
         )  # Inicializace databáze a tabulky úkolů
-        conn = connect_to_database(
-            host=DB_HOST, user=DB_USER, password=DB_PASSWORD, database=DB_NAME
-        )
-
-    #
+        pool = create_connection_pool(**get_pool_config())
+    except ServerUnreachableError as e:
+        if not replika_cesta:
+            print(f"Databázový server není dostupný, zkuste to později. ({e})")
+            return
+        print(f"Databázový server není dostupný, pracujete offline. ({e})")
+
+    # každý uživatel nebo projekt má vlastní seznam úkolů
+    vlastnik = vybrat_vlastnika()
+    replika = open_replica(replika_cesta, vlastnik) if replika_cesta else None
+    synchronizovano = None  # čas poslední synchronizace repliky
+
+    # každá akce si půjčí připojení z poolu (spadlé připojení se při tom obnoví),
+    # v offline režimu pracuje s replikou
     while True:
-        hlavni_menu()
-        volba = input("Vyberte možnost (1-5): ")
+        if replika and (synchronizovano is None or time.monotonic() >= synchronizovano + interval):
+            pool = synchronizovat(replika, pool)
+            synchronizovano = time.monotonic()
+        zdroj = replika or pool
+        provest_akci(zdroj, metrics, hlavni_menu, vlastnik)
+        volba = input("Vyberte možnost (1-7): ")
+
+        if volba == "7":
+            if replika:  # před koncem odešleme změny provedené offline
+                synchronizovat(replika, pool)
+                close_connection(replika)
+            if metrics:
+                vypsat_metriky(metrics)
+            print("\nKonec programu.")
+            break
 
         match volba:
             case "1":
-                pridat_ukol(conn)
+                provest_akci(zdroj, metrics, pridat_ukol, vlastnik)
             case "2":
-                zobrazit_ukoly(conn)
+                provest_akci(zdroj, metrics, zobrazit_ukoly, stav=vybrat_stav(), vlastnik=vlastnik)
             case "3":
-                aktualizovat_ukol(conn)
+                provest_akci(zdroj, metrics, aktualizovat_ukol, vlastnik)
             case "4":
-                odstranit_ukol(conn)
+                provest_akci(zdroj, metrics, odstranit_ukol, vlastnik)
             case "5":
-                print("\nKonec programu.")
-                break
+                provest_akci(zdroj, metrics, importovat_ukoly, vlastnik)
+            case "6":
+                provest_akci(zdroj, metrics, vyhledat_ukoly, vlastnik)
             case _:
                 print("Neplatná volba, zkuste to znovu.")
 
-    # Uzavření připojení k databázi
-    close_connection(conn)
-
 
 if __name__ == "__main__":
-    main()
+    if sys.argv[1:] == ["--debug"]:
+        main(debug=True)
+    elif len(sys.argv) > 1:  # podpříkazy pro skripty (viz src/task_cli.py)
+        from src.task_cli import run
+
+        sys.exit(run(sys.argv[1:]))
+    else:
+        main()
@@ -0,0 +1,1345 @@
+"""
+task_backends.py: Alternativní úložiště úkolů pro modul task_manager_db.
+
+Kromě MySQL (výchozí) lze funkcím modulu task_manager_db předat jako
+"připojení" také objekt SQLiteBackend (soubor na disku, bez serveru) nebo
+MemoryBackend (data jen v paměti procesu). Backendy provádějí pouze uložení
+a čtení dat, ověření vstupů zůstává ve funkcích task_manager_db.
+Výjimky TaskConflictError (souběžná změna úkolu) a ChangeTokenExpiredError
+(zastaralý token logu změn) vyvolávají backendy i MySQL cesta modulu
+task_manager_db, který je dále nabízí pod stejnými názvy.
+
+Author: Jan Bláha
+Email: jan.blaha@bcas.cz
+"""
+
+import bisect
+import datetime
+import heapq
+import itertools
+from collections import namedtuple
+import os
+import queue
+import re
+import sqlite3
+import threading
+import unicodedata
+
+BACKENDS = ("mysql", "sqlite", "memory")
+
+# Sloupce úkolu vracené všemi čteními (stejné pořadí jako u MySQL).
+TASK_COLUMNS = "id, name, description, state, created_at, version, updated_at"
+
+# Všechny sloupce úkolu včetně vlastníka (export a obnova ze zálohy).
+FULL_TASK_COLUMNS = TASK_COLUMNS + ", owner"
+
+# Kompaktní záznam úkolu pro velké výpisy (get_tasks(..., compact=True)): n-tice
+# bez slovníku na každý řádek, hodnoty jsou dostupné jako atributy (task.state)
+# a _asdict() vrátí stejný slovník jako běžné čtení.
+Task = namedtuple("Task", TASK_COLUMNS.split(", "))
+
+# Vložení úkolu a změna stavu v SQLite; updated_at má stejný formát jako
+# created_at, změna stavu vždy zvyšuje verzi úkolu.
+_INSERT_TASK = (
+    "INSERT INTO tasks (name, description, state, owner, updated_at) "
+    "VALUES (?, ?, ?, ?, datetime('now', 'localtime'))"
+)
+_UPDATE_STATE = (
+    "UPDATE tasks SET state = ?, version = version + 1, "
+    "updated_at = datetime('now', 'localtime')"
+)
+
+# Migrace schématu pro SQLite, čísla verzí odpovídají MIGRATIONS pro MySQL.
+SQLITE_MIGRATIONS = [
+    (
+        1,
+        [
+            """
+            CREATE TABLE IF NOT EXISTS tasks (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL CHECK (length(name) <= 100),
+                description TEXT NOT NULL CHECK (length(description) <= 255),
+                state TEXT NOT NULL DEFAULT 'pending'
+                    CHECK (state IN ('pending', 'in_progress', 'completed')),
+                created_at TEXT NOT NULL DEFAULT (datetime('now', 'localtime'))
+            )
+            """
+        ],
+    ),
+    (
+        2,
+        [
+            "CREATE INDEX IF NOT EXISTS idx_tasks_created_at_id ON tasks (created_at, id)",
+            "CREATE INDEX IF NOT EXISTS idx_tasks_state_created_at ON tasks (state, created_at)",
+        ],
+    ),
+    (
+        3,
+        [
+            # fulltextový index FTS5 nad tabulkou tasks, udržovaný triggery
+            """
+            CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+                name, description, content='tasks', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2'
+            )
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN
+                INSERT INTO tasks_fts (rowid, name, description)
+                VALUES (new.id, new.name, new.description);
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN
+                INSERT INTO tasks_fts (tasks_fts, rowid, name, description)
+                VALUES ('delete', old.id, old.name, old.description);
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS tasks_fts_update
+            AFTER UPDATE OF name, description ON tasks BEGIN
+                INSERT INTO tasks_fts (tasks_fts, rowid, name, description)
+                VALUES ('delete', old.id, old.name, old.description);
+                INSERT INTO tasks_fts (rowid, name, description)
+                VALUES (new.id, new.name, new.description);
+            END
+            """,
+            "INSERT INTO tasks_fts (tasks_fts) VALUES ('rebuild')",
+        ],
+    ),
+    (
+        4,
+        [
+            # verze úkolu pro optimistické zamykání; ALTER TABLE v SQLite
+            # nepovoluje výchozí hodnotu datetime('now'), updated_at proto
+            # nastavují příkazy INSERT a UPDATE
+            "ALTER TABLE tasks ADD COLUMN version INTEGER NOT NULL DEFAULT 1",
+            "ALTER TABLE tasks ADD COLUMN updated_at TEXT",
+            "UPDATE tasks SET updated_at = created_at",
+        ],
+    ),
+    (
+        5,
+        [
+            # log změn pro get_changes_since; pořadová čísla přiděluje řádek
+            # task_change_seq (stejné schéma jako u MySQL), zápisy provádějí
+            # triggery, takže log zachytí i hromadné operace
+            """
+            CREATE TABLE IF NOT EXISTS task_changes (
+                seq INTEGER PRIMARY KEY,
+                task_id INTEGER NOT NULL,
+                operation TEXT NOT NULL CHECK (operation IN ('insert', 'update', 'delete')),
+                changed_at TEXT NOT NULL DEFAULT (datetime('now', 'localtime'))
+            )
+            """,
+            "CREATE INDEX IF NOT EXISTS idx_task_changes_changed_at ON task_changes (changed_at)",
+            """
+            CREATE TABLE IF NOT EXISTS task_change_seq (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                seq INTEGER NOT NULL,
+                purged_seq INTEGER NOT NULL
+            )
+            """,
+            "INSERT OR IGNORE INTO task_change_seq (id, seq, purged_seq) VALUES (1, 0, 0)",
+            """
+            CREATE TRIGGER IF NOT EXISTS tasks_log_insert AFTER INSERT ON tasks BEGIN
+                UPDATE task_change_seq SET seq = seq + 1;
+                INSERT INTO task_changes (seq, task_id, operation)
+                SELECT seq, new.id, 'insert' FROM task_change_seq;
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS tasks_log_update AFTER UPDATE ON tasks BEGIN
+                UPDATE task_change_seq SET seq = seq + 1;
+                INSERT INTO task_changes (seq, task_id, operation)
+                SELECT seq, new.id, 'update' FROM task_change_seq;
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS tasks_log_delete AFTER DELETE ON tasks BEGIN
+                UPDATE task_change_seq SET seq = seq + 1;
+                INSERT INTO task_changes (seq, task_id, operation)
+                SELECT seq, old.id, 'delete' FROM task_change_seq;
+            END
+            """,
+        ],
+    ),
+    (
+        6,
+        [
+            # archiv dokončených úkolů (archive_completed_tasks)
+            """
+            CREATE TABLE IF NOT EXISTS tasks_archive (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                description TEXT NOT NULL,
+                state TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                version INTEGER NOT NULL,
+                updated_at TEXT NOT NULL,
+                archived_at TEXT NOT NULL DEFAULT (datetime('now', 'localtime'))
+            )
+            """,
+            "CREATE INDEX IF NOT EXISTS idx_tasks_archive_created_at_id "
+            "ON tasks_archive (created_at, id)",
+            "CREATE INDEX IF NOT EXISTS idx_tasks_state_updated_at ON tasks (state, updated_at)",
+        ],
+    ),
+    (
+        7,
+        [
+            # vlastník úkolu (uživatel nebo projekt); indexy začínají vlastníkem,
+            # takže čtení jednoho vlastníka prochází jen jeho část indexu
+            "ALTER TABLE tasks ADD COLUMN owner TEXT NOT NULL DEFAULT '' "
+            "CHECK (length(owner) <= 50)",
+            "CREATE INDEX IF NOT EXISTS idx_tasks_owner_created_at "
+            "ON tasks (owner, created_at, id)",
+            "CREATE INDEX IF NOT EXISTS idx_tasks_owner_state_created_at "
+            "ON tasks (owner, state, created_at, id)",
+            "ALTER TABLE tasks_archive ADD COLUMN owner TEXT NOT NULL DEFAULT ''",
+            "CREATE INDEX IF NOT EXISTS idx_tasks_archive_owner_created_at "
+            "ON tasks_archive (owner, created_at, id)",
+        ],
+    ),
+    # MySQL přechází na AUTO_INCREMENT v logu změn; SQLite zápisy serializuje
+    # vždy, pořadová čísla proto dál přidělují triggery přes task_change_seq
+    (8, []),
+    (
+        9,
+        [
+            # průběh importů, ukládá se ve stejné transakci jako dávka úkolů
+            """
+            CREATE TABLE IF NOT EXISTS task_imports (
+                checkpoint TEXT PRIMARY KEY,
+                source TEXT NOT NULL,
+                records INTEGER NOT NULL
+            )
+            """,
+        ],
+    ),
+]
+
+
+class TaskConflictError(RuntimeError):
+    """Úkol mezitím změnil jiný klient - jeho verze nesouhlasí s očekávanou.
+
+    Atribut task_ids obsahuje ID úkolů, jejichž verze se liší.
+    """
+
+    def __init__(self, task_ids):
+        super().__init__("Task was modified by another client.")
+        self.task_ids = list(task_ids)
+
+
+class ChangeTokenExpiredError(ValueError):
+    """Token logu změn je starší než nejstarší uchovaná změna (viz
+    purge_changes) - klient musí úkoly načíst znovu celé."""
+
+    def __init__(self):
+        super().__init__("Change token expired.")
+
+
+class PoolExhaustedError(ConnectionError):
+    """V poolu není volné připojení ani po uplynutí časového limitu."""
+
+    def __init__(self):
+        super().__init__("Database connection failed: pool exhausted")
+
+
+class TaskBackend:
+    """Společné rozhraní úložišť úkolů, která nejsou MySQL.
+
+    Metody dostávají již ověřené hodnoty. Řádky úkolů se vrací jako slovníky
+    se stejnými klíči jako u MySQL (id, name, description, state, created_at,
+    version, updated_at). Parametr owner omezí čtení i změny na úkoly
+    jednoho vlastníka, None znamená všechny úkoly.
+    """
+
+    name = None
+
+    @property
+    def identity(self):
+        """Identita úložiště; objekty se stejnou identitou čtou stejná data
+        (podle ní cache odděluje položky různých úložišť)."""
+        return (self.name, id(self))
+
+    def migrate(self):
+        """Aktualizuje schéma úložiště a vrátí jeho verzi."""
+        raise NotImplementedError
+
+    def insert_task(self, name, description, state, owner=""):
+        """Vloží jeden úkol vlastníka owner a vrátí jeho ID."""
+        raise NotImplementedError
+
+    def insert_tasks(self, rows, owner="", progress=None):
+        """Vloží n-tice (name, description, state) vlastníka owner v jedné transakci.
+        Zadaný progress (checkpoint, source, records) uloží ve stejné transakci
+        jako průběh importu.
+        """
+        raise NotImplementedError
+
+    def restore_tasks(self, rows, progress=None):
+        """Vloží úkoly se zachovanými hodnotami (n-tice ve sloupcích
+        FULL_TASK_COLUMNS) a průběh importu progress v jedné transakci. Úkoly,
+        jejichž ID už existuje, nevloží; vrátí seznam těchto ID.
+        """
+        raise NotImplementedError
+
+    def import_progress(self, checkpoint):
+        """Vrátí uložený průběh importu jako dvojici (source, records), nebo None."""
+        raise NotImplementedError
+
+    def clear_import_progress(self, checkpoint):
+        """Odstraní uložený průběh importu."""
+        raise NotImplementedError
+
+    def select_tasks(
+        self,
+        state=None,
+        created_after=None,
+        created_before=None,
+        name_prefix=None,
+        after=None,
+        limit=None,
+        order="asc",
+        include_archived=False,
+        compact=False,
+        owner=None,
+    ):
+        """Vrátí úkoly podle filtrů; after je klíč (created_at, id) pro stránkování.
+        Při include_archived vrací i úkoly přesunuté do archivu, při compact
+        záznamy Task místo slovníků.
+        """
+        raise NotImplementedError
+
+    def iter_tasks(self, batch_size, owner=None, with_owner=False):
+        """Postupně vrací všechny úkoly seřazené podle času vytvoření, při
+        with_owner i s klíčem owner."""
+        raise NotImplementedError
+
+    def count_by_state(self, owner=None):
+        """Vrátí počty úkolů podle stavu."""
+        raise NotImplementedError
+
+    def update_task_state(self, task_id, new_state, expected_version=None, owner=None):
+        """Změní stav úkolu, zvýší jeho verzi a vrátí True, pokud úkol existuje.
+        Při zadané expected_version vyvolá TaskConflictError, pokud se verze liší.
+        """
+        raise NotImplementedError
+
+    def delete_task(self, task_id, owner=None, expected_version=None):
+        """Odstraní úkol a vrátí True, pokud existoval.
+        Při zadané expected_version vyvolá TaskConflictError, pokud se verze liší.
+        """
+        raise NotImplementedError
+
+    def update_task_states(
+        self,
+        new_state,
+        task_ids,
+        state,
+        created_before,
+        chunk_size,
+        expected_versions=None,
+        owner=None,
+    ):
+        """Změní stav úkolů podle ID nebo filtru v jedné transakci.
+        Vrátí počet dotčených úkolů a seznam neexistujících ID. Při zadaných
+        expected_versions (ID -> verze) vyvolá TaskConflictError a nic nezmění,
+        pokud se verze některého úkolu liší.
+        """
+        raise NotImplementedError
+
+    def delete_tasks(self, task_ids, state, created_before, chunk_size, owner=None):
+        """Odstraní úkoly podle ID nebo filtru v jedné transakci.
+        Vrátí počet odstraněných úkolů a seznam neexistujících ID.
+        """
+        raise NotImplementedError
+
+    def apply_writes(self, writes):
+        """Provede dávku odložených zápisů v jedné transakci. Zápisy jsou dvojice
+        ("insert", (name, description, state, owner)) nebo ("update", (task_id,
+        new_state, expected_version, owner)). Vrátí pro každý zápis ID nového úkolu,
+        u změny stavu True, False pro neexistující úkol, nebo TaskConflictError.
+        """
+        raise NotImplementedError
+
+    def search_tasks(self, terms, limit, owner=None):
+        """Vrátí úkoly obsahující všechna slova (i jako začátek slova) podle relevance."""
+        raise NotImplementedError
+
+    def archive_tasks(self, completed_before, chunk_size):
+        """Přesune dokončené úkoly nezměněné od completed_before do archivu,
+        každou dávku chunk_size úkolů v samostatné transakci. Vrátí jejich počet.
+        """
+        raise NotImplementedError
+
+    def changes_since(self, after_seq, limit, owner=None):
+        """Vrátí z jednoho konzistentního čtení logu změn n-tici (seq, purged_seq,
+        changes, tasks): poslední přidělené pořadové číslo, číslo poslední
+        odstraněné změny, nejvýše limit dvojic (seq, task_id) novějších než
+        after_seq a aktuální řádky jejich úkolů podle ID (smazané chybí).
+        Při zadaném owner vynechá změny existujících úkolů jiných vlastníků.
+        """
+        raise NotImplementedError
+
+    def purge_changes(self, older_than):
+        """Odstraní z logu změny starší než older_than a vrátí jejich počet."""
+        raise NotImplementedError
+
+    def ping(self, reconnect=True, attempts=1, delay=0):
+        """Ověří dostupnost úložiště (místní úložiště je dostupné vždy)."""
+
+    def commit(self):
+        """Potvrdí transakci (backendy potvrzují každou operaci samy)."""
+
+    def rollback(self):
+        """Zruší nepotvrzenou transakci."""
+
+    def close(self):
+        """Uzavře úložiště."""
+
+
+class SQLiteBackend(TaskBackend):
+    """Úložiště úkolů v souboru SQLite (režim WAL, cache připravených dotazů)."""
+
+    name = "sqlite"
+
+    def __init__(self, path):
+        """
+        Args:
+            path (str): Cesta k souboru databáze, nebo ':memory:'.
+        """
+
+        self.path = path
+        # check_same_thread=False umožní předávat připojení mezi vlákny poolu,
+        # jedno připojení ale vždy používá jen jedno vlákno najednou
+        self._connection = sqlite3.connect(
+            path, check_same_thread=False, cached_statements=256
+        )
+        self._connection.row_factory = sqlite3.Row
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute("PRAGMA busy_timeout=5000")
+        self.migrate()
+
+    @property
+    def identity(self):
+        # do jednoho souboru se připojuje více objektů (pool), ':memory:' je pokaždé jiná databáze
+        if self.path == ":memory:":
+            return super().identity
+        return (self.name, os.path.realpath(self.path))
+
+    def migrate(self):
+        current = self._connection.execute("PRAGMA user_version").fetchone()[0]
+        for version, statements in SQLITE_MIGRATIONS:
+            if version <= current:
+                continue
+            with self._connection:
+                for statement in statements:
+                    self._connection.execute(statement)
+                self._connection.execute(f"PRAGMA user_version = {version}")
+            current = version
+        return current
+
+    def insert_task(self, name, description, state, owner=""):
+        with self._connection:
+            cursor = self._connection.execute(_INSERT_TASK, (name, description, state, owner))
+        return cursor.lastrowid
+
+    def insert_tasks(self, rows, owner="", progress=None):
+        with self._connection:
+            self._connection.executemany(_INSERT_TASK, ((*row, owner) for row in rows))
+            if progress:
+                self._save_progress(progress)
+        return len(rows)
+
+    def restore_tasks(self, rows, progress=None):
+        with self._connection:
+            existing = []
+            for chunk in _chunks([row[0] for row in rows], 500):
+                placeholders = ", ".join(["?"] * len(chunk))
+                missing = set(self._missing_ids(chunk, placeholders))
+                existing.extend(task_id for task_id in chunk if task_id not in missing)
+            skipped = set(existing)
+            self._connection.executemany(
+                f"INSERT INTO tasks ({FULL_TASK_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    (*row[:4], _sqlite_time(row[4]), row[5], _sqlite_time(row[6]), row[7])
+                    for row in rows
+                    if row[0] not in skipped
+                ),
+            )
+            if progress:
+                self._save_progress(progress)
+        return existing
+
+    def import_progress(self, checkpoint):
+        row = self._connection.execute(
+            "SELECT source, records FROM task_imports WHERE checkpoint = ?", (checkpoint,)
+        ).fetchone()
+        return None if row is None else (row["source"], row["records"])
+
+    def clear_import_progress(self, checkpoint):
+        with self._connection:
+            self._connection.execute(
+                "DELETE FROM task_imports WHERE checkpoint = ?", (checkpoint,)
+            )
+
+    def _save_progress(self, progress):
+        """Uloží průběh importu (checkpoint, source, records) v otevřené transakci."""
+
+        self._connection.execute(
+            "INSERT OR REPLACE INTO task_imports (checkpoint, source, records) VALUES (?, ?, ?)",
+            progress,
+        )
+
+    def select_tasks(
+        self,
+        state=None,
+        created_after=None,
+        created_before=None,
+        name_prefix=None,
+        after=None,
+        limit=None,
+        order="asc",
+        include_archived=False,
+        compact=False,
+        owner=None,
+    ):
+        where, params = [], []
+        if owner is not None:
+            where.append("owner = ?")
+            params.append(owner)
+        if state is not None:
+            where.append("state = ?")
+            params.append(state)
+        if created_after is not None:
+            where.append("created_at >= ?")
+            params.append(_to_text(created_after))
+        if created_before is not None:
+            where.append("created_at < ?")
+            params.append(_to_text(created_before))
+        if name_prefix:
+            escaped = (
+                name_prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            )
+            where.append("name LIKE ? ESCAPE '\\'")
+            params.append(escaped + "%")
+        if after is not None:
+            where.append("(created_at > ? OR (created_at = ? AND id > ?))")
+            params.extend([_to_text(after[0]), _to_text(after[0]), after[1]])
+
+        source = "tasks"
+        if include_archived:
+            # filtry se z pohledu propíší do obou větví UNION ALL (a jejich indexů)
+            source = (
+                f"(SELECT {TASK_COLUMNS}, owner FROM tasks "
+                f"UNION ALL SELECT {TASK_COLUMNS}, owner FROM tasks_archive)"
+            )
+        query = f"SELECT {TASK_COLUMNS} FROM {source}"
+        if where:
+            query += " WHERE " + " AND ".join(where)
+        query += f" ORDER BY created_at {order.upper()}, id {order.upper()}"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        if compact:
+            cursor = self._connection.cursor()
+            cursor.row_factory = None  # prosté n-tice místo sqlite3.Row
+            return compact_tasks(cursor.execute(query, params), parse_times=True)
+        return [_row_to_task(row) for row in self._connection.execute(query, params)]
+
+    def iter_tasks(self, batch_size, owner=None, with_owner=False):
+        scope, params = _owner_scope(owner, "WHERE")
+        columns = FULL_TASK_COLUMNS if with_owner else TASK_COLUMNS
+        cursor = self._connection.execute(
+            f"SELECT {columns} FROM tasks{scope} ORDER BY created_at ASC, id ASC", params
+        )
+        try:
+            while rows := cursor.fetchmany(batch_size):
+                yield from (_row_to_task(row) for row in rows)
+        finally:
+            cursor.close()
+
+    def count_by_state(self, owner=None):
+        scope, params = _owner_scope(owner, "WHERE")
+        rows = self._connection.execute(
+            f"SELECT state, COUNT(*) FROM tasks{scope} GROUP BY state", params
+        ).fetchall()
+        return {row[0]: row[1] for row in rows}
+
+    def update_task_state(self, task_id, new_state, expected_version=None, owner=None):
+        with self._connection:
+            updated = self._update_state(task_id, new_state, expected_version, owner)
+        if not updated and expected_version is not None:
+            if not self._missing_ids([task_id], "?", owner):
+                raise TaskConflictError([task_id])
+        return updated
+
+    def delete_task(self, task_id, owner=None, expected_version=None):
+        scope, params = _owner_scope(owner)
+        if expected_version is not None:
+            scope, params = " AND version = ?" + scope, [expected_version, *params]
+        with self._connection:
+            cursor = self._connection.execute(
+                f"DELETE FROM tasks WHERE id = ?{scope}", [task_id, *params]
+            )
+        deleted = cursor.rowcount > 0
+        if not deleted and expected_version is not None:
+            if not self._missing_ids([task_id], "?", owner):
+                raise TaskConflictError([task_id])
+        return deleted
+
+    def apply_writes(self, writes):
+        results = []
+        with self._connection:
+            for operation, args in writes:
+                if operation == "insert":
+                    results.append(self._connection.execute(_INSERT_TASK, args).lastrowid)
+                    continue
+                task_id, new_state, expected_version, owner = args
+                if self._update_state(task_id, new_state, expected_version, owner):
+                    results.append(True)
+                elif expected_version is not None and not self._missing_ids(
+                    [task_id], "?", owner
+                ):
+                    results.append(TaskConflictError([task_id]))
+                else:
+                    results.append(False)
+        return results
+
+    def update_task_states(
+        self,
+        new_state,
+        task_ids,
+        state,
+        created_before,
+        chunk_size,
+        expected_versions=None,
+        owner=None,
+    ):
+        with self._connection:
+            if task_ids is None:
+                where, params = _sqlite_filters(state, created_before, owner)
+                cursor = self._connection.execute(
+                    f"{_UPDATE_STATE} WHERE {where}", [new_state, *params]
+                )
+                return cursor.rowcount, []
+            scope, scope_params = _owner_scope(owner)
+            if expected_versions is not None:
+                # zámek pro zápis hned od začátku, verze se mezi kontrolou
+                # a změnou nemohou změnit
+                self._connection.execute("BEGIN IMMEDIATE")
+            missing = []
+            for start in range(0, len(task_ids), chunk_size):
+                chunk = task_ids[start : start + chunk_size]
+                placeholders = ", ".join("?" * len(chunk))
+                if expected_versions is not None:
+                    versions = {
+                        row[0]: row[1]
+                        for row in self._connection.execute(
+                            f"SELECT id, version FROM tasks WHERE id IN ({placeholders}){scope}",
+                            [*chunk, *scope_params],
+                        )
+                    }
+                    conflicts = version_conflicts(chunk, versions, expected_versions)
+                    if conflicts:
+                        raise TaskConflictError(conflicts)
+                cursor = self._connection.execute(
+                    f"{_UPDATE_STATE} WHERE id IN ({placeholders}){scope}",
+                    [new_state, *chunk, *scope_params],
+                )
+                if cursor.rowcount < len(chunk):
+                    missing.extend(self._missing_ids(chunk, placeholders, owner))
+        return len(task_ids) - len(missing), missing
+
+    def delete_tasks(self, task_ids, state, created_before, chunk_size, owner=None):
+        with self._connection:
+            if task_ids is None:
+                where, params = _sqlite_filters(state, created_before, owner)
+                cursor = self._connection.execute(f"DELETE FROM tasks WHERE {where}", params)
+                return cursor.rowcount, []
+            scope, scope_params = _owner_scope(owner)
+            missing = []
+            for start in range(0, len(task_ids), chunk_size):
+                chunk = task_ids[start : start + chunk_size]
+                placeholders = ", ".join("?" * len(chunk))
+                missing.extend(self._missing_ids(chunk, placeholders, owner))
+                self._connection.execute(
+                    f"DELETE FROM tasks WHERE id IN ({placeholders}){scope}",
+                    [*chunk, *scope_params],
+                )
+        return len(task_ids) - len(missing), missing
+
+    def search_tasks(self, terms, limit, owner=None):
+        match = " ".join(f'"{term}"*' for term in terms)
+        columns = ", ".join(f"t.{column}" for column in TASK_COLUMNS.split(", "))
+        scope, params = _owner_scope(owner, column="t.owner")
+        rows = self._connection.execute(
+            f"SELECT {columns} "
+            "FROM tasks_fts JOIN tasks t ON t.id = tasks_fts.rowid "
+            f"WHERE tasks_fts MATCH ?{scope} "
+            # shoda v názvu má dvojnásobnou váhu oproti popisu
+            "ORDER BY bm25(tasks_fts, 2.0, 1.0), t.id DESC LIMIT ?",
+            (match, *params, limit),
+        )
+        return [_row_to_task(row) for row in rows]
+
+    def archive_tasks(self, completed_before, chunk_size):
+        count = 0
+        while True:
+            with self._connection:
+                # zámek pro zápis hned od začátku, vybrané úkoly se do přesunu nezmění
+                self._connection.execute("BEGIN IMMEDIATE")
+                ids = [
+                    row[0]
+                    for row in self._connection.execute(
+                        "SELECT id FROM tasks WHERE state = 'completed' AND updated_at < ? "
+                        "ORDER BY updated_at LIMIT ?",
+                        (_to_text(completed_before), chunk_size),
+                    )
+                ]
+                if ids:
+                    placeholders = ", ".join("?" * len(ids))
+                    self._connection.execute(
+                        f"INSERT INTO tasks_archive ({TASK_COLUMNS}, owner) "
+                        f"SELECT {TASK_COLUMNS}, owner FROM tasks WHERE id IN ({placeholders})",
+                        ids,
+                    )
+                    self._connection.execute(
+                        f"DELETE FROM tasks WHERE id IN ({placeholders})", ids
+                    )
+            count += len(ids)
+            if len(ids) < chunk_size:
+                return count
+
+    def changes_since(self, after_seq, limit, owner=None):
+        query, params = "SELECT seq, task_id FROM task_changes WHERE seq > ?", [after_seq]
+        if owner is not None:
+            # smazaný úkol už v tabulce není, jeho změny se vrací všem vlastníkům
+            query = (
+                "SELECT seq, task_id FROM task_changes "
+                "LEFT JOIN tasks ON tasks.id = task_changes.task_id "
+                "WHERE seq > ? AND (tasks.id IS NULL OR tasks.owner = ?)"
+            )
+            params.append(owner)
+        with self._connection:
+            # čtení v jedné transakci vidí log i úkoly ve stejném okamžiku
+            self._connection.execute("BEGIN")
+            seq, purged_seq = self._connection.execute(
+                "SELECT seq, purged_seq FROM task_change_seq"
+            ).fetchone()
+            changes = [
+                tuple(row)
+                for row in self._connection.execute(
+                    query + " ORDER BY seq LIMIT ?", (*params, limit)
+                )
+            ]
+            task_ids = list(dict.fromkeys(task_id for _, task_id in changes))
+            tasks = {}
+            for start in range(0, len(task_ids), 500):
+                chunk = task_ids[start : start + 500]
+                placeholders = ", ".join("?" * len(chunk))
+                for row in self._connection.execute(
+                    f"SELECT {TASK_COLUMNS} FROM tasks WHERE id IN ({placeholders})", chunk
+                ):
+                    tasks[row["id"]] = _row_to_task(row)
+        return seq, purged_seq, changes, tasks
+
+    def purge_changes(self, older_than):
+        with self._connection:
+            last = self._connection.execute(
+                "SELECT MAX(seq) FROM task_changes WHERE changed_at < ?", (_to_text(older_than),)
+            ).fetchone()[0]
+            if last is None:
+                return 0
+            cursor = self._connection.execute("DELETE FROM task_changes WHERE seq <= ?", (last,))
+            self._connection.execute(
+                "UPDATE task_change_seq SET purged_seq = MAX(purged_seq, ?)", (last,)
+            )
+        return cursor.rowcount
+
+    def _update_state(self, task_id, new_state, expected_version, owner):
+        """Změní stav jednoho úkolu v otevřené transakci a vrátí True, pokud se změnil."""
+
+        query = _UPDATE_STATE + " WHERE id = ?"
+        params = [new_state, task_id]
+        if expected_version is not None:
+            query += " AND version = ?"
+            params.append(expected_version)
+        scope, scope_params = _owner_scope(owner)
+        cursor = self._connection.execute(query + scope, params + scope_params)
+        return cursor.rowcount > 0
+
+    def _missing_ids(self, chunk, placeholders, owner=None):
+        """Vrátí ID z dávky, která v tabulce nejsou (u vlastníka owner)."""
+
+        scope, params = _owner_scope(owner)
+        found = {
+            row[0]
+            for row in self._connection.execute(
+                f"SELECT id FROM tasks WHERE id IN ({placeholders}){scope}", [*chunk, *params]
+            )
+        }
+        return [task_id for task_id in chunk if task_id not in found]
+
+    def commit(self):
+        self._connection.commit()
+
+    def rollback(self):
+        self._connection.rollback()
+
+    def close(self):
+        self._connection.close()
+
+
+class MemoryBackend(TaskBackend):
+    """Úložiště úkolů v paměti procesu.
+
+    Úkoly jsou ve slovníku podle ID, pořadí drží seřazený seznam klíčů
+    (created_at, id), stejný seznam se vede i pro každého vlastníka a pro
+    každý stav se vede množina ID. Úložiště je sdílené mezi vlákny, přístup
+    hlídá zámek.
+    """
+
+    name = "memory"
+
+    def __init__(self):
+        self._tasks = {}
+        self._keys = []  # seřazené klíče (created_at, id)
+        self._by_state = {"pending": set(), "in_progress": set(), "completed": set()}
+        self._index = {}  # invertovaný index: slovo -> množina ID úkolů
+        self._words = []  # seřazená slova indexu pro hledání podle začátku slova
+        self._next_id = 1
+        self._last_created_at = None
+        self._archive = {}  # archivované úkoly podle ID
+        self._archive_keys = []  # seřazené klíče (created_at, id) archivu
+        self._owners = {}  # vlastník podle ID úkolu (i archivovaného)
+        self._owner_keys = {}  # vlastník -> seřazené klíče jeho úkolů
+        self._archive_owner_keys = {}  # vlastník -> seřazené klíče jeho archivu
+        self._changes = []  # log změn: n-tice (seq, task_id, operation, changed_at)
+        self._change_seq = 0
+        self._purged_seq = 0
+        self._imports = {}  # průběh importů: checkpoint -> (source, records)
+        self._lock = threading.RLock()
+
+    def migrate(self):
+        return SQLITE_MIGRATIONS[-1][0]
+
+    def insert_task(self, name, description, state, owner=""):
+        with self._lock:
+            self.insert_tasks([(name, description, state)], owner)
+            return self._next_id - 1
+
+    def insert_tasks(self, rows, owner="", progress=None):
+        with self._lock:
+            for name, description, state in rows:
+                created_at = datetime.datetime.now().replace(microsecond=0)
+                # čas vytvoření nesmí jít zpět, jinak by se rozbilo pořadí klíčů
+                if self._last_created_at and created_at < self._last_created_at:
+                    created_at = self._last_created_at
+                self._last_created_at = created_at
+                task_id = self._next_id
+                self._add(task_id, name, description, state, created_at, 1, created_at, owner)
+            if progress:
+                self._imports[progress[0]] = progress[1:]
+        return len(rows)
+
+    def restore_tasks(self, rows, progress=None):
+        with self._lock:
+            existing = [row[0] for row in rows if row[0] in self._tasks]
+            for row in rows:
+                if row[0] not in self._tasks:
+                    self._add(*row)
+            if progress:
+                self._imports[progress[0]] = progress[1:]
+        return existing
+
+    def import_progress(self, checkpoint):
+        with self._lock:
+            return self._imports.get(checkpoint)
+
+    def clear_import_progress(self, checkpoint):
+        with self._lock:
+            self._imports.pop(checkpoint, None)
+
+    def _add(self, task_id, name, description, state, created_at, version, updated_at, owner):
+        """Vloží úkol do slovníku a všech indexů; volá se pod zámkem."""
+
+        self._next_id = max(self._next_id, task_id + 1)
+        self._tasks[task_id] = {
+            "id": task_id,
+            "name": name,
+            "description": description,
+            "state": state,
+            "created_at": created_at,
+            "version": version,
+            "updated_at": updated_at,
+        }
+        # nové úkoly jdou na konec, obnovené ze zálohy mohou mít starší čas
+        bisect.insort(self._keys, (created_at, task_id))
+        self._owners[task_id] = owner
+        bisect.insort(self._owner_keys.setdefault(owner, []), (created_at, task_id))
+        self._by_state[state].add(task_id)
+        self._log_change(task_id, "insert")
+        for word in set(_search_words(f"{name} {description}")):
+            if word not in self._index:
+                self._index[word] = set()
+                bisect.insort(self._words, word)
+            self._index[word].add(task_id)
+
+    def select_tasks(
+        self,
+        state=None,
+        created_after=None,
+        created_before=None,
+        name_prefix=None,
+        after=None,
+        limit=None,
+        order="asc",
+        include_archived=False,
+        compact=False,
+        owner=None,
+    ):
+        with self._lock:
+            if owner is None:
+                sources = [self._keys, self._archive_keys]
+            else:
+                sources = [
+                    self._owner_keys.get(owner, []),
+                    self._archive_owner_keys.get(owner, []),
+                ]
+            if not include_archived:
+                sources = sources[:1]
+            if after is not None:
+                sources = [keys[bisect.bisect_right(keys, after) :] for keys in sources]
+            if order == "desc":
+                keys = heapq.merge(*(reversed(keys) for keys in sources), reverse=True)
+            else:
+                keys = heapq.merge(*sources)
+            prefix = name_prefix.casefold() if name_prefix else None
+            ids = self._by_state[state] if state is not None else None
+
+            result = []
+            for created_at, task_id in keys:
+                task = self._tasks.get(task_id)
+                if task is None:  # archivovaný úkol, není v indexu podle stavu
+                    task = self._archive[task_id]
+                    if state is not None and task["state"] != state:
+                        continue
+                elif ids is not None and task_id not in ids:
+                    continue
+                if created_after is not None and created_at < created_after:
+                    continue
+                if created_before is not None and created_at >= created_before:
+                    continue
+                if prefix and not task["name"].casefold().startswith(prefix):
+                    continue
+                # klíče slovníku úkolu jsou v pořadí sloupců TASK_COLUMNS
+                result.append(Task._make(task.values()) if compact else dict(task))
+                if limit is not None and len(result) >= limit:
+                    break
+            return result
+
+    def iter_tasks(self, batch_size, owner=None, with_owner=False):
+        after = None
+        while batch := self.select_tasks(after=after, limit=batch_size, owner=owner):
+            if with_owner:
+                with self._lock:
+                    batch = [{**task, "owner": self._owners[task["id"]]} for task in batch]
+            yield from batch
+            after = (batch[-1]["created_at"], batch[-1]["id"])
+
+    def count_by_state(self, owner=None):
+        with self._lock:
+            if owner is None:
+                return {state: len(ids) for state, ids in self._by_state.items()}
+            counts = dict.fromkeys(self._by_state, 0)
+            for _, task_id in self._owner_keys.get(owner, []):
+                counts[self._tasks[task_id]["state"]] += 1
+            return counts
+
+    def update_task_state(self, task_id, new_state, expected_version=None, owner=None):
+        with self._lock:
+            task = self._tasks.get(task_id)
+            if task is None or not self._owned(task_id, owner):
+                return False
+            if expected_version is not None and task["version"] != expected_version:
+                raise TaskConflictError([task_id])
+            self._by_state[task["state"]].discard(task_id)
+            self._by_state[new_state].add(task_id)
+            task["state"] = new_state
+            task["version"] += 1
+            task["updated_at"] = datetime.datetime.now().replace(microsecond=0)
+            self._log_change(task_id, "update")
+            return True
+
+    def delete_task(self, task_id, owner=None, expected_version=None):
+        with self._lock:
+            if task_id not in self._tasks or not self._owned(task_id, owner):
+                return False
+            task = self._tasks[task_id]
+            if expected_version is not None and task["version"] != expected_version:
+                raise TaskConflictError([task_id])
+            del self._tasks[task_id]
+            self._by_state[task["state"]].discard(task_id)
+            key = (task["created_at"], task_id)
+            del self._keys[bisect.bisect_left(self._keys, key)]
+            owner_keys = self._owner_keys[self._owners.pop(task_id)]
+            del owner_keys[bisect.bisect_left(owner_keys, key)]
+            for word in set(_search_words(f"{task['name']} {task['description']}")):
+                self._index[word].discard(task_id)
+                if not self._index[word]:
+                    del self._index[word]
+                    del self._words[bisect.bisect_left(self._words, word)]
+            self._log_change(task_id, "delete")
+            return True
+
+    def apply_writes(self, writes):
+        results = []
+        with self._lock:
+            for operation, args in writes:
+                if operation == "insert":
+                    results.append(self.insert_task(*args))
+                    continue
+                try:
+                    results.append(self.update_task_state(*args))
+                except TaskConflictError as e:
+                    results.append(e)
+        return results
+
+    def search_tasks(self, terms, limit, owner=None):
+        terms = [word for term in terms for word in _search_words(term)]
+        with self._lock:
+            found = None
+            for term in terms:
+                # všechna slova indexu začínající hledaným slovem leží v seřazeném
+                # seznamu za sebou
+                ids = set()
+                start = bisect.bisect_left(self._words, term)
+                for word in self._words[start:]:
+                    if not word.startswith(term):
+                        break
+                    ids |= self._index[word]
+                found = ids if found is None else found & ids
+                if not found:
+                    return []
+            if owner is not None:
+                found = {task_id for task_id in found if self._owners[task_id] == owner}
+
+            def score(task_id):
+                task = self._tasks[task_id]
+                name = _search_words(task["name"])
+                description = _search_words(task["description"])
+                return sum(
+                    2 * sum(word.startswith(term) for word in name)
+                    + sum(word.startswith(term) for word in description)
+                    for term in terms
+                )
+
+            ranked = sorted(found or (), key=lambda task_id: (-score(task_id), -task_id))
+            return [dict(self._tasks[task_id]) for task_id in ranked[:limit]]
+
+    def update_task_states(
+        self,
+        new_state,
+        task_ids,
+        state,
+        created_before,
+        chunk_size,
+        expected_versions=None,
+        owner=None,
+    ):
+        with self._lock:
+            if task_ids is None:
+                task_ids = self._filter_ids(state, created_before, owner)
+            if expected_versions is not None:
+                versions = {
+                    task_id: self._tasks[task_id]["version"]
+                    for task_id in task_ids
+                    if task_id in self._tasks and self._owned(task_id, owner)
+                }
+                conflicts = version_conflicts(task_ids, versions, expected_versions)
+                if conflicts:
+                    raise TaskConflictError(conflicts)
+            missing = []
+            for task_id in task_ids:
+                if not self.update_task_state(task_id, new_state, owner=owner):
+                    missing.append(task_id)
+            return len(task_ids) - len(missing), missing
+
+    def delete_tasks(self, task_ids, state, created_before, chunk_size, owner=None):
+        with self._lock:
+            if task_ids is None:
+                task_ids = self._filter_ids(state, created_before, owner)
+            missing = [task_id for task_id in task_ids if not self.delete_task(task_id, owner)]
+            return len(task_ids) - len(missing), missing
+
+    def archive_tasks(self, completed_before, chunk_size):
+        count = 0
+        while True:
+            # zámek se drží jen po dobu jedné dávky
+            with self._lock:
+                ids = [
+                    task_id
+                    for task_id in self._by_state["completed"]
+                    if self._tasks[task_id]["updated_at"] < completed_before
+                ][:chunk_size]
+                for task_id in ids:
+                    task = dict(self._tasks[task_id])
+                    owner = self._owners[task_id]
+                    self.delete_task(task_id)
+                    key = (task["created_at"], task_id)
+                    self._archive[task_id] = task
+                    self._owners[task_id] = owner
+                    bisect.insort(self._archive_keys, key)
+                    bisect.insort(self._archive_owner_keys.setdefault(owner, []), key)
+            count += len(ids)
+            if len(ids) < chunk_size:
+                return count
+
+    def changes_since(self, after_seq, limit, owner=None):
+        with self._lock:
+            start = bisect.bisect_right(self._changes, after_seq, key=lambda change: change[0])
+            changes = self._changes[start : start + limit]
+            if owner is not None:
+                # smazaný úkol už v úložišti není, jeho změny se vrací všem vlastníkům
+                changes = itertools.islice(
+                    (
+                        self._changes[index]
+                        for index in range(start, len(self._changes))
+                        if self._changes[index][1] not in self._tasks
+                        or self._owners[self._changes[index][1]] == owner
+                    ),
+                    limit,
+                )
+            changes = [change[:2] for change in changes]
+            tasks = {
+                task_id: dict(self._tasks[task_id])
+                for _, task_id in changes
+                if task_id in self._tasks
+            }
+            return self._change_seq, self._purged_seq, changes, tasks
+
+    def purge_changes(self, older_than):
+        with self._lock:
+            count = 0
+            while count < len(self._changes) and self._changes[count][3] < older_than:
+                count += 1
+            if count:
+                self._purged_seq = max(self._purged_seq, self._changes[count - 1][0])
+                del self._changes[:count]
+            return count
+
+    def _log_change(self, task_id, operation):
+        """Zapíše změnu úkolu do logu změn; volá se pod zámkem."""
+
+        self._change_seq += 1
+        self._changes.append(
+            (self._change_seq, task_id, operation, datetime.datetime.now().replace(microsecond=0))
+        )
+
+    def _filter_ids(self, state, created_before, owner=None):
+        """Vrátí ID úkolů odpovídajících filtru stavu, času vytvoření a vlastníka."""
+
+        return [
+            task["id"]
+            for task in self._tasks.values()
+            if (state is None or task["state"] == state)
+            and (created_before is None or task["created_at"] < created_before)
+            and self._owned(task["id"], owner)
+        ]
+
+    def _owned(self, task_id, owner):
+        """Zjistí, zda úkol patří vlastníkovi (owner None znamená libovolný)."""
+
+        return owner is None or self._owners.get(task_id) == owner
+
+
+# Sdílená paměťová úložiště podle názvu databáze, aby všechna "připojení"
+# ke stejné databázi v rámci procesu viděla stejná data.
+_memory_stores = {}
+_memory_stores_lock = threading.Lock()
+
+
+def connect_backend(backend, database):
+    """Otevře úložiště úkolů daného typu.
+    Args:
+        backend (str): 'sqlite' nebo 'memory'.
+        database (str): Cesta k souboru SQLite, u 'memory' název úložiště.
+    Returns:
+        TaskBackend: Otevřené úložiště.
+    Raises:
+        ValueError: Pokud typ backendu není podporovaný.
+        ConnectionError: Pokud se úložiště nepodaří otevřít.
+    """
+
+    if backend == "sqlite":
+        try:
+            return SQLiteBackend(database)
+        except sqlite3.Error as e:
+            raise ConnectionError(f"Database connection failed: {e}")
+    if backend == "memory":
+        with _memory_stores_lock:
+            return _memory_stores.setdefault(database, MemoryBackend())
+    raise ValueError("Unsupported database backend.")
+
+
+class BackendPool:
+    """Jednoduchý pool úložišť pro SQLite a memory backend.
+
+    Rozhraní odpovídá tomu, jak pooled_connection() používá pool MySQL.
+    """
+
+    def __init__(self, backend, database, pool_size=5):
+        """
+        Args:
+            backend (str): 'sqlite' nebo 'memory'.
+            database (str): Cesta k souboru SQLite, u 'memory' název úložiště.
+            pool_size (int): Maximální počet současně zapůjčených připojení.
+        """
+
+        self.backend = backend
+        self.database = database
+        self.pool_size = pool_size
+        self._free = queue.LifoQueue()
+        self._slots = threading.Semaphore(pool_size)
+        connect_backend(backend, database)  # ověří, že úložiště lze otevřít
+
+    def acquire(self, timeout):
+        """Zapůjčí připojení, případně počká až timeout sekund na volné.
+        Raises:
+            PoolExhaustedError: Pokud není volné připojení.
+            ConnectionError: Pokud se nové připojení nepodaří otevřít.
+        """
+
+        if not self._slots.acquire(timeout=max(timeout, 0)):
+            raise PoolExhaustedError()
+        try:
+            return self._free.get_nowait()
+        except queue.Empty:
+            try:
+                return connect_backend(self.backend, self.database)
+            except ConnectionError:
+                self._slots.release()
+                raise
+
+    def release(self, connection):
+        """Vrátí zapůjčené připojení do poolu."""
+
+        self._free.put(connection)
+        self._slots.release()
+
+
+def version_conflicts(task_ids, versions, expected_versions):
+    """Vrátí ID existujících úkolů, jejichž verze nesouhlasí s očekávanou.
+    Args:
+        task_ids (list): Kontrolovaná ID úkolů.
+        versions (dict): Aktuální verze existujících úkolů podle ID.
+        expected_versions (dict): Očekávané verze podle ID.
+    Returns:
+        list: ID úkolů ve stavu konfliktu.
+    """
+
+    return [
+        task_id
+        for task_id in task_ids
+        if task_id in versions and versions[task_id] != expected_versions[task_id]
+    ]
+
+
+def compact_tasks(rows, parse_times=False):
+    """Převede řádky úkolů (n-tice ve sloupcích TASK_COLUMNS) na záznamy Task.
+    Stejné hodnoty stavu a času sdílejí všechny záznamy jedním objektem, takže
+    se neopakují v paměti pro každý řádek.
+    Args:
+        rows (iterable): Řádky úkolů.
+        parse_times (bool): True, pokud jsou časy text (SQLite) a je nutné je převést.
+    Returns:
+        list: Seznam záznamů Task.
+    """
+
+    states = {}
+    times = {}
+
+    def shared_time(value):
+        moment = times.get(value)
+        if moment is None:
+            moment = datetime.datetime.fromisoformat(value) if parse_times else value
+            times[value] = moment
+        return moment
+
+    return [
+        Task(
+            row[0],
+            row[1],
+            row[2],
+            states.setdefault(row[3], row[3]),
+            shared_time(row[4]),
+            row[5],
+            shared_time(row[6]),
+        )
+        for row in rows
+    ]
+
+
+def _sqlite_filters(state, created_before, owner=None):
+    """Sestaví podmínku WHERE hromadných operací pro SQLite."""
+
+    where, params = [], []
+    if owner is not None:
+        where.append("owner = ?")
+        params.append(owner)
+    if state is not None:
+        where.append("state = ?")
+        params.append(state)
+    if created_before is not None:
+        where.append("created_at < ?")
+        params.append(_to_text(created_before))
+    return " AND ".join(where), params
+
+
+def _owner_scope(owner, keyword="AND", column="owner"):
+    """Sestaví podmínku na vlastníka úkolu pro připojení k dotazu SQLite.
+    Returns:
+        tuple: Text podmínky (prázdný pro owner None) a seznam jejích parametrů.
+    """
+
+    if owner is None:
+        return "", []
+    return f" {keyword} {column} = ?", [owner]
+
+
+def _search_words(text):
+    """Rozdělí text na slova pro vyhledávání (malá písmena, bez diakritiky)."""
+
+    text = unicodedata.normalize("NFKD", text.casefold())
+    return re.findall(r"\w+", "".join(ch for ch in text if not unicodedata.combining(ch)))
+
+
+def _to_text(value):
+    """Převede čas na text ve formátu, v jakém ho ukládá SQLite."""
+
+    return value.isoformat(sep=" ") if isinstance(value, datetime.datetime) else value
+
+
+def _chunks(items, size):
+    """Rozdělí seznam na části o nejvýše size prvcích."""
+
+    return (items[start : start + size] for start in range(0, len(items), size))
+
+
+def _sqlite_time(value):
+    """Převede čas na text ve formátu, v jakém ho ukládá SQLite."""
+
+    return value.isoformat(sep=" ", timespec="seconds")
+
+
+def _row_to_task(row):
+    """Převede řádek SQLite na slovník úkolu."""
+
+    task = dict(row)
+    task["created_at"] = datetime.datetime.fromisoformat(task["created_at"])
+    task["updated_at"] = datetime.datetime.fromisoformat(task["updated_at"])
+    return task
@@ -0,0 +1,250 @@
+"""
+task_cache.py: Paměťová cache výsledků čtení úkolů s TTL a LRU vyřazováním.
+
+Cache se zapíná v modulu task_manager_db funkcí enable_task_cache(). Zápisy
+(přidání, změna stavu, odstranění úkolu) neprovádí plošné vymazání cache,
+ale upraví nebo zahodí jen ty položky, kterých se změna skutečně týká.
+Položky se ukládají pro databázi (scope), ze které byly načteny, a zápisy
+mění jen položky stejné databáze. Položky načtené pro jednoho vlastníka
+(owner) se zápisy úkolů jiných vlastníků nemění.
+
+Author: Jan Bláha
+Email: jan.blaha@bcas.cz
+"""
+
+import datetime
+import threading
+import time
+from collections import OrderedDict
+
+
+class TaskCache:
+    """LRU cache výsledků čtení úkolů s omezenou dobou platnosti položek.
+
+    Seznamy úkolů se ukládají spolu s filtrem stavu, začátku názvu a
+    vlastníka, podle kterých se při zápisu rozhoduje, zda je položku nutné
+    zahodit.
+    """
+
+    def __init__(self, ttl=10.0, max_entries=256):
+        """
+        Args:
+            ttl (float): Doba platnosti položky v sekundách.
+            max_entries (int): Maximální počet položek v cache.
+        Raises:
+            ValueError: Pokud jsou zadané neplatné parametry.
+        """
+
+        if ttl <= 0 or max_entries < 1:
+            raise ValueError("Invalid cache settings.")
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, scope=None):
+        """Vrátí kopii uložené hodnoty, nebo None, pokud chybí či vypršela.
+        Args:
+            key (tuple): Klíč položky.
+            scope: Identita databáze, ze které byla hodnota načtena.
+        Returns:
+            Uložená hodnota, nebo None.
+        """
+
+        key = (scope, key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry["expires"] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return _copy(entry["value"])
+
+    def put(
+        self, key, value, state=None, name_prefix=None, limited=False, owner=None, scope=None
+    ):
+        """Uloží hodnotu do cache a případně vyřadí nejdéle nepoužitou položku.
+        Args:
+            key (tuple): Klíč položky.
+            value: Seznam úkolů nebo slovník počtů podle stavu.
+            state (str): Filtr stavu, se kterým byl seznam načten.
+            name_prefix (str): Filtr začátku názvu, se kterým byl seznam načten.
+            limited (bool): True, pokud jde o stránku nebo seznam s limitem.
+            owner (str): Vlastník, pro kterého byla hodnota načtena, None
+                pro čtení bez omezení na vlastníka.
+            scope: Identita databáze, ze které byla hodnota načtena.
+        """
+
+        key = (scope, key)
+        with self._lock:
+            self._entries[key] = {
+                "expires": time.monotonic() + self.ttl,
+                "value": _copy(value),
+                "state": state,
+                "name_prefix": name_prefix,
+                "limited": limited,
+                "owner": owner,
+                "scope": scope,
+            }
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Vymaže celou cache (počítadla zásahů zůstávají)."""
+
+        with self._lock:
+            self._entries.clear()
+
+    def known_task(self, task_id, scope=None):
+        """Zjistí, zda je úkol s daným ID v některém platném seznamu v cache.
+        Args:
+            task_id (int): ID úkolu.
+            scope: Identita databáze úkolu.
+        Returns:
+            bool: True, pokud cache úkol obsahuje.
+        """
+
+        now = time.monotonic()
+        with self._lock:
+            return any(
+                entry["expires"] >= now and _find_row(entry["value"], task_id)
+                for entry in self._entries.values()
+                if entry["scope"] == scope and isinstance(entry["value"], list)
+            )
+
+    def task_added(self, name, state, owner="", scope=None):
+        """Promítne do cache přidání nového úkolu.
+        Seznamy, do kterých by nový úkol mohl patřit, se zahodí; počty
+        podle stavu se jen upraví.
+        Args:
+            name (str): Název nového úkolu.
+            state (str): Stav nového úkolu.
+            owner (str): Vlastník nového úkolu.
+            scope: Identita databáze úkolu.
+        """
+
+        with self._lock:
+            for key, entry in list(self._entries.items()):
+                value = entry["value"]
+                if entry["scope"] != scope or entry["owner"] not in (None, owner):
+                    continue  # položka jiného vlastníka
+                if isinstance(value, dict):
+                    value[state] += 1
+                elif entry["state"] in (None, state) and (
+                    not entry["name_prefix"]
+                    # LIKE v databázi nerozlišuje velikost písmen
+                    or name.casefold().startswith(entry["name_prefix"].casefold())
+                ):
+                    del self._entries[key]
+
+    def task_updated(self, task_id, new_state, owner=None, scope=None):
+        """Promítne do cache změnu stavu úkolu (včetně zvýšení jeho verze).
+        Args:
+            task_id (int): ID úkolu.
+            new_state (str): Nový stav úkolu.
+            owner (str): Vlastník úkolu, pokud byl zápis omezený na vlastníka;
+                None znamená, že vlastník úkolu není známý.
+            scope: Identita databáze úkolu.
+        """
+
+        with self._lock:
+            old_state = self._old_state(task_id, scope)
+            for key, entry in list(self._entries.items()):
+                value = entry["value"]
+                if not _may_own(entry, owner, scope):
+                    continue
+                if isinstance(value, dict):
+                    # počty jednoho vlastníka nejde upravit, když vlastník úkolu není známý
+                    if old_state is None or (owner is None and entry["owner"] is not None):
+                        del self._entries[key]
+                    else:
+                        value[old_state] -= 1
+                        value[new_state] += 1
+                    continue
+                row = _find_row(value, task_id)
+                if row is not None and entry["state"] is None:
+                    row["state"] = new_state
+                    if "version" in row:
+                        # každá změna zvyšuje verzi o 1; čas změny je jen
+                        # přibližný (hodiny klienta), verze ale odpovídá databázi
+                        row["version"] += 1
+                        row["updated_at"] = datetime.datetime.now().replace(microsecond=0)
+                elif row is not None or entry["state"] == new_state:
+                    # úkol ze seznamu vypadl, nebo do něj může nově patřit
+                    del self._entries[key]
+
+    def task_deleted(self, task_id, owner=None, scope=None):
+        """Promítne do cache odstranění úkolu.
+        Seznamy, které úkol neobsahují, zůstávají platné i se stránkováním,
+        protože odstraněný řádek neleží v jejich rozsahu.
+        Args:
+            task_id (int): ID úkolu.
+            owner (str): Vlastník úkolu, pokud byl zápis omezený na vlastníka.
+            scope: Identita databáze úkolu.
+        """
+
+        with self._lock:
+            old_state = self._old_state(task_id, scope)
+            for key, entry in list(self._entries.items()):
+                value = entry["value"]
+                if not _may_own(entry, owner, scope):
+                    continue
+                if isinstance(value, dict):
+                    # počty jednoho vlastníka nejde upravit, když vlastník úkolu není známý
+                    if old_state is None or (owner is None and entry["owner"] is not None):
+                        del self._entries[key]
+                    else:
+                        value[old_state] -= 1
+                    continue
+                row = _find_row(value, task_id)
+                if row is None:
+                    continue
+                if entry["limited"]:
+                    del self._entries[key]  # na stránku by se posunul další úkol
+                else:
+                    value.remove(row)
+
+    def stats(self):
+        """Vrátí počítadla zásahů a výpadků cache.
+        Returns:
+            dict: Počet zásahů, výpadků a aktuálních položek.
+        """
+
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+    def _old_state(self, task_id, scope):
+        """Vrátí stav úkolu podle některého seznamu v cache, nebo None."""
+
+        for entry in self._entries.values():
+            if entry["scope"] == scope and isinstance(entry["value"], list):
+                row = _find_row(entry["value"], task_id)
+                if row is not None:
+                    return row["state"]
+        return None
+
+
+def _may_own(entry, owner, scope):
+    """Zjistí, zda se položky cache může týkat úkol daného vlastníka a databáze."""
+
+    return entry["scope"] == scope and (owner is None or entry["owner"] in (None, owner))
+
+
+def _find_row(rows, task_id):
+    """Najde v seznamu úkolů řádek s daným ID."""
+
+    return next((row for row in rows if row["id"] == task_id), None)
+
+
+def _copy(value):
+    """Vytvoří kopii hodnoty, aby volající nemohl změnit obsah cache."""
+
+    if isinstance(value, list):
+        return [dict(row) for row in value]
+    return dict(value)
@@ -0,0 +1,398 @@
+"""
+task_cli.py: Neinteraktivní rozhraní příkazové řádky pro skripty a cron.
+
+Podpříkazy add, list, update, delete, import, export, archive, changes,
+purge-changes a sync používají stejnou konfiguraci jako interaktivní aplikace
+a výsledek vypisují ve strojově čitelném formátu (JSON nebo TSV). Pomalé
+importy se odkládají: soubor .env (python-dotenv) se čte jen tehdy, když
+konfiguraci nepředal už volající proces v proměnných prostředí, a ovladač
+MySQL se načte až při připojení.
+
+Spuštění:
+    python main.py list --state pending --format json
+    python main.py add "Název" "Popis"
+    python main.py update 1,4,7-12 --state completed
+    python main.py delete --from-state completed --older-than 30
+    python main.py export --format csv --output ukoly.csv
+    python main.py archive --older-than 90
+    python main.py changes --since 1234
+    python main.py list --owner projekt-a
+    python main.py sync --replica ukoly_offline.db
+
+Volba --owner (výchozí proměnná prostředí TASK_OWNER) omezí příkazy add,
+list, update, delete, import, export, changes a sync na úkoly jednoho
+vlastníka.
+
+Návratový kód je 0 při úspěchu, 1 při chybě nebo pokud některé úkoly
+nebyly nalezeny či importovány, 2 při chybných argumentech.
+
+Author: Jan Bláha
+Email: jan.blaha@bcas.cz
+"""
+
+import argparse
+import datetime
+import json
+import os
+import sys
+
+from src import task_manager_db
+from src.task_io import LIST_FIELDS, export_tasks, import_tasks, write_tasks
+
+# Nejvyšší počet ID v jednom argumentu (např. 1-100000), větší rozsahy se
+# odmítnou dřív, než by se rozepsaly do paměti.
+MAX_TASK_IDS = 100000
+
+
+def _db_settings():
+    """Načte konfiguraci připojení z proměnných prostředí, případně z .env.
+    Returns:
+        tuple: (host, user, password, database, backend, connect_timeout,
+            read_timeout).
+    Raises:
+        ValueError: Pokud časový limit není celé číslo.
+    """
+
+    # cron a skripty mohou konfiguraci předat přímo, .env se pak nečte
+    if "DB_NAME" not in os.environ:
+        from dotenv import load_dotenv
+
+        load_dotenv()
+    return (
+        os.getenv("DB_HOST"),
+        os.getenv("DB_USER"),
+        os.getenv("DB_PASSWORD"),
+        os.getenv("DB_NAME"),
+        os.getenv("DB_BACKEND", "mysql").lower(),
+        int(os.getenv("DB_CONNECT_TIMEOUT", task_manager_db.CONNECT_TIMEOUT)),
+        int(os.getenv("DB_READ_TIMEOUT", task_manager_db.READ_TIMEOUT)),
+    )
+
+
+def _task_ids(text):
+    """Převede zápis ID (např. "1,4,7-12") na seznam čísel pro argparse."""
+
+    ids = []
+    for part in text.split(","):
+        start, _, end = part.strip().partition("-")
+        if not start.isdigit() or (end and not end.isdigit()) or int(start) > int(end or start):
+            raise argparse.ArgumentTypeError(f"invalid task id: {part!r}")
+        start, end = int(start), int(end or start)
+        if len(ids) + end - start + 1 > MAX_TASK_IDS:
+            raise argparse.ArgumentTypeError(f"too many task ids (max {MAX_TASK_IDS}): {text!r}")
+        ids.extend(range(start, end + 1))
+    return ids
+
+
+def _days_ago(days):
+    """Vrátí čas před daným počtem dní, nebo None."""
+
+    if days is None:
+        return None
+    return datetime.datetime.now() - datetime.timedelta(days=days)
+
+
+def _selection(args):
+    """Vrátí výběr úkolů (ID, nebo filtr) pro update a delete."""
+
+    task_ids = [task_id for ids in args.ids for task_id in ids] or None
+    return task_ids, args.from_state, _days_ago(args.older_than)
+
+
+def cmd_add(connection, args):
+    """Přidá úkol; vrátí jeho ID."""
+
+    task_id = task_manager_db.add_task(
+        connection, args.name, args.description, args.state, owner=args.owner
+    )
+    return {"id": task_id}, True
+
+
+def cmd_list(connection, args):
+    """Vrátí úkoly podle filtrů, nebo výsledky fulltextového vyhledávání."""
+
+    if args.search:
+        tasks = task_manager_db.search_tasks(
+            connection, args.search, args.limit or 20, owner=args.owner
+        )
+    else:
+        tasks = task_manager_db.get_tasks(
+            connection,
+            state=args.state,
+            name_prefix=args.prefix,
+            limit=args.limit,
+            order=args.order,
+            include_archived=args.archived,
+            owner=args.owner,
+        )
+    return tasks, True
+
+
+def cmd_update(connection, args):
+    """Změní stav vybraných úkolů; vrátí počet a chybějící ID."""
+
+    task_ids, state, created_before = _selection(args)
+    count, missing = task_manager_db.update_task_states(
+        connection, args.state, task_ids, state, created_before, owner=args.owner
+    )
+    return {"updated": count, "missing": missing}, not missing
+
+
+def cmd_delete(connection, args):
+    """Odstraní vybrané úkoly; vrátí počet a chybějící ID."""
+
+    task_ids, state, created_before = _selection(args)
+    count, missing = task_manager_db.delete_tasks(
+        connection, task_ids, state, created_before, owner=args.owner
+    )
+    return {"deleted": count, "missing": missing}, not missing
+
+
+def cmd_import(connection, args):
+    """Importuje úkoly ze souboru; vrátí počet a chyby (číslo záznamu, hláška)."""
+
+    checkpoint = args.path if args.resume else None
+    count, errors = import_tasks(
+        connection,
+        args.path,
+        args.chunk_size,
+        checkpoint,
+        owner=args.owner,
+        restore=args.restore,
+    )
+    errors = [[index + 1, message] for index, message in errors]
+    return {"inserted": count, "errors": errors}, not errors
+
+
+def cmd_export(connection, args):
+    """Zapíše všechny úkoly na stdout, nebo do souboru a vrátí souhrn."""
+
+    if not args.output:
+        tasks = task_manager_db.iter_tasks(connection, owner=args.owner, with_owner=True)
+        write_tasks(sys.stdout, tasks, args.format or "jsonl")
+        return None, True
+    count = export_tasks(connection, args.output, args.format, args.compression, owner=args.owner)
+    return {"exported": count, "path": args.output}, True
+
+
+def cmd_archive(connection, args):
+    """Přesune staré dokončené úkoly do archivu; vrátí jejich počet."""
+
+    count = task_manager_db.archive_completed_tasks(
+        connection, _days_ago(args.older_than), args.chunk_size
+    )
+    return {"archived": count}, True
+
+
+def cmd_changes(connection, args):
+    """Vrátí úkoly změněné od tokenu a token pro další volání."""
+
+    changes = task_manager_db.get_changes_since(
+        connection, args.since, args.limit, owner=args.owner
+    )
+    return changes, True
+
+
+def cmd_purge_changes(connection, args):
+    """Odstraní starší záznamy logu změn; vrátí jejich počet."""
+
+    count = task_manager_db.purge_changes(connection, _days_ago(args.older_than))
+    return {"purged": count}, True
+
+
+def cmd_sync(connection, args):
+    """Synchronizuje místní repliku se serverem; vrátí souhrn synchronizace."""
+
+    replica = task_manager_db.open_replica(args.replica, args.owner)
+    try:
+        result = task_manager_db.sync_replica(replica, connection, args.limit)
+    finally:
+        task_manager_db.close_connection(replica)
+    return result, not result["pending"]
+
+
+def build_parser():
+    """Sestaví parser argumentů se všemi podpříkazy.
+    Returns:
+        argparse.ArgumentParser: Parser příkazové řádky.
+    """
+
+    parser = argparse.ArgumentParser(
+        prog="main.py", description="Task manager - neinteraktivní příkazy."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    output = argparse.ArgumentParser(add_help=False)
+    output.add_argument("--format", choices=["json", "tsv"], default="json")
+    scope = argparse.ArgumentParser(add_help=False)
+    scope.add_argument(
+        "--owner", help="vlastník úkolů (uživatel nebo projekt), výchozí proměnná TASK_OWNER"
+    )
+    states = task_manager_db.TASK_STATES
+
+    add = commands.add_parser("add", parents=[output, scope], help="přidá úkol a vypíše jeho ID")
+    add.add_argument("name")
+    add.add_argument("description")
+    add.add_argument("--state", choices=states, default="pending")
+    add.set_defaults(handler=cmd_add)
+
+    list_ = commands.add_parser("list", parents=[output, scope], help="vypíše úkoly")
+    list_.add_argument("--state", choices=states)
+    list_.add_argument("--prefix", help="začátek názvu úkolu")
+    list_.add_argument("--search", help="fulltextové vyhledávání (řazeno podle relevance)")
+    list_.add_argument("--limit", type=int)
+    list_.add_argument("--order", choices=["asc", "desc"], default="asc")
+    list_.add_argument("--archived", action="store_true", help="včetně archivovaných úkolů")
+    list_.set_defaults(handler=cmd_list)
+
+    for name, handler, help_text in (
+        ("update", cmd_update, "změní stav úkolů podle ID nebo filtru"),
+        ("delete", cmd_delete, "odstraní úkoly podle ID nebo filtru"),
+    ):
+        command = commands.add_parser(name, parents=[output, scope], help=help_text)
+        command.add_argument("ids", nargs="*", type=_task_ids, help="ID úkolů, např. 1,4,7-12")
+        command.add_argument("--from-state", choices=states, help="jen úkoly v tomto stavu")
+        command.add_argument(
+            "--older-than", type=int, metavar="DAYS", help="jen úkoly starší než DAYS dní"
+        )
+        if name == "update":
+            command.add_argument("--state", choices=states, required=True, help="nový stav")
+        command.set_defaults(handler=handler)
+
+    import_ = commands.add_parser(
+        "import", parents=[output, scope], help="importuje úkoly ze souboru"
+    )
+    import_.add_argument("path", help="soubor .jsonl, .csv, .tsv nebo .parquet (i .gz/.zst)")
+    import_.add_argument("--chunk-size", type=int, default=1000)
+    import_.add_argument(
+        "--resume", action="store_true", help="pokračovat po přerušení (průběh je v databázi)"
+    )
+    import_.add_argument(
+        "--restore", action="store_true", help="obnovit zálohu z exportu včetně ID a časů"
+    )
+    import_.set_defaults(handler=cmd_import)
+
+    export = commands.add_parser(
+        "export", parents=[scope], help="exportuje všechny úkoly (JSONL/CSV/TSV/Parquet)"
+    )
+    export.add_argument(
+        "--format",
+        choices=["jsonl", "csv", "tsv", "parquet"],
+        help="výchozí podle přípony souboru, na stdout jsonl",
+    )
+    export.add_argument("--compression", choices=["gzip", "zstd"])
+    export.add_argument("--output", help="cílový soubor, např. ukoly.jsonl.gz (výchozí stdout)")
+    export.set_defaults(handler=cmd_export)
+
+    archive = commands.add_parser(
+        "archive", parents=[output], help="přesune staré dokončené úkoly do archivu"
+    )
+    archive.add_argument(
+        "--older-than",
+        type=int,
+        metavar="DAYS",
+        required=True,
+        help="úkoly dokončené (naposledy změněné) před více než DAYS dny",
+    )
+    archive.add_argument("--chunk-size", type=int, default=1000, help="úkolů v jedné transakci")
+    archive.set_defaults(handler=cmd_archive)
+
+    changes = commands.add_parser(
+        "changes",
+        parents=[scope],
+        help="vypíše úkoly změněné od tokenu (JSON, bez tokenu jen aktuální token)",
+    )
+    changes.add_argument("--since", type=int, metavar="TOKEN", help="token z minulého volání")
+    changes.add_argument("--limit", type=int, default=1000)
+    changes.set_defaults(handler=cmd_changes)
+
+    purge = commands.add_parser("purge-changes", parents=[output], help="zkrátí log změn")
+    purge.add_argument(
+        "--older-than", type=int, metavar="DAYS", required=True, help="změny starší než DAYS dní"
+    )
+    purge.set_defaults(handler=cmd_purge_changes)
+
+    sync = commands.add_parser(
+        "sync", parents=[output, scope], help="synchronizuje místní repliku pro práci offline"
+    )
+    sync.add_argument("--replica", required=True, help="soubor SQLite s replikou úkolů")
+    sync.add_argument("--limit", type=int, default=1000, help="změn nebo úkolů v jednom dotazu")
+    sync.set_defaults(handler=cmd_sync)
+    return parser
+
+
+def print_result(result, output_format):
+    """Vypíše výsledek příkazu jako JSON nebo TSV.
+    Args:
+        result: Seznam úkolů, nebo slovník se souhrnem.
+        output_format (str): 'json' nebo 'tsv'.
+    """
+
+    if output_format == "json":
+        print(json.dumps(result, ensure_ascii=False, default=_json_default))
+    elif isinstance(result, list):
+        write_tasks(sys.stdout, result, "tsv", LIST_FIELDS)
+    else:
+        for key, value in result.items():
+            if isinstance(value, list) and value and isinstance(value[0], list):
+                for item in value:  # např. chyby importu, každá na vlastní řádek
+                    print(key, *item, sep="\t")
+            elif isinstance(value, list):
+                print(key, ",".join(map(str, value)), sep="\t")
+            else:
+                print(key, value, sep="\t")
+
+
+def _json_default(value):
+    """Převede čas na text pro json.dumps."""
+
+    if isinstance(value, datetime.datetime):
+        return value.isoformat(sep=" ")
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _error_message(error):
+    """Vrátí hlášku chyby pro stderr; u chybějícího schématu s radou, jak
+    databázi inicializovat."""
+
+    if isinstance(error, task_manager_db.SchemaMissingError):
+        return f"{error} (run main.py without arguments to initialize the database)"
+    if isinstance(error, task_manager_db.ServerUnreachableError):
+        return f"database server is unreachable: {error}"
+    return str(error)
+
+
+def run(argv=None):
+    """Zpracuje argumenty příkazové řádky a provede podpříkaz.
+    Args:
+        argv (list): Argumenty bez názvu programu, výchozí sys.argv[1:].
+    Returns:
+        int: Návratový kód procesu.
+    """
+
+    args = build_parser().parse_args(argv)
+    connection = None
+    try:
+        connection = task_manager_db.connect_to_database(*_db_settings())
+        if "owner" in args and args.owner is None:
+            args.owner = os.getenv("TASK_OWNER")  # .env už načetla funkce _db_settings
+        result, ok = args.handler(connection, args)
+    except Exception as e:
+        # chyby ovladače MySQL (např. chybějící tabulka) podle příčiny
+        error = task_manager_db.database_error(e) or e
+        if not isinstance(error, (ConnectionError, OSError, RuntimeError, ValueError)):
+            raise
+        print(f"error: {_error_message(error)}", file=sys.stderr)
+        return 1
+    finally:
+        task_manager_db.close_connection(connection)
+
+    if result is not None:
+        # export má vlastní formáty souboru a changes vrací vnořená data,
+        # jejich výsledek se vypisuje jako JSON
+        output_format = getattr(args, "format", None)
+        print_result(result, output_format if output_format in ("json", "tsv") else "json")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(run())
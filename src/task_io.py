@@ -0,0 +1,395 @@
+"""
+task_io.py: Streamovaný import a export úkolů (JSONL, CSV, TSV, Parquet).
+
+Soubory se čtou i zapisují postupně, v paměti je vždy jen jedna dávka
+řádků, takže lze přenášet i tabulky s miliony úkolů. Formát a komprese
+(gzip, zstd) se určují podle přípony souboru, např. ukoly.jsonl.gz.
+Parquet (pyarrow) a zstd (zstandard) jsou volitelné závislosti, načítají
+se až při použití.
+
+Author: Jan Bláha
+Email: jan.blaha@bcas.cz
+"""
+
+import csv
+import datetime
+import gzip
+import importlib
+import itertools
+import json
+import os
+
+from src import task_manager_db
+
+# Sloupce exportovaných úkolů v pořadí, v jakém se zapisují. Export obsahuje
+# všechny sloupce úkolu, aby ho šlo obnovit (import_tasks(..., restore=True)).
+EXPORT_FIELDS = (
+    "id",
+    "name",
+    "description",
+    "state",
+    "created_at",
+    "version",
+    "updated_at",
+    "owner",
+)
+
+# Sloupce výpisu úkolů (get_tasks), např. v CLI.
+LIST_FIELDS = EXPORT_FIELDS[:5]
+
+# Sloupce, ze kterých se načítají nové úkoly.
+TASK_FIELDS = ("name", "description", "state")
+
+# Podporované formáty a komprese podle přípony souboru.
+FILE_FORMATS = {".jsonl": "jsonl", ".csv": "csv", ".tsv": "tsv", ".parquet": "parquet"}
+COMPRESSIONS = {".gz": "gzip", ".zst": "zstd"}
+
+
+def read_tasks_file(path, file_format=None, compression=None):
+    """Postupně načítá úkoly ze souboru JSONL, CSV, TSV nebo Parquet.
+    Formát a komprese se určí podle přípony souboru, pokud nejsou zadané.
+    CSV a TSV soubor musí mít hlavičku se sloupci name, description
+    a volitelně state; JSONL obsahuje na každém řádku objekt se stejnými
+    klíči. Ostatní sloupce (např. id z exportu) se ignorují. Chybějící stav
+    se doplní jako 'pending'.
+    Args:
+        path (str): Cesta k souboru.
+        file_format (str): 'jsonl', 'csv', 'tsv' nebo 'parquet'.
+        compression (str): 'gzip', 'zstd' nebo None.
+    Yields:
+        tuple: N-tice (name, description, state).
+    Raises:
+        ValueError: Pokud formát nebo komprese nejsou podporované nebo záznam
+            souboru není platný (řádek JSONL, který není objekt JSON).
+        RuntimeError: Pokud chybí volitelná závislost pro daný formát.
+    """
+
+    for record in _read_records(path, file_format, compression, TASK_FIELDS):
+        if isinstance(record, ValueError):
+            raise record
+        yield _to_task(record)
+
+
+def _read_records(path, file_format, compression, columns):
+    """Postupně načítá záznamy souboru jako slovníky.
+    Args:
+        path (str): Cesta k souboru.
+        file_format (str): Formát souboru; výchozí podle přípony.
+        compression (str): Komprese souboru; výchozí podle přípony.
+        columns (tuple): Sloupce, které se z Parquetu načtou (pokud v něm jsou).
+    Yields:
+        dict: Záznam souboru, nebo ValueError místo neplatného řádku JSONL,
+            aby jeden vadný řádek nezastavil čtení ostatních.
+    """
+
+    file_format, compression = _detect_format(path, file_format, compression)
+    if file_format == "parquet":
+        parquet = _optional("pyarrow.parquet").ParquetFile(path)
+        columns = [name for name in columns if name in parquet.schema.names]
+        for batch in parquet.iter_batches(batch_size=10000, columns=columns):
+            yield from batch.to_pylist()
+    elif file_format in ("csv", "tsv"):
+        with _open_text(path, "r", compression) as file:
+            delimiter = "," if file_format == "csv" else "\t"
+            yield from csv.DictReader(file, delimiter=delimiter)
+    else:
+        with _open_text(path, "r", compression) as file:
+            for line in file:
+                if line.strip():
+                    yield _parse_record(line)
+
+
+def _parse_record(line):
+    """Načte jeden řádek JSONL jako slovník.
+    Returns:
+        dict: Záznam, nebo ValueError, pokud řádek není objekt JSON.
+    """
+
+    try:
+        record = json.loads(line)
+    except ValueError:
+        return ValueError("Invalid JSON record.")
+    if not isinstance(record, dict):
+        return ValueError("Invalid task record.")
+    return record
+
+
+def _to_task(record):
+    """Převede načtený záznam na n-tici (name, description, state)."""
+
+    return (
+        record.get("name"),
+        record.get("description"),
+        record.get("state") or "pending",
+    )
+
+
+def _to_restored_task(record):
+    """Převede záznam zálohy na slovník úkolu pro task_manager_db.restore_tasks.
+    Čísla a časy zapsané jako text (CSV, JSONL) převede; hodnoty, které převést
+    nelze, ponechá beze změny, aby je restore_tasks ohlásil jako neplatné.
+    """
+
+    task = {field: record.get(field) for field in EXPORT_FIELDS}
+    for field in ("id", "version"):
+        if isinstance(task[field], str) and task[field].isdigit():
+            task[field] = int(task[field])
+    for field in ("created_at", "updated_at"):
+        if isinstance(task[field], str):
+            try:
+                task[field] = datetime.datetime.fromisoformat(task[field])
+            except ValueError:
+                pass
+    return task
+
+
+def write_tasks(file, tasks, file_format="jsonl", fields=EXPORT_FIELDS):
+    """Postupně zapíše úkoly do otevřeného textového souboru.
+    Úkoly se zapisují po jednom, lze tedy předat i generátor (iter_tasks).
+    Args:
+        file: Soubor otevřený pro zápis textu (i sys.stdout).
+        tasks (iterable): Úkoly jako slovníky s klíči fields.
+        file_format (str): 'jsonl', 'csv' nebo 'tsv' (s hlavičkou).
+        fields (tuple): Zapisované sloupce, např. LIST_FIELDS pro výpis get_tasks.
+    Returns:
+        int: Počet zapsaných úkolů.
+    Raises:
+        ValueError: Pokud formát není podporovaný.
+    """
+
+    if file_format not in ("jsonl", "csv", "tsv"):
+        raise ValueError("Unsupported file format.")
+    writer = None
+    if file_format != "jsonl":
+        writer = csv.writer(
+            file, delimiter="," if file_format == "csv" else "\t", lineterminator="\n"
+        )
+        writer.writerow(fields)
+
+    count = 0
+    for task in tasks:
+        row = {}
+        for field in fields:
+            value = task[field]
+            if isinstance(value, datetime.datetime):
+                value = value.isoformat(sep=" ")
+            row[field] = value
+        if writer is None:
+            file.write(json.dumps(row, ensure_ascii=False) + "\n")
+        else:
+            writer.writerow(row.values())
+        count += 1
+    return count
+
+
+def export_tasks(
+    connection, path, file_format=None, compression=None, batch_size=10000, owner=None
+):
+    """Exportuje celou tabulku úkolů do souboru v konstantní paměti.
+    Úkoly se čtou nebufferovaným kurzorem (iter_tasks) po dávkách a rovnou
+    zapisují, včetně verzí, časů změny a vlastníků (EXPORT_FIELDS), takže
+    soubor slouží i jako záloha pro import_tasks(..., restore=True). Soubor
+    se zapisuje pod dočasným názvem a přejmenuje se až po úspěšném
+    dokončení, takže nedokončený export nepřepíše předchozí.
+    Args:
+        connection: Připojení k databázi.
+        path (str): Cílový soubor, např. ukoly.jsonl.gz nebo ukoly.parquet.
+        file_format (str): 'jsonl', 'csv', 'tsv' nebo 'parquet'; výchozí podle přípony.
+        compression (str): 'gzip' nebo 'zstd'; výchozí podle přípony. U Parquetu
+            jde o kompresi uvnitř souboru (výchozí zstd).
+        batch_size (int): Počet řádků načtených a zapsaných najednou.
+        owner (str): Exportuje jen úkoly daného vlastníka.
+    Returns:
+        int: Počet exportovaných úkolů.
+    Raises:
+        ValueError: Pokud formát nebo komprese nejsou podporované.
+        RuntimeError: Pokud chybí volitelná závislost pro daný formát.
+    """
+
+    file_format, compression = _detect_format(path, file_format, compression)
+    temp_path = path + ".part"
+    tasks = task_manager_db.iter_tasks(connection, batch_size, owner, with_owner=True)
+    try:
+        if file_format == "parquet":
+            count = _write_parquet(temp_path, tasks, compression or "zstd", batch_size)
+        else:
+            with _open_text(temp_path, "w", compression) as file:
+                count = write_tasks(file, tasks, file_format)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    finally:
+        tasks.close()
+    return count
+
+
+def import_tasks(
+    connection,
+    path,
+    chunk_size=1000,
+    checkpoint=None,
+    file_format=None,
+    compression=None,
+    owner=None,
+    restore=False,
+):
+    """Importuje úkoly ze souboru po dávkách hromadných vložení.
+    Řádky se ověřují stejně jako v add_task(), neplatné se přeskočí a vrátí
+    v seznamu chyb. Bez restore dostanou úkoly nová ID a časy, s restore se
+    soubor z export_tasks obnoví i s ID, časy, verzemi a vlastníky
+    (task_manager_db.restore_tasks); úkoly s již existujícím ID se přeskočí.
+    Pokud je zadaný checkpoint, ukládá se počet zpracovaných záznamů do
+    databáze ve stejné transakci jako každá dávka, takže po pádu import
+    se stejným checkpointem pokračuje přesně za poslední potvrzenou dávkou.
+    Po úspěšném dokončení se checkpoint smaže.
+    Args:
+        connection: Připojení k databázi.
+        path (str): Zdrojový soubor (JSONL, CSV, TSV, Parquet, i komprimovaný).
+        chunk_size (int): Počet úkolů vložených v jedné transakci.
+        checkpoint (str): Název průběhu importu (nejvýše 255 znaků), None bez
+            možnosti navázání.
+        file_format (str): Formát souboru; výchozí podle přípony.
+        compression (str): Komprese souboru; výchozí podle přípony.
+        owner (str): Vlastník importovaných úkolů, None pro společný seznam
+            (při restore vlastníci ze souboru).
+        restore (bool): Obnoví úkoly se zachovanými hodnotami ze zálohy.
+    Returns:
+        tuple: Počet vložených úkolů a seznam chyb ve tvaru
+            (pořadí záznamu v souboru, chybová hláška).
+    Raises:
+        ValueError: Pokud formát není podporovaný nebo checkpoint je
+            neplatný či patří k jinému souboru.
+        RuntimeError: Pokud chybí volitelná závislost pro daný formát.
+    """
+
+    if chunk_size < 1:
+        raise ValueError("Invalid chunk size.")
+    if checkpoint is not None and (
+        not isinstance(checkpoint, str) or not 0 < len(checkpoint) <= 255
+    ):
+        raise ValueError("Invalid checkpoint.")
+    source = os.path.abspath(path)
+    position = _load_checkpoint(connection, checkpoint, source)
+    columns, convert = (EXPORT_FIELDS, _to_restored_task) if restore else (TASK_FIELDS, _to_task)
+    records = itertools.islice(
+        _read_records(path, file_format, compression, columns), position, None
+    )
+
+    inserted = 0
+    errors = []
+    while chunk := list(itertools.islice(records, chunk_size)):
+        progress = None
+        if checkpoint:
+            progress = (checkpoint, source, position + len(chunk))
+        # neplatné záznamy souboru se ohlásí hned, ostatní se vloží; valid
+        # drží pořadí záznamů v dávce pro převod pořadí chyb z add_tasks
+        valid = []
+        for index, record in enumerate(chunk):
+            if isinstance(record, ValueError):
+                errors.append((position + index, str(record)))
+            else:
+                valid.append((index, convert(record)))
+        tasks = [task for _, task in valid]
+        if restore:
+            if owner is not None:
+                tasks = [{**task, "owner": owner} for task in tasks]
+            count, chunk_errors = task_manager_db.restore_tasks(
+                connection, tasks, chunk_size, progress=progress
+            )
+        else:
+            scope = {} if owner is None else {"owner": owner}
+            count, chunk_errors = task_manager_db.add_tasks(
+                connection, tasks, chunk_size, progress=progress, **scope
+            )
+        inserted += count
+        errors.extend(
+            (position + valid[index][0], message) for index, message in chunk_errors
+        )
+        position += len(chunk)
+    errors.sort(key=lambda error: error[0])
+    if checkpoint:
+        task_manager_db.clear_import_progress(connection, checkpoint)
+    return inserted, errors
+
+
+def _detect_format(path, file_format=None, compression=None):
+    """Určí formát a kompresi souboru, chybějící údaje podle přípony.
+    Returns:
+        tuple: Formát a komprese (nebo None).
+    Raises:
+        ValueError: Pokud formát nebo komprese nejsou podporované.
+    """
+
+    name, suffix = os.path.splitext(path)
+    if suffix in COMPRESSIONS:
+        compression = compression or COMPRESSIONS[suffix]
+        suffix = os.path.splitext(name)[1]
+    file_format = file_format or FILE_FORMATS.get(suffix)
+    if file_format not in FILE_FORMATS.values():
+        raise ValueError("Unsupported file format.")
+    if compression not in (None, "gzip", "zstd") and file_format != "parquet":
+        raise ValueError("Unsupported compression.")
+    return file_format, compression
+
+
+def _open_text(path, mode, compression):
+    """Otevře textový soubor, případně s kompresí gzip nebo zstd."""
+
+    if compression == "gzip":
+        return gzip.open(path, mode + "t", encoding="utf-8", newline="")
+    if compression == "zstd":
+        return _optional("zstandard").open(path, mode + "t", encoding="utf-8", newline="")
+    return open(path, mode, encoding="utf-8", newline="")
+
+
+def _write_parquet(path, tasks, compression, batch_size):
+    """Zapíše úkoly do souboru Parquet po skupinách řádků o velikosti batch_size."""
+
+    pa = _optional("pyarrow")
+    parquet = _optional("pyarrow.parquet")
+    schema = pa.schema(
+        [
+            ("id", pa.int64()),
+            ("name", pa.string()),
+            ("description", pa.string()),
+            ("state", pa.string()),
+            ("created_at", pa.timestamp("s")),
+            ("version", pa.int64()),
+            ("updated_at", pa.timestamp("s")),
+            ("owner", pa.string()),
+        ]
+    )
+    count = 0
+    with parquet.ParquetWriter(path, schema, compression=compression) as writer:
+        while batch := list(itertools.islice(tasks, batch_size)):
+            writer.write_batch(pa.RecordBatch.from_pylist(batch, schema=schema))
+            count += len(batch)
+    return count
+
+
+def _load_checkpoint(connection, checkpoint, source):
+    """Vrátí počet již importovaných záznamů podle checkpointu (0, pokud chybí)."""
+
+    if not checkpoint:
+        return 0
+    progress = task_manager_db.get_import_progress(connection, checkpoint)
+    if progress is None:
+        return 0
+    if progress[0] != source:
+        raise ValueError("Checkpoint belongs to a different file.")
+    return progress[1]
+
+
+def _optional(module_name):
+    """Načte volitelnou závislost až při prvním použití.
+    Raises:
+        RuntimeError: Pokud závislost není nainstalovaná.
+    """
+
+    try:
+        return importlib.import_module(module_name)
+    except ImportError:
+        package = module_name.split(".")[0]
+        raise RuntimeError(f"Optional dependency '{package}' is not installed.")
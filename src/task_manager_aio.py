@@ -0,0 +1,141 @@
+"""
+task_manager_aio.py: Asynchronní (asyncio) varianta API modulu task_manager_db.
+
+Blokující funkce task_manager_db se spouští v omezeném poolu vláken a každé
+volání si na dobu trvání zapůjčí připojení z poolu připojení. Ověření vstupů
+a chybové hlášky jsou proto stejné jako u synchronních funkcí. Počet vláken
+odpovídá velikosti poolu, takže souběžné požadavky nad jeho kapacitu čekají
+ve frontě a nevyčerpají připojení k databázi.
+
+Author: Jan Bláha
+Email: jan.blaha@bcas.cz
+"""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from src import task_manager_db
+
+
+class AsyncTaskManager:
+    """Asynchronní přístup k úkolům nad poolem připojení.
+
+    Použití:
+        pool = create_connection_pool(host, user, password, database)
+        async with AsyncTaskManager(pool) as tasks:
+            await tasks.add_task("Název", "Popis", "pending")
+            print(await tasks.get_tasks(state="pending"))
+    """
+
+    def __init__(self, pool, max_workers=None, timeout=5.0):
+        """
+        Args:
+            pool: Pool z create_connection_pool() (libovolný backend).
+            max_workers (int): Počet vláken, výchozí je velikost poolu.
+            timeout (float): Jak dlouho (v sekundách) čekat na volné připojení.
+        """
+
+        self._pool = pool
+        self._timeout = timeout
+        workers = max_workers or getattr(pool, "pool_size", None) or 5
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="task_manager_aio"
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, traceback):
+        await self.close()
+
+    async def close(self):
+        """Počká na dokončení rozběhnutých volání a ukončí pool vláken."""
+
+        await asyncio.get_running_loop().run_in_executor(
+            None, functools.partial(self._executor.shutdown, wait=True)
+        )
+
+    async def _run(self, func, *args, **kwargs):
+        """Spustí funkci task_manager_db ve vlákně s připojením z poolu."""
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, functools.partial(self._call, func, args, kwargs)
+        )
+
+    def _call(self, func, args, kwargs):
+        with task_manager_db.pooled_connection(self._pool, self._timeout) as connection:
+            return func(connection, *args, **kwargs)
+
+    async def add_task(self, name, description, state, owner=None):
+        """Asynchronní varianta task_manager_db.add_task(), vrací ID úkolu."""
+        return await self._run(task_manager_db.add_task, name, description, state, owner)
+
+    async def add_tasks(self, tasks, chunk_size=1000, owner=None):
+        """Asynchronní varianta task_manager_db.add_tasks().
+        Úkoly se před předáním do vlákna načtou do seznamu.
+        """
+        return await self._run(task_manager_db.add_tasks, list(tasks), chunk_size, owner)
+
+    async def get_tasks(self, **filters):
+        """Asynchronní varianta task_manager_db.get_tasks() se stejnými filtry."""
+        return await self._run(task_manager_db.get_tasks, **filters)
+
+    async def get_tasks_page(
+        self, after_created_at=None, after_id=None, limit=20, state=None, owner=None
+    ):
+        """Asynchronní varianta task_manager_db.get_tasks_page()."""
+        return await self._run(
+            task_manager_db.get_tasks_page, after_created_at, after_id, limit, state, owner
+        )
+
+    async def iter_tasks(self, batch_size=1000, owner=None):
+        """Asynchronně postupně vrací všechny úkoly po stránkách.
+        Každá stránka se načte samostatným voláním, připojení se mezi
+        stránkami vrací do poolu.
+        """
+
+        after_created_at, after_id = None, None
+        while page := await self.get_tasks_page(
+            after_created_at, after_id, batch_size, owner=owner
+        ):
+            for task in page:
+                yield task
+            after_created_at, after_id = page[-1]["created_at"], page[-1]["id"]
+
+    async def search_tasks(self, query, limit=20, owner=None):
+        """Asynchronní varianta task_manager_db.search_tasks()."""
+        return await self._run(task_manager_db.search_tasks, query, limit, owner)
+
+    async def count_tasks_by_state(self, owner=None):
+        """Asynchronní varianta task_manager_db.count_tasks_by_state()."""
+        return await self._run(task_manager_db.count_tasks_by_state, owner)
+
+    async def update_task_state(self, task_id, new_state, expected_version=None, owner=None):
+        """Asynchronní varianta task_manager_db.update_task_state()."""
+        return await self._run(
+            task_manager_db.update_task_state, task_id, new_state, expected_version, owner
+        )
+
+    async def delete_task(self, task_id, owner=None, expected_version=None):
+        """Asynchronní varianta task_manager_db.delete_task()."""
+        return await self._run(task_manager_db.delete_task, task_id, owner, expected_version)
+
+    async def update_task_states(self, new_state, task_ids=None, **filters):
+        """Asynchronní varianta task_manager_db.update_task_states()."""
+        if task_ids is not None:
+            task_ids = list(task_ids)
+        return await self._run(
+            task_manager_db.update_task_states, new_state, task_ids, **filters
+        )
+
+    async def delete_tasks(self, task_ids=None, **filters):
+        """Asynchronní varianta task_manager_db.delete_tasks()."""
+        if task_ids is not None:
+            task_ids = list(task_ids)
+        return await self._run(task_manager_db.delete_tasks, task_ids, **filters)
+
+    async def get_changes_since(self, token=None, limit=1000, owner=None):
+        """Asynchronní varianta task_manager_db.get_changes_since()."""
+        return await self._run(task_manager_db.get_changes_since, token, limit, owner)
@@ -2,55 +2,625 @@
 task_manager_db.py: Modul pro správu databáze úkolů pomocí MySQL.
 Poskytuje funkce pro připojení k databázi, inicializaci tabulky úkolů,
 přidání, získání, aktualizaci a odstranění úkolů.
+Místo MySQL lze použít i úložiště SQLite nebo memory (viz task_backends.py).
 
 Author: Jan Bláha
 Email: jan.blaha@bcas.cz
 """
 
-import mysql.connector
-from mysql.connector import Error
+import atexit
+import datetime
+import functools
+import itertools
+import operator
+import random
+import re
+import sqlite3
+import sys
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from contextlib import contextmanager
 
+from src.task_backends import (
+    BACKENDS,
+    FULL_TASK_COLUMNS,
+    TASK_COLUMNS,
+    BackendPool,
+    ChangeTokenExpiredError,
+    PoolExhaustedError,
+    Task,
+    TaskBackend,
+    TaskConflictError,
+    compact_tasks,
+    connect_backend,
+    version_conflicts,
+)
+from src.task_cache import TaskCache
+from src.task_metrics import TaskMetrics, row_count
+from src.task_replica import TaskReplica
+from src.task_writer import TaskWriter
 
-def connect_to_database(host, user, password, database):
+# Povolené stavy úkolu (odpovídají typu ENUM sloupce state).
+TASK_STATES = ("pending", "in_progress", "completed")
+
+# Volitelná cache čtení úkolů, ve výchozím stavu vypnutá (viz enable_task_cache).
+_task_cache = None
+
+# Volitelné metriky databázových operací, ve výchozím stavu vypnuté (viz enable_metrics).
+_metrics = None
+
+# Připravené dotazy (server-side prepared statements) jednotlivých připojení
+# MySQL, viz _execute(). Položka zaniká spolu s připojením.
+_statements = weakref.WeakKeyDictionary()
+_statements_lock = threading.Lock()
+_MAX_STATEMENTS = 32  # nejvýše tolik připravených dotazů na jedno připojení
+
+# Zapisovače odloženého zápisu podle připojení, viz enable_write_behind().
+_writers = {}
+_writers_lock = threading.Lock()
+
+# Výchozí časové limity připojení k MySQL v sekundách: navázání spojení
+# a čekání na odpověď serveru (čtení i zápis na socketu).
+CONNECT_TIMEOUT = 5
+READ_TIMEOUT = 30
+
+# Jak staré (v sekundách) musí být změny v logu MySQL, aby je vrátil
+# get_changes_since(); mladší změna může mít před sebou ještě nepotvrzenou
+# změnu s nižším pořadovým číslem (viz _log_changes).
+CHANGE_SETTLE_TIME = 1.0
+
+# Opakování čtení po přechodné chybě (viz _retry_reads): počet opakování,
+# základ a strop čekání mezi pokusy v sekundách.
+_RETRY_ATTEMPTS = 3
+_RETRY_DELAY = 0.1
+_RETRY_MAX_DELAY = 2.0
+
+# Chyby MySQL, po kterých má smysl dotaz zopakovat: ztráta spojení (2006,
+# 2013, 2055, při obnově 2003) a zablokování transakcí (1205, 1213).
+_CONNECTION_LOST_ERRNOS = {2003, 2006, 2013, 2055}
+_TRANSIENT_ERRNOS = _CONNECTION_LOST_ERRNOS | {1205, 1213}
+
+# Neznámá databáze (ER_BAD_DB_ERROR) a neexistující tabulka (ER_NO_SUCH_TABLE).
+_SCHEMA_MISSING_ERRNOS = {1049, 1146}
+
+
+class ServerUnreachableError(ConnectionError):
+    """Databázový server není dostupný (nelze se připojit, nebo spojení
+    spadlo a nepodařilo se ho obnovit)."""
+
+
+class SchemaMissingError(ConnectionError):
+    """Server je dostupný, ale databáze nebo její schéma chybí či je
+    zastaralé - je potřeba zavolat initialize_database()."""
+
+
+def enable_task_cache(ttl=10.0, max_entries=256):
+    """Zapne paměťovou cache pro get_tasks(), get_tasks_page() a
+    count_tasks_by_state(). Zápisy přes funkce tohoto modulu cache průběžně
+    aktualizují; změny provedené jinými procesy se projeví nejpozději po ttl.
+    Args:
+        ttl (float): Doba platnosti položky v sekundách.
+        max_entries (int): Maximální počet položek v cache.
+    Returns:
+        TaskCache: Zapnutá cache (např. pro čtení počítadel zásahů).
+    """
+
+    global _task_cache
+    _task_cache = TaskCache(ttl, max_entries)
+    return _task_cache
+
+
+def disable_task_cache():
+    """Vypne paměťovou cache čtení úkolů."""
+
+    global _task_cache
+    _task_cache = None
+
+
+def enable_metrics(slow_query_ms=100.0):
+    """Zapne měření databázových operací: latence, vrácené řádky, počet
+    dotazů na server a log pomalých dotazů (logger "task_manager.slow_query").
+    Args:
+        slow_query_ms (float): Práh pro log pomalých dotazů v milisekundách.
+    Returns:
+        TaskMetrics: Zapnuté metriky (export do formátu Prometheus nebo JSON).
+    """
+
+    global _metrics
+    _metrics = TaskMetrics(slow_query_ms)
+    return _metrics
+
+
+def disable_metrics():
+    """Vypne měření databázových operací."""
+
+    global _metrics
+    _metrics = None
+
+
+def _instrumented(func):
+    """Dekorátor, který při zapnutých metrikách změří volání funkce jako
+    jednu operaci pojmenovanou podle funkce."""
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        metrics = _metrics
+        if metrics is None:
+            return func(*args, **kwargs)
+        with metrics.operation(func.__name__) as call:
+            result = func(*args, **kwargs)
+            call.rows = row_count(result)
+            return result
+
+    return wrapper
+
+
+def _retry_reads(func):
+    """Dekorátor čtení z MySQL, který po přechodné chybě (ztráta spojení,
+    zablokování) obnoví připojení a čtení zopakuje. Mezi pokusy čeká
+    exponenciálně déle s náhodným rozptylem, aby se klienti na obnovující
+    se server nepřipojovali všichni najednou. Zápisy se neopakují: po ztrátě
+    spojení během COMMIT není jisté, zda proběhly.
+    Raises:
+        ServerUnreachableError: Pokud se spojení nepodařilo obnovit.
+    """
+
+    @functools.wraps(func)
+    def wrapper(connection, *args, **kwargs):
+        if not connection or isinstance(connection, TaskBackend):
+            return func(connection, *args, **kwargs)
+        mysql = _mysql()
+        for attempt in range(_RETRY_ATTEMPTS + 1):
+            try:
+                if attempt:
+                    _reconnect(connection)
+                return func(connection, *args, **kwargs)
+            except mysql.Error as e:
+                if not _transient(e):
+                    raise
+                if attempt == _RETRY_ATTEMPTS:
+                    if _connection_lost(e):
+                        raise ServerUnreachableError(f"Database connection failed: {e}") from e
+                    raise
+            time.sleep(_backoff(attempt, _RETRY_DELAY, _RETRY_MAX_DELAY))
+
+    return wrapper
+
+
+def _backoff(attempt, delay, max_delay):
+    """Vrátí dobu čekání před dalším pokusem: náhodnou hodnotu až do
+    exponenciálně rostoucího stropu (delay * 2**attempt, nejvýše max_delay)."""
+
+    return random.uniform(0, min(max_delay, delay * 2**attempt))
+
+
+def _connection_lost(error):
+    """Zjistí, zda chyba MySQL znamená ztrátu spojení se serverem."""
+
+    mysql = _mysql()
+    if error.errno in _CONNECTION_LOST_ERRNOS:
+        return True
+    # "MySQL Connection not available" a vypršené časové limity nemají číslo chyby
+    timeouts = tuple(
+        getattr(mysql.errors, name)
+        for name in ("ConnectionTimeoutError", "ReadTimeoutError", "WriteTimeoutError")
+        if hasattr(mysql.errors, name)
+    )
+    return isinstance(error, timeouts) or (
+        error.errno == -1 and isinstance(error, (mysql.InterfaceError, mysql.OperationalError))
+    )
+
+
+def _transient(error):
+    """Zjistí, zda je chyba MySQL přechodná a dotaz má smysl zopakovat."""
+
+    return error.errno in _TRANSIENT_ERRNOS or _connection_lost(error)
+
+
+def _reconnect(connection):
+    """Ověří připojení pomocí ping a spadlé obnoví.
+    Připravené dotazy patří starému spojení, proto se zavřou.
+    """
+
+    _rollback(connection)  # zablokovaná transakce
+    _close_statements(connection)
+    connection.ping(reconnect=True, attempts=1, delay=0)
+
+
+def _rollback(connection):
+    """Zruší otevřenou transakci. Na spadlém spojení rollback sám selže,
+    jeho chyba nesmí zakrýt původní chybu, proto se ignoruje."""
+
+    try:
+        connection.rollback()
+    except _mysql().Error:
+        pass
+
+
+def _write_error(connection, error):
+    """Zruší transakci zápisu, který skončil chybou MySQL, a vrátí výjimku
+    k vyvolání. Ztráta spojení se hlásí jako ServerUnreachableError, zápis
+    se ale neopakuje: po ztrátě spojení během COMMIT není jisté, zda proběhl.
+    Args:
+        connection: Připojení k databázi MySQL.
+        error (mysql.connector.Error): Chyba zápisu.
+    Returns:
+        Exception: ServerUnreachableError, nebo původní chyba.
+    """
+
+    _rollback(connection)
+    if not _connection_lost(error):
+        return error
+    unreachable = ServerUnreachableError(f"Database connection failed: {error}")
+    unreachable.__cause__ = error
+    return unreachable
+
+
+def _connect_error(error):
+    """Převede chybu ovladače MySQL při připojení na výjimku podle příčiny.
+    Returns:
+        ConnectionError: SchemaMissingError, ServerUnreachableError (chyby
+            klienta 2xxx, např. odmítnuté spojení nebo neznámý hostitel),
+            jinak ConnectionError (např. chybné heslo).
+    """
+
+    message = f"Database connection failed: {error}"
+    if error.errno in _SCHEMA_MISSING_ERRNOS:
+        return SchemaMissingError(message)
+    if 2000 <= error.errno < 3000 or _connection_lost(error):
+        return ServerUnreachableError(message)
+    return ConnectionError(message)
+
+
+def database_error(error):
+    """Převede chybu ovladače MySQL na výjimku modulu podle příčiny, aby ji
+    volající rozlišil bez načtení ovladače (např. CLI).
+    Args:
+        error (Exception): Zachycená výjimka.
+    Returns:
+        Exception: SchemaMissingError (chybí databáze nebo tabulka),
+            ServerUnreachableError (server nedostupný, spadlé spojení), jinak
+            RuntimeError; None, pokud nejde o chybu ovladače MySQL.
+    """
+
+    # ovladač se načítá až při připojení, jeho chyba bez něj nemůže vzniknout
+    mysql = sys.modules.get("mysql.connector")
+    if mysql is None or not isinstance(error, mysql.Error):
+        return None
+    if error.errno in _SCHEMA_MISSING_ERRNOS:
+        converted = SchemaMissingError(f"Database schema is missing: {error}")
+    elif 2000 <= (error.errno or 0) < 3000 or _connection_lost(error):
+        converted = ServerUnreachableError(f"Database connection failed: {error}")
+    else:
+        converted = RuntimeError(f"Database error: {error}")
+    converted.__cause__ = error
+    return converted
+
+
+def _stale_cache_on_conflict(func):
+    """Dekorátor, který při konfliktu verzí (TaskConflictError) vymaže cache
+    čtení - klient z ní mohl načíst zastaralou verzi úkolu."""
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        except TaskConflictError:
+            if _task_cache is not None:
+                _task_cache.clear()
+            raise
+
+    return wrapper
+
+
+def _cache_scope(connection):
+    """Vrátí identitu databáze připojení, podle které cache čtení odděluje
+    položky různých databází (viz TaskCache).
+    Args:
+        connection: Připojení k databázi.
+    Returns:
+        tuple: Typ úložiště a jeho umístění.
+    """
+
+    if isinstance(connection, TaskBackend):
+        return connection.identity
+    # vlastnost database by se ptala serveru, stačí databáze zadaná při připojení
+    return (
+        "mysql",
+        connection.server_host,
+        connection.server_port,
+        connection.unix_socket,
+        connection._database,
+    )
+
+
+def _run(cursor, query, params=(), many=False, operation=None):
+    """Provede dotaz na kurzoru (executemany, pokud many) a při zapnutých
+    metrikách ho zaznamená jako jeden dotaz na server (mimo měřenou operaci
+    pod názvem operation)."""
+
+    metrics = _metrics
+    start = time.perf_counter()
+    try:
+        if many:
+            cursor.executemany(query, params)
+        else:
+            cursor.execute(query, params)
+    finally:
+        if metrics is not None:
+            metrics.record_query(query, params, time.perf_counter() - start, operation)
+
+
+def _commit(connection):
+    """Potvrdí transakci; při zapnutých metrikách se COMMIT počítá jako dotaz."""
+
+    metrics = _metrics
+    start = time.perf_counter()
+    connection.commit()
+    if metrics is not None:
+        metrics.record_query("COMMIT", (), time.perf_counter() - start)
+
+
+def _mysql():
+    """Načte ovladač MySQL až při prvním použití.
+    Backendy SQLite a memory ho nepotřebují, takže se bez něj obejdou
+    a spouštějí se rychleji.
+    Returns:
+        module: Modul mysql.connector.
+    """
+
+    import mysql.connector
+    import mysql.connector.pooling
+
+    return mysql.connector
+
+
+def _check_backend(backend):
+    """Ověří název backendu.
+    Raises:
+        ValueError: Pokud backend není podporovaný.
+    """
+
+    if backend not in BACKENDS:
+        raise ValueError("Unsupported database backend.")
+
+
+def _execute(connection, query, params=()):
+    """Provede dotaz připraveným kurzorem z cache daného připojení.
+    Dotaz se na serveru připraví jen při prvním použití, další volání
+    posílají už jen parametry. Kurzor patří cache, volající ho nezavírá,
+    jen z něj načte všechny výsledky.
+    Args:
+        connection: Připojení k databázi MySQL.
+        query (str): SQL dotaz s parametry %s.
+        params (tuple): Parametry dotazu.
+    Returns:
+        cursor: Kurzor s výsledkem dotazu (řádky jako slovníky).
+    """
+
+    with _statements_lock:
+        statements = _statements.setdefault(connection, OrderedDict())
+    entry = statements.get(query)
+    if entry is None:
+        entry = statements[query] = (connection.cursor(prepared=True, dictionary=True), query)
+        while len(statements) > _MAX_STATEMENTS:
+            _, (old_cursor, _) = statements.popitem(last=False)
+            old_cursor.close()
+    else:
+        statements.move_to_end(query)
+
+    # kurzor dotaz znovu připraví, pokud nedostane stejný objekt řetězce,
+    # proto se předává text uložený v cache
+    cursor, query = entry
+    try:
+        _run(cursor, query, params)
+    except _mysql().Error:
+        # po chybě (např. ztrátě spojení) se dotaz příště připraví znovu
+        statements.pop(query, None)
+        _close_cursor(cursor)
+        raise
+    return cursor
+
+
+def _close_statements(connection):
+    """Uzavře všechny připravené kurzory daného připojení.
+    Args:
+        connection: Připojení k databázi.
+    """
+
+    with _statements_lock:
+        statements = _statements.pop(connection, None)
+    for cursor, _ in (statements or {}).values():
+        _close_cursor(cursor)
+
+
+def _close_cursor(cursor):
+    """Uzavře kurzor; chyba spojení při uzavírání se ignoruje."""
+
+    try:
+        cursor.close()
+    except _mysql().Error:
+        pass
+
+
+def connect_to_database(
+    host,
+    user,
+    password,
+    database,
+    backend="mysql",
+    connect_timeout=CONNECT_TIMEOUT,
+    read_timeout=READ_TIMEOUT,
+):
     """Připojí se k databázi MySQL.
     Args:
         host (str): Adresa hostitele databáze.
         user (str): Uživatelské jméno pro připojení k databázi.
         password (str): Heslo pro připojení k databázi.
-        database (str): Název databáze.
+        database (str): Název databáze (u SQLite cesta k souboru).
+        backend (str): Typ úložiště - 'mysql', 'sqlite' nebo 'memory'.
+        connect_timeout (int): Časový limit navázání spojení v sekundách.
+        read_timeout (int): Jak dlouho čekat na odpověď serveru, None bez omezení.
     Returns:
         connection: Objekt připojení k databázi.
     Raises:
-        ConnectionError: Pokud se připojení nezdaří.
+        ServerUnreachableError: Pokud server není dostupný.
+        SchemaMissingError: Pokud databáze na serveru neexistuje.
+        ConnectionError: Pokud se připojení nezdaří z jiného důvodu.
+        ValueError: Pokud backend není podporovaný.
     """
 
+    _check_backend(backend)
+    if backend != "mysql":
+        return connect_backend(backend, database)
+
+    mysql = _mysql()
     try:
-        return mysql.connector.connect(
-            host=host, user=user, password=password, database=database
+        return mysql.connect(
+            host=host,
+            user=user,
+            password=password,
+            database=database,
+            **_timeouts(connect_timeout, read_timeout),
         )
-    except Error as e:
-        raise ConnectionError(f"Database connection failed: {e}")
+    except mysql.Error as e:
+        raise _connect_error(e)
 
 
-def initialize_database(host, user, password, db_name):
-    """Inicializuje databázi a tabulku úkolů, pokud neexistují.
+def _timeouts(connect_timeout, read_timeout):
+    """Vrátí parametry časových limitů pro připojení ovladače MySQL."""
+
+    return {
+        "connection_timeout": connect_timeout,
+        "read_timeout": read_timeout,
+        "write_timeout": read_timeout,
+    }
+
+
+def create_connection_pool(
+    host,
+    user,
+    password,
+    database,
+    pool_size=5,
+    pool_name="task_manager",
+    backend="mysql",
+    connect_timeout=CONNECT_TIMEOUT,
+    read_timeout=READ_TIMEOUT,
+):
+    """Vytvoří pool připojení k databázi MySQL.
+    Připojení z poolu se půjčují pomocí pooled_connection() a lze je předat
+    všem funkcím tohoto modulu místo běžného připojení.
     Args:
         host (str): Adresa hostitele databáze.
         user (str): Uživatelské jméno pro připojení k databázi.
         password (str): Heslo pro připojení k databázi.
-        db_name (str): Název databáze.
+        database (str): Název databáze (u SQLite cesta k souboru).
+        pool_size (int): Maximální počet připojení v poolu.
+        pool_name (str): Název poolu.
+        backend (str): Typ úložiště - 'mysql', 'sqlite' nebo 'memory'.
+        connect_timeout (int): Časový limit navázání spojení v sekundách.
+        read_timeout (int): Jak dlouho čekat na odpověď serveru, None bez omezení.
+    Returns:
+        MySQLConnectionPool: Pool připojení (u jiných backendů BackendPool).
     Raises:
-        RuntimeError: Pokud inicializace databáze selže.
+        ServerUnreachableError: Pokud server není dostupný.
+        SchemaMissingError: Pokud databáze na serveru neexistuje.
+        ConnectionError: Pokud se vytvoření poolu nezdaří z jiného důvodu.
+        ValueError: Pokud backend není podporovaný.
     """
 
+    _check_backend(backend)
+    if backend != "mysql":
+        return BackendPool(backend, database, pool_size)
+
+    mysql = _mysql()
     try:
-        connection = mysql.connector.connect(host=host, user=user, password=password)
+        return mysql.pooling.MySQLConnectionPool(
+            pool_name=pool_name,
+            pool_size=pool_size,
+            pool_reset_session=True,
+            host=host,
+            user=user,
+            password=password,
+            database=database,
+            **_timeouts(connect_timeout, read_timeout),
+        )
+    except mysql.Error as e:
+        raise _connect_error(e)
 
-        cursor = connection.cursor()
-        cursor.execute(f"CREATE DATABASE IF NOT EXISTS {db_name}")
-        connection.database = db_name
 
-        cursor.execute(
+@contextmanager
+def pooled_connection(pool, timeout=5.0, ping_attempts=3, ping_delay=1):
+    """Zapůjčí připojení z poolu a po skončení bloku with ho do poolu vrátí.
+    Před zapůjčením se připojení ověří pomocí ping; pokud mezitím spadlo
+    (např. po restartu serveru), automaticky se znovu připojí. Mezi pokusy
+    o obnovení se čeká exponenciálně déle s náhodným rozptylem.
+    Args:
+        pool (MySQLConnectionPool): Pool připojení.
+        timeout (float): Jak dlouho (v sekundách) čekat na volné připojení.
+        ping_attempts (int): Počet pokusů o obnovení připojení.
+        ping_delay (float): Základ prodlevy mezi pokusy o obnovení v sekundách.
+    Yields:
+        connection: Připojení k databázi.
+    Raises:
+        PoolExhaustedError: Pokud není volné připojení.
+        ServerUnreachableError: Pokud připojení nelze obnovit.
+    """
+
+    if isinstance(pool, BackendPool):
+        connection = pool.acquire(timeout)
+        try:
+            yield connection
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            pool.release(connection)
+        return
+
+    mysql = _mysql()
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            connection = pool.get_connection()
+            break
+        except mysql.errors.PoolError as e:
+            if time.monotonic() >= deadline:
+                raise PoolExhaustedError() from e
+            time.sleep(0.05)
+        except mysql.Error as e:
+            raise _connect_error(e)
+
+    for attempt in range(ping_attempts):
+        try:
+            connection.ping(reconnect=True, attempts=1, delay=0)
+            break
+        except mysql.Error as e:
+            if attempt + 1 == ping_attempts:
+                connection.close()
+                raise ServerUnreachableError(f"Database connection failed: {e}")
+            time.sleep(_backoff(attempt, ping_delay, _RETRY_MAX_DELAY))
+
+    try:
+        yield connection
+    except Exception:
+        _rollback(connection)  # nedokončená transakce se do poolu nevrací
+        raise
+    finally:
+        # vrácené připojení pool resetuje a připravené dotazy tím zanikají
+        _close_statements(connection)
+        connection.close()  # u připojení z poolu znamená vrácení do poolu
+
+
+# Verzované migrace schématu: (verze, seznam SQL příkazů). Nové změny schématu
+# se přidávají vždy na konec seznamu s další verzí, existující se nemění.
+MIGRATIONS = [
+    (
+        1,
+        [
             """
             CREATE TABLE IF NOT EXISTS tasks (
                 id INT AUTO_INCREMENT PRIMARY KEY,
@@ -59,121 +629,2048 @@ def initialize_database(host, user, password, db_name):
                 state ENUM('pending', 'in_progress', 'completed') NOT NULL DEFAULT 'pending',
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
-        """
+            """
+        ],
+    ),
+    (
+        2,
+        [
+            "CREATE INDEX idx_tasks_created_at_id ON tasks (created_at, id)",
+            "CREATE INDEX idx_tasks_state_created_at ON tasks (state, created_at)",
+        ],
+    ),
+    (
+        3,
+        [
+            # fulltextové vyhledávání v názvu a popisu (search_tasks)
+            "ALTER TABLE tasks ADD FULLTEXT INDEX idx_tasks_fulltext (name, description)",
+        ],
+    ),
+    (
+        4,
+        [
+            # verze úkolu pro optimistické zamykání (update_task_state s expected_version)
+            "ALTER TABLE tasks ADD COLUMN version INT NOT NULL DEFAULT 1",
+            "ALTER TABLE tasks ADD COLUMN updated_at TIMESTAMP NOT NULL "
+            "DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP",
+            # starší řádky mohou mít created_at NULL, updated_at je NOT NULL
+            "UPDATE tasks SET updated_at = COALESCE(created_at, CURRENT_TIMESTAMP)",
+        ],
+    ),
+    (
+        5,
+        [
+            # log změn pro get_changes_since, zapisuje ho _log_changes()
+            """
+            CREATE TABLE IF NOT EXISTS task_changes (
+                seq BIGINT NOT NULL PRIMARY KEY,
+                task_id INT NOT NULL,
+                operation ENUM('insert', 'update', 'delete') NOT NULL,
+                changed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                INDEX idx_task_changes_changed_at (changed_at)
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS task_change_seq (
+                id TINYINT NOT NULL PRIMARY KEY,
+                seq BIGINT NOT NULL,
+                purged_seq BIGINT NOT NULL
+            )
+            """,
+            "INSERT IGNORE INTO task_change_seq (id, seq, purged_seq) VALUES (1, 0, 0)",
+        ],
+    ),
+    (
+        6,
+        [
+            # archiv dokončených úkolů (archive_completed_tasks); dělení tabulky
+            # tasks na oddíly podle created_at by vyžadovalo created_at
+            # v primárním klíči, archiv je proto samostatná tabulka
+            """
+            CREATE TABLE IF NOT EXISTS tasks_archive (
+                id INT NOT NULL PRIMARY KEY,
+                name VARCHAR(100) NOT NULL,
+                description VARCHAR(255) NOT NULL,
+                state ENUM('pending', 'in_progress', 'completed') NOT NULL,
+                created_at TIMESTAMP NULL,
+                version INT NOT NULL,
+                updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                archived_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                INDEX idx_tasks_archive_created_at_id (created_at, id)
+            )
+            """,
+            "CREATE INDEX idx_tasks_state_updated_at ON tasks (state, updated_at)",
+        ],
+    ),
+    (
+        7,
+        [
+            # vlastník úkolu (uživatel nebo projekt); indexy začínají vlastníkem,
+            # takže čtení jednoho vlastníka prochází jen jeho rozsah indexu
+            "ALTER TABLE tasks ADD COLUMN owner VARCHAR(50) NOT NULL DEFAULT ''",
+            "CREATE INDEX idx_tasks_owner_created_at ON tasks (owner, created_at, id)",
+            "CREATE INDEX idx_tasks_owner_state_created_at "
+            "ON tasks (owner, state, created_at, id)",
+            "ALTER TABLE tasks_archive ADD COLUMN owner VARCHAR(50) NOT NULL DEFAULT ''",
+            "CREATE INDEX idx_tasks_archive_owner_created_at "
+            "ON tasks_archive (owner, created_at, id)",
+        ],
+    ),
+    (
+        8,
+        [
+            # pořadí změn v logu přiděluje AUTO_INCREMENT, zápisy se už neřadí
+            # za zámek řádku task_change_seq (ten drží jen purged_seq); čas
+            # změny s mikrosekundami pro horizont get_changes_since()
+            "ALTER TABLE task_changes MODIFY seq BIGINT NOT NULL AUTO_INCREMENT, "
+            "MODIFY changed_at TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6)",
+            # čísla navazují na dosud přidělená, i když je log po purge_changes prázdný
+            "SET @next_seq = (SELECT GREATEST(seq, purged_seq) + 1 FROM task_change_seq)",
+            "SET @alter = CONCAT('ALTER TABLE task_changes AUTO_INCREMENT = ', @next_seq)",
+            "PREPARE next_seq FROM @alter",
+            "EXECUTE next_seq",
+            "DEALLOCATE PREPARE next_seq",
+        ],
+    ),
+    (
+        9,
+        [
+            # průběh importů, ukládá se ve stejné transakci jako dávka úkolů
+            """
+            CREATE TABLE IF NOT EXISTS task_imports (
+                checkpoint VARCHAR(255) NOT NULL PRIMARY KEY,
+                source VARCHAR(1024) NOT NULL,
+                records BIGINT NOT NULL
+            )
+            """,
+        ],
+    ),
+]
+
+# Chyby, které při opakovaném spuštění migrace znamenají, že změna už proběhla
+# (1060 - sloupec existuje, 1061 - index existuje).
+_ALREADY_APPLIED_ERRNOS = {1060, 1061}
+
+
+def initialize_database(host, user, password, db_name, backend="mysql"):
+    """Inicializuje databázi a tabulku úkolů, pokud neexistují.
+    Existující databázi aktualizuje na nejnovější verzi schématu.
+    Args:
+        host (str): Adresa hostitele databáze.
+        user (str): Uživatelské jméno pro připojení k databázi.
+        password (str): Heslo pro připojení k databázi.
+        db_name (str): Název databáze (u SQLite cesta k souboru).
+        backend (str): Typ úložiště - 'mysql', 'sqlite' nebo 'memory'.
+    Raises:
+        RuntimeError: Pokud inicializace databáze selže.
+        ValueError: Pokud backend není podporovaný.
+    """
+
+    _check_backend(backend)
+    if backend != "mysql":
+        try:
+            connection = connect_backend(backend, db_name)  # schéma vytvoří samo
+        except ConnectionError as e:
+            raise RuntimeError(f"Database initialization failed: {e}")
+        version = connection.migrate()
+        print(f"Database '{db_name}' and table 'tasks' initialized (schema v{version}).")
+        return
+
+    mysql = _mysql()
+    connection = None
+    try:
+        connection = mysql.connect(
+            host=host, user=user, password=password, connection_timeout=CONNECT_TIMEOUT
         )
 
-        connection.commit()
-        print(f"Database '{db_name}' and table 'tasks' initialized.")
-    except Error as e:
+        cursor = connection.cursor()
+        cursor.execute(f"CREATE DATABASE IF NOT EXISTS {db_name}")
+        connection.database = db_name
+        cursor.close()
+
+        version = migrate_database(connection)
+        print(f"Database '{db_name}' and table 'tasks' initialized (schema v{version}).")
+    except mysql.Error as e:
         raise RuntimeError(f"Database initialization failed: {e}")
     finally:
         if connection:
             connection.close()
 
 
-def add_task(connection, name, description, state):
-    """Přidá nový úkol do tabulky úkolů.
+def migrate_database(connection):
+    """Aplikuje na databázi všechny dosud neprovedené migrace schématu.
+    Aktuální verze schématu je uložena v tabulce schema_version. Migrace je
+    idempotentní, opakované spuštění nic nezmění.
     Args:
         connection: Připojení k databázi.
-        name (str): Název úkolu.
-        description (str): Popis úkolu.
-        state (str): Stav úkolu ('pending', 'in_progress', 'completed').
+    Returns:
+        int: Verze schématu po provedení migrací.
     Raises:
-        RuntimeError: Pokud přidání úkolu selže.
-        ValueError: Pokud jsou zadané neplatné hodnoty.
+        RuntimeError: Pokud není k dispozici připojení k databázi.
     """
 
     if not connection:
         raise RuntimeError("No database connection.")
-    if not name:
-        raise ValueError("Invalid task name.")
-    if not description:
-        raise ValueError("Invalid task description.")
-    if state not in ["pending", "in_progress", "completed"]:
-        raise ValueError("Invalid task state.")
-    if len(name) > 100:
-        raise ValueError("Task name is too long.")
-    if len(description) > 255:
-        raise ValueError("Task description is too long.")
+    if isinstance(connection, TaskBackend):
+        return connection.migrate()
 
+    mysql = _mysql()
     cursor = connection.cursor()
-    cursor.execute(
-        "INSERT INTO tasks (name, description, state) VALUES (%s, %s, %s)",
-        (name, description, state),
-    )
-    connection.commit()
+    try:
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INT NOT NULL PRIMARY KEY,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            """
+        )
+        cursor.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version")
+        current = cursor.fetchone()[0]
+
+        for version, statements in MIGRATIONS:
+            if version <= current:
+                continue
+            for statement in statements:
+                try:
+                    cursor.execute(statement)
+                except mysql.Error as e:
+                    if e.errno not in _ALREADY_APPLIED_ERRNOS:
+                        raise
+            cursor.execute("INSERT INTO schema_version (version) VALUES (%s)", (version,))
+            connection.commit()
+            current = version
+    finally:
+        cursor.close()
+    return current
 
 
-def get_tasks(connection):
-    """Vrátí seznam všech úkolů v databázi.
+def check_schema(connection):
+    """Ověří, že databáze má schéma v nejnovější verzi (bez jeho změny).
+    Úložiště SQLite a memory si schéma vytváří samy při otevření.
     Args:
         connection: Připojení k databázi.
     Returns:
-        dict: Seznam úkolů.
+        int: Verze schématu.
     Raises:
         RuntimeError: Pokud není k dispozici připojení k databázi.
+        SchemaMissingError: Pokud schéma chybí nebo je starší než MIGRATIONS
+            (je potřeba zavolat initialize_database()).
     """
 
     if not connection:
         raise RuntimeError("No database connection.")
-    cursor = connection.cursor(dictionary=True)
-    cursor.execute(
-        "SELECT id, name, description, state, created_at FROM tasks ORDER BY created_at ASC"
-    )
-    return cursor.fetchall()
+    if isinstance(connection, TaskBackend):
+        return connection.migrate()
+
+    mysql = _mysql()
+    cursor = connection.cursor()
+    try:
+        cursor.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version")
+        version = cursor.fetchone()[0]
+    except mysql.Error as e:
+        if e.errno in _SCHEMA_MISSING_ERRNOS:
+            raise SchemaMissingError(f"Database schema is missing: {e}")
+        raise
+    finally:
+        cursor.close()
+    connection.rollback()  # čtení nesmí nechat otevřený snímek dat
+    if version < MIGRATIONS[-1][0]:
+        raise SchemaMissingError("Database schema is outdated.")
+    return version
 
 
-def update_task_state(connection, task_id, new_state):
-    """Aktualizuje stav úkolu v databázi.
+@_instrumented
+def add_task(connection, name, description, state, owner=None):
+    """Přidá nový úkol do tabulky úkolů.
     Args:
         connection: Připojení k databázi.
-        task_id (int): ID úkolu.
-        new_state (str): Nový stav úkolu.
+        name (str): Název úkolu.
+        description (str): Popis úkolu.
+        state (str): Stav úkolu ('pending', 'in_progress', 'completed').
+        owner (str): Vlastník úkolu (uživatel nebo projekt), None pro
+            společný seznam.
+    Returns:
+        int: ID nového úkolu.
     Raises:
-        RuntimeError: Pokud není k dispozici připojení k databázi.
-        ValueError: Pokud je zadaný neplatný stav úkolu.
+        RuntimeError: Pokud přidání úkolu selže.
+        ValueError: Pokud jsou zadané neplatné hodnoty.
     """
 
     if not connection:
         raise RuntimeError("No database connection.")
-    if new_state not in ["pending", "in_progress", "completed"]:
-        raise ValueError("Invalid task state.")
-    if task_id not in { # kontrola platného ID úkolu
-        task["id"] for task in get_tasks(connection)
-    }:
-        raise ValueError("Invalid task ID.")
+    _validate_task(name, description, state)
+    owner = _insert_owner(owner)
 
-    cursor = connection.cursor()
-    cursor.execute("UPDATE tasks SET state = %s WHERE id = %s", (new_state, task_id))
-    connection.commit()
+    if isinstance(connection, TaskBackend):
+        task_id = connection.insert_task(name, description, state, owner)
+    else:
+        try:
+            cursor = _execute(
+                connection,
+                "INSERT INTO tasks (name, description, state, owner) VALUES (%s, %s, %s, %s)",
+                (name, description, state, owner),
+            )
+            task_id = cursor.lastrowid
+            _log_changes(connection, "insert", [task_id])
+            _commit(connection)
+        except _mysql().Error as e:
+            raise _write_error(connection, e)
+    if _task_cache is not None:
+        _task_cache.task_added(name, state, owner, _cache_scope(connection))
+    return task_id
 
 
-def delete_task(connection, task_id):
-    """Odstraní úkol z databáze.
+@_instrumented
+def add_tasks(connection, tasks, chunk_size=1000, owner=None, progress=None):
+    """Hromadně přidá úkoly do tabulky úkolů.
+    Úkoly se vkládají po dávkách pomocí executemany, každá dávka v jedné
+    transakci. Neplatné řádky se přeskočí a vrátí se v seznamu chyb.
     Args:
         connection: Připojení k databázi.
-        task_id (int): ID úkolu.
+        tasks (iterable): Iterovatelný objekt (i generátor) n-tic
+            (name, description, state).
+        chunk_size (int): Počet úkolů vložených v jedné transakci.
+        owner (str): Vlastník všech úkolů, None pro společný seznam.
+        progress (tuple): Průběh importu (checkpoint, zdrojový soubor, počet
+            zpracovaných záznamů), který se uloží ve stejné transakci jako
+            poslední dávka (viz task_io.import_tasks).
+    Returns:
+        tuple: Počet vložených úkolů a seznam chyb ve tvaru
+            (pořadí řádku, chybová hláška).
     Raises:
         RuntimeError: Pokud není k dispozici připojení k databázi.
+        ValueError: Pokud je velikost dávky menší než 1.
     """
 
     if not connection:
         raise RuntimeError("No database connection.")
-    if task_id not in { # kontrola platného ID úkolu
-        task["id"] for task in get_tasks(connection)
-    }:  
-        raise ValueError("Invalid task ID.")
+    if chunk_size < 1:
+        raise ValueError("Invalid chunk size.")
+    owner = _insert_owner(owner)
+
+    inserted = 0
+    errors = []
+    chunk = []
+    for index, task in enumerate(tasks):
+        try:
+            name, description, state = task
+            _validate_task(name, description, state)
+        except (TypeError, ValueError) as e:
+            errors.append((index, str(e)))
+            continue
+        # plná dávka se vloží až s dalším řádkem, průběh tak jde s poslední
+        if len(chunk) == chunk_size:
+            inserted += _insert_chunk(connection, chunk, owner)
+            chunk = []
+        chunk.append((name, description, state))
+    if chunk or progress:
+        inserted += _insert_chunk(connection, chunk, owner, progress)
+    if inserted and _task_cache is not None:
+        _task_cache.clear()
+    return inserted, errors
+
+
+def _insert_chunk(connection, rows, owner="", progress=None):
+    """Vloží dávku již ověřených úkolů v jedné transakci.
+    Args:
+        connection: Připojení k databázi.
+        rows (list): Seznam n-tic (name, description, state).
+        owner (str): Vlastník úkolů.
+        progress (tuple): Průběh importu uložený ve stejné transakci, nebo None.
+    Returns:
+        int: Počet vložených úkolů.
+    """
+
+    if isinstance(connection, TaskBackend):
+        return connection.insert_tasks(rows, owner, progress)
 
     cursor = connection.cursor()
-    cursor.execute("DELETE FROM tasks WHERE id = %s", (task_id,))
-    connection.commit()
+    try:
+        if rows:
+            task_ids = _insert_rows(connection, cursor, [(*row, owner) for row in rows])
+            _log_changes(connection, "insert", task_ids)
+        if progress:
+            _save_progress(cursor, progress)
+        _commit(connection)
+    except _mysql().Error as e:
+        raise _write_error(connection, e)
+    finally:
+        cursor.close()
+    return len(rows)
+
+
+def _insert_rows(connection, cursor, rows):
+    """Vloží řádky (name, description, state, owner) do tabulky úkolů
+    a vrátí jejich ID, ve stejném pořadí.
+    Vícořádkový INSERT (executemany) vrací jen ID prvního řádku. Ostatní ID
+    se z něj dají dopočítat jen v režimech innodb_autoinc_lock_mode 0 a 1,
+    kde InnoDB přiděluje řádkům jednoho INSERT se známým počtem řádků ID po
+    sobě (s krokem auto_increment_increment, např. v clusteru Galera). V
+    režimu 2 se ID souběžných INSERT mohou prokládat, řádky se proto vloží
+    jednotlivě a ID každého se přečte z jeho vlastního INSERT.
+    Args:
+        connection: Připojení k databázi MySQL.
+        cursor: Kurzor pro vícořádkový INSERT.
+        rows (list): Řádky úkolů k vložení.
+    Returns:
+        list: ID vložených úkolů.
+    """
+
+    query = "INSERT INTO tasks (name, description, state, owner) VALUES (%s, %s, %s, %s)"
+    settings = _execute(
+        connection,
+        "SELECT @@auto_increment_increment AS step, @@innodb_autoinc_lock_mode AS lock_mode",
+    ).fetchone()
+    if settings["lock_mode"] < 2:
+        _run(cursor, query, rows, many=True)
+        first, step = cursor.lastrowid, settings["step"]
+        return list(range(first, first + step * len(rows), step))
+    return [_execute(connection, query, row).lastrowid for row in rows]
+
+
+@_instrumented
+def restore_tasks(connection, tasks, chunk_size=1000, progress=None):
+    """Obnoví úkoly ze zálohy (export_tasks) se zachovanými ID, časy
+    vytvoření a poslední změny, verzemi a vlastníky. Úkoly se vkládají po
+    dávkách, každá dávka v jedné transakci. Neplatné úkoly a úkoly, jejichž
+    ID už v tabulce je, se přeskočí a vrátí se v seznamu chyb.
+    Args:
+        connection: Připojení k databázi.
+        tasks (iterable): Slovníky úkolů s klíči id, name, description, state,
+            created_at, version, updated_at a owner (časy jako datetime).
+        chunk_size (int): Počet úkolů vložených v jedné transakci.
+        progress (tuple): Průběh importu uložený ve stejné transakci jako
+            poslední dávka (viz add_tasks).
+    Returns:
+        tuple: Počet obnovených úkolů a seznam chyb ve tvaru
+            (pořadí úkolu, chybová hláška).
+    Raises:
+        RuntimeError: Pokud není k dispozici připojení k databázi.
+        ValueError: Pokud je velikost dávky menší než 1.
+    """
+
+    if not connection:
+        raise RuntimeError("No database connection.")
+    if chunk_size < 1:
+        raise ValueError("Invalid chunk size.")
+
+    inserted = 0
+    errors = []
+    chunk = {}  # ID -> (pořadí úkolu, řádek)
+    for index, task in enumerate(tasks):
+        try:
+            row = _restored_row(task)
+        except (AttributeError, TypeError, ValueError) as e:
+            errors.append((index, str(e)))
+            continue
+        if row[0] in chunk:
+            errors.append((index, "Task ID already exists."))
+            continue
+        if len(chunk) == chunk_size:
+            inserted += _restore_chunk(connection, chunk, errors)
+            chunk = {}
+        chunk[row[0]] = (index, row)
+    if chunk or progress:
+        inserted += _restore_chunk(connection, chunk, errors, progress)
+    errors.sort(key=operator.itemgetter(0))
+    if inserted and _task_cache is not None:
+        _task_cache.clear()
+    return inserted, errors
+
+
+def _restored_row(task):
+    """Ověří úkol ze zálohy a vrátí ho jako n-tici ve sloupcích FULL_TASK_COLUMNS.
+    Raises:
+        ValueError: Pokud je některá hodnota neplatná.
+    """
+
+    task_id = task["id"]
+    if not isinstance(task_id, int) or isinstance(task_id, bool) or task_id < 1:
+        raise ValueError("Invalid task ID.")
+    _validate_task(task["name"], task["description"], task["state"])
+    _check_version(task["version"])
+    owner = _insert_owner(task["owner"])
+    times = (task["created_at"], task["updated_at"])
+    if not all(isinstance(moment, datetime.datetime) for moment in times):
+        raise ValueError("Invalid task time.")
+    return (
+        task_id,
+        task["name"],
+        task["description"],
+        task["state"],
+        task["created_at"],
+        task["version"],
+        task["updated_at"],
+        owner,
+    )
+
+
+def _restore_chunk(connection, chunk, errors, progress=None):
+    """Vloží dávku ověřených úkolů ze zálohy v jedné transakci.
+    Úkoly, jejichž ID už existuje, přidá do seznamu chyb.
+    Args:
+        connection: Připojení k databázi.
+        chunk (dict): ID -> (pořadí úkolu, řádek ve sloupcích FULL_TASK_COLUMNS).
+        errors (list): Seznam chyb, do kterého se přidají existující ID.
+        progress (tuple): Průběh importu uložený ve stejné transakci, nebo None.
+    Returns:
+        int: Počet vložených úkolů.
+    """
+
+    rows = [row for _, row in chunk.values()]
+    if isinstance(connection, TaskBackend):
+        existing = connection.restore_tasks(rows, progress)
+    else:
+        cursor = connection.cursor()
+        try:
+            existing = []
+            for ids in _chunks(list(chunk), 500):
+                placeholders = ", ".join(["%s"] * len(ids))
+                _run(
+                    cursor, f"SELECT id FROM tasks WHERE id IN ({placeholders}) FOR UPDATE", ids
+                )
+                existing.extend(row[0] for row in cursor.fetchall())
+            skipped = set(existing)
+            new_rows = [row for row in rows if row[0] not in skipped]
+            if new_rows:
+                placeholders = ", ".join(["%s"] * len(new_rows[0]))
+                _run(
+                    cursor,
+                    f"INSERT INTO tasks ({FULL_TASK_COLUMNS}) VALUES ({placeholders})",
+                    new_rows,
+                    many=True,
+                )
+                _log_changes(connection, "insert", [row[0] for row in new_rows])
+            if progress:
+                _save_progress(cursor, progress)
+            _commit(connection)
+        except _mysql().Error as e:
+            raise _write_error(connection, e)
+        finally:
+            cursor.close()
+    errors.extend((chunk[task_id][0], "Task ID already exists.") for task_id in existing)
+    return len(rows) - len(existing)
+
+
+def _save_progress(cursor, progress):
+    """Uloží průběh importu (checkpoint, source, records) v otevřené transakci."""
+
+    _run(
+        cursor,
+        "INSERT INTO task_imports (checkpoint, source, records) VALUES (%s, %s, %s) "
+        "ON DUPLICATE KEY UPDATE source = VALUES(source), records = VALUES(records)",
+        progress,
+    )
+
+
+def get_import_progress(connection, checkpoint):
+    """Vrátí uložený průběh importu (viz task_io.import_tasks).
+    Args:
+        connection: Připojení k databázi.
+        checkpoint (str): Název checkpointu.
+    Returns:
+        tuple: Zdrojový soubor a počet zpracovaných záznamů, nebo None.
+    Raises:
+        RuntimeError: Pokud není k dispozici připojení k databázi.
+    """
+
+    if not connection:
+        raise RuntimeError("No database connection.")
+    if isinstance(connection, TaskBackend):
+        return connection.import_progress(checkpoint)
+    cursor = connection.cursor()
+    try:
+        _run(
+            cursor,
+            "SELECT source, records FROM task_imports WHERE checkpoint = %s",
+            (checkpoint,),
+        )
+        row = cursor.fetchone()
+    finally:
+        cursor.close()
+    return None if row is None else (row[0], row[1])
+
+
+def clear_import_progress(connection, checkpoint):
+    """Odstraní uložený průběh dokončeného importu.
+    Args:
+        connection: Připojení k databázi.
+        checkpoint (str): Název checkpointu.
+    Raises:
+        RuntimeError: Pokud není k dispozici připojení k databázi.
+    """
+
+    if not connection:
+        raise RuntimeError("No database connection.")
+    if isinstance(connection, TaskBackend):
+        connection.clear_import_progress(checkpoint)
+        return
+    try:
+        _execute(connection, "DELETE FROM task_imports WHERE checkpoint = %s", (checkpoint,))
+        _commit(connection)
+    except _mysql().Error as e:
+        raise _write_error(connection, e)
+
+
+def _validate_task(name, description, state):
+    """Ověří název, popis a stav úkolu.
+    Args:
+        name (str): Název úkolu.
+        description (str): Popis úkolu.
+        state (str): Stav úkolu.
+    Raises:
+        ValueError: Pokud jsou zadané neplatné hodnoty.
+    """
+
+    if not name:
+        raise ValueError("Invalid task name.")
+    if not description:
+        raise ValueError("Invalid task description.")
+    if state not in TASK_STATES:
+        raise ValueError("Invalid task state.")
+    if len(name) > 100:
+        raise ValueError("Task name is too long.")
+    if len(description) > 255:
+        raise ValueError("Task description is too long.")
+
+
+def _check_owner(owner):
+    """Ověří vlastníka úkolů.
+    Raises:
+        ValueError: Pokud vlastník není text o nejvýše 50 znacích.
+    """
+
+    if owner is not None and (not isinstance(owner, str) or len(owner) > 50):
+        raise ValueError("Invalid task owner.")
+
+
+def _insert_owner(owner):
+    """Ověří vlastníka nových úkolů; None znamená společný seznam ('')."""
+
+    _check_owner(owner)
+    return "" if owner is None else owner
+
+
+@_instrumented
+@_retry_reads
+def get_tasks(
+    connection,
+    state=None,
+    created_after=None,
+    created_before=None,
+    name_prefix=None,
+    limit=None,
+    order="asc",
+    include_archived=False,
+    compact=False,
+    owner=None,
+):
+    """Vrátí seznam úkolů v databázi, volitelně filtrovaný přímo v SQL dotazu.
+    Args:
+        connection: Připojení k databázi.
+        state (str): Vrátí jen úkoly v daném stavu.
+        created_after (datetime): Vrátí jen úkoly vytvořené v tento čas nebo později.
+        created_before (datetime): Vrátí jen úkoly vytvořené před tímto časem.
+        name_prefix (str): Vrátí jen úkoly, jejichž název začíná tímto textem.
+        limit (int): Maximální počet vrácených úkolů.
+        order (str): Řazení podle času vytvoření, 'asc' nebo 'desc'.
+        include_archived (bool): Vrátí i úkoly přesunuté do archivu
+            (archive_completed_tasks); takové čtení se neukládá do cache.
+        compact (bool): Vrátí úkoly jako záznamy Task (pojmenované n-tice)
+            místo slovníků; vhodné pro velké výpisy, neukládá se do cache.
+        owner (str): Vrátí jen úkoly daného vlastníka; čtení používá indexy
+            začínající vlastníkem, takže jeho cena nezávisí na úkolech ostatních.
+    Returns:
+        list: Seznam úkolů (slovníky, nebo záznamy Task).
+    Raises:
+        RuntimeError: Pokud není k dispozici připojení k databázi.
+        ValueError: Pokud je zadaný neplatný filtr, limit nebo řazení.
+    """
+
+    if not connection:
+        raise RuntimeError("No database connection.")
+    if order not in ("asc", "desc"):
+        raise ValueError("Invalid order.")
+    if limit is not None and limit < 1:
+        raise ValueError("Invalid limit.")
+    where, params = _task_filters(state, created_after, created_before, name_prefix, owner)
+
+    cache = None if include_archived or compact else _task_cache
+    key = ("tasks", state, created_after, created_before, name_prefix, limit, order, owner)
+    if cache is not None:
+        scope = _cache_scope(connection)
+        if (tasks := cache.get(key, scope)) is not None:
+            return tasks
+
+    if isinstance(connection, TaskBackend):
+        tasks = connection.select_tasks(
+            state,
+            created_after,
+            created_before,
+            name_prefix,
+            limit=limit,
+            order=order,
+            include_archived=include_archived,
+            compact=compact,
+            owner=owner,
+        )
+    else:
+        query = f"SELECT {TASK_COLUMNS} FROM tasks"
+        if where:
+            query += " WHERE " + " AND ".join(where)
+        query += f" ORDER BY created_at {order.upper()}, id {order.upper()}"
+        if limit is not None:
+            query += " LIMIT %s"
+            params.append(limit)
+        if include_archived:
+            # obě tabulky se čtou stejně (každá podle svého indexu) a výsledky
+            # se spojí a seřadí znovu
+            archive_query = query.replace(" FROM tasks", " FROM tasks_archive", 1)
+            query = f"({query}) UNION ALL ({archive_query})"
+            query += f" ORDER BY created_at {order.upper()}, id {order.upper()}"
+            params = params * 2
+            if limit is not None:
+                query += " LIMIT %s"
+                params.append(limit)
+
+        if compact:
+            tasks = _compact_tasks(connection, query, params)
+        else:
+            # různých kombinací filtrů je málo, každá se připraví jen jednou
+            tasks = _execute(connection, query, params).fetchall()
+    if cache is not None:
+        # časové filtry nelze při zápisu vyhodnotit, takové seznamy bereme jako omezené
+        limited = limit is not None or created_after is not None or created_before is not None
+        cache.put(key, tasks, state, name_prefix, limited, owner, scope)
+    return tasks
+
+
+def _compact_tasks(connection, query, params):
+    """Načte úkoly z MySQL rovnou jako záznamy Task.
+    Řádky se čtou nebufferovaným kurzorem po dávkách jako n-tice, takže v
+    paměti nikdy nejsou všechny řádky zároveň ve dvou podobách.
+    Returns:
+        list: Seznam záznamů Task.
+    """
+
+    cursor = connection.cursor(buffered=False)
+    try:
+        _run(cursor, query, params)
+        return compact_tasks(_fetch_batches(cursor, 10000))
+    finally:
+        if getattr(connection, "unread_result", False):
+            connection.consume_results()
+        cursor.close()
+
+
+def _fetch_batches(cursor, batch_size):
+    """Postupně vrací řádky výsledku načítané po dávkách (fetchmany)."""
+
+    while rows := cursor.fetchmany(batch_size):
+        yield from rows
+
+
+@_instrumented
+@_retry_reads
+def count_tasks_by_state(connection, owner=None):
+    """Vrátí počty úkolů v jednotlivých stavech jedním agregačním dotazem.
+    Args:
+        connection: Připojení k databázi.
+        owner (str): Spočítá jen úkoly daného vlastníka.
+    Returns:
+        dict: Počet úkolů pro každý stav ('pending', 'in_progress', 'completed').
+    Raises:
+        RuntimeError: Pokud není k dispozici připojení k databázi.
+        ValueError: Pokud je zadaný neplatný vlastník.
+    """
+
+    if not connection:
+        raise RuntimeError("No database connection.")
+    where, params = _task_filters(owner=owner)
+
+    key = ("counts", owner)
+    cache = _task_cache
+    if cache is not None:
+        scope = _cache_scope(connection)
+        if (counts := cache.get(key, scope)) is not None:
+            return counts
+
+    counts = dict.fromkeys(TASK_STATES, 0)
+    if isinstance(connection, TaskBackend):
+        counts.update(connection.count_by_state(owner))
+    else:
+        query = "SELECT state, COUNT(*) AS count FROM tasks"
+        if where:
+            query += " WHERE " + " AND ".join(where)
+        cursor = _execute(connection, query + " GROUP BY state", params)
+        for row in cursor.fetchall():
+            counts[row["state"]] = row["count"]
+    if cache is not None:
+        cache.put(key, counts, owner=owner, scope=scope)
+    return counts
+
+
+def _task_filters(
+    state=None, created_after=None, created_before=None, name_prefix=None, owner=None
+):
+    """Sestaví podmínky WHERE a jejich parametry pro filtrování úkolů.
+    Args:
+        state (str): Stav úkolu.
+        created_after (datetime): Dolní mez času vytvoření (včetně).
+        created_before (datetime): Horní mez času vytvoření (bez).
+        name_prefix (str): Začátek názvu úkolu.
+        owner (str): Vlastník úkolu.
+    Returns:
+        tuple: Seznam podmínek a seznam parametrů.
+    Raises:
+        ValueError: Pokud je zadaný neplatný stav úkolu nebo vlastník.
+    """
+
+    where, params = [], []
+    if owner is not None:
+        # vlastník je první sloupec indexů, podmínka proto stojí na začátku
+        _check_owner(owner)
+        where.append("owner = %s")
+        params.append(owner)
+    if state is not None:
+        if state not in TASK_STATES:
+            raise ValueError("Invalid task state.")
+        where.append("state = %s")
+        params.append(state)
+    if created_after is not None:
+        where.append("created_at >= %s")
+        params.append(created_after)
+    if created_before is not None:
+        where.append("created_at < %s")
+        params.append(created_before)
+    if name_prefix:
+        # znaky %, _ a \ mají v LIKE zvláštní význam, proto je escapujeme
+        escaped = (
+            name_prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        )
+        where.append("name LIKE %s")
+        params.append(escaped + "%")
+    return where, params
+
+
+def iter_tasks(connection, batch_size=1000, owner=None, with_owner=False):
+    """Postupně vrací všechny úkoly bez načtení celé tabulky do paměti.
+    Používá nebufferovaný kurzor, řádky se ze serveru čtou po dávkách.
+    Args:
+        connection: Připojení k databázi.
+        batch_size (int): Počet řádků načtených najednou.
+        owner (str): Vrací jen úkoly daného vlastníka.
+        with_owner (bool): Přidá k úkolům i jejich vlastníka (pro zálohu).
+    Yields:
+        dict: Úkol seřazený podle času vytvoření.
+    Raises:
+        RuntimeError: Pokud není k dispozici připojení k databázi.
+    """
+
+    if not connection:
+        raise RuntimeError("No database connection.")
+    where, params = _task_filters(owner=owner)
+    if isinstance(connection, TaskBackend):
+        yield from connection.iter_tasks(batch_size, owner, with_owner)
+        return
+
+    columns = FULL_TASK_COLUMNS if with_owner else TASK_COLUMNS
+    query = f"SELECT {columns} FROM tasks"
+    if where:
+        query += " WHERE " + " AND ".join(where)
+    cursor = connection.cursor(dictionary=True, buffered=False)
+    try:
+        _run(
+            cursor,
+            query + " ORDER BY created_at ASC, id ASC",
+            params,
+            operation="iter_tasks",
+        )
+        while rows := cursor.fetchmany(batch_size):
+            yield from rows
+    finally:
+        # při předčasném ukončení je nutné dočíst zbytek výsledku ze serveru
+        if getattr(connection, "unread_result", False):
+            connection.consume_results()
+        cursor.close()
+
+
+@_instrumented
+@_retry_reads
+def get_tasks_page(
+    connection, after_created_at=None, after_id=None, limit=20, state=None, owner=None
+):
+    """Vrátí jednu stránku úkolů pomocí stránkování podle klíče (keyset).
+    Stránka začíná za úkolem s daným časem vytvoření a ID, takže cena dotazu
+    nezávisí na tom, jak daleko v seznamu stránka leží.
+    Args:
+        connection: Připojení k databázi.
+        after_created_at (datetime): Čas vytvoření posledního úkolu
+            předchozí stránky, None pro první stránku.
+        after_id (int): ID posledního úkolu předchozí stránky.
+        limit (int): Maximální počet úkolů na stránce.
+        state (str): Vrátí jen úkoly v daném stavu.
+        owner (str): Vrátí jen úkoly daného vlastníka.
+    Returns:
+        list: Seznam úkolů seřazený podle času vytvoření a ID.
+    Raises:
+        RuntimeError: Pokud není k dispozici připojení k databázi.
+        ValueError: Pokud je limit menší než 1 nebo je zadaný neplatný stav.
+    """
+
+    if not connection:
+        raise RuntimeError("No database connection.")
+    if limit < 1:
+        raise ValueError("Invalid page limit.")
+    where, params = _task_filters(state, owner=owner)
+
+    key = ("page", after_created_at, after_id, limit, state, owner)
+    cache = _task_cache
+    if cache is not None:
+        scope = _cache_scope(connection)
+        if (tasks := cache.get(key, scope)) is not None:
+            return tasks
+
+    if isinstance(connection, TaskBackend):
+        after = None if after_created_at is None else (after_created_at, after_id)
+        tasks = connection.select_tasks(state, after=after, limit=limit, owner=owner)
+    else:
+        if after_created_at is not None:
+            where.append("(created_at > %s OR (created_at = %s AND id > %s))")
+            params.extend([after_created_at, after_created_at, after_id])
+        query = f"SELECT {TASK_COLUMNS} FROM tasks"
+        if where:
+            query += " WHERE " + " AND ".join(where)
+        query += " ORDER BY created_at ASC, id ASC LIMIT %s"
+        params.append(limit)
+
+        tasks = _execute(connection, query, params).fetchall()
+    if cache is not None:
+        cache.put(key, tasks, state, limited=True, owner=owner, scope=scope)
+    return tasks
+
+
+@_instrumented
+@_retry_reads
+def search_tasks(connection, query, limit=20, owner=None):
+    """Vyhledá úkoly podle slov v názvu a popisu, seřazené podle relevance.
+    Využívá fulltextový index (MySQL FULLTEXT, SQLite FTS5, u memory
+    invertovaný index), takže se neprochází celá tabulka. Úkol musí
+    obsahovat všechna hledaná slova, stačí i jejich začátek ("nák" najde
+    "nákup").
+    Args:
+        connection: Připojení k databázi.
+        query (str): Hledaný text.
+        limit (int): Maximální počet vrácených úkolů.
+        owner (str): Hledá jen mezi úkoly daného vlastníka.
+    Returns:
+        list: Seznam úkolů od nejrelevantnějšího.
+    Raises:
+        RuntimeError: Pokud není k dispozici připojení k databázi.
+        ValueError: Pokud je hledaný text prázdný nebo je neplatný limit.
+    """
+
+    if not connection:
+        raise RuntimeError("No database connection.")
+    if limit < 1:
+        raise ValueError("Invalid limit.")
+    # operátory fulltextového vyhledávání (+, -, *, " ...) se z textu vypustí
+    terms = re.findall(r"\w+", query or "")
+    if not terms:
+        raise ValueError("Invalid search query.")
+    where, params = _task_filters(owner=owner)
+
+    if isinstance(connection, TaskBackend):
+        return connection.search_tasks(terms, limit, owner)
+
+    # InnoDB neindexuje slova kratší než 3 znaky, povinná jsou proto jen delší
+    against = " ".join(f"+{term}*" if len(term) >= 3 else f"{term}*" for term in terms)
+    where.insert(0, "MATCH (name, description) AGAINST (%s IN BOOLEAN MODE)")
+    return _execute(
+        connection,
+        f"SELECT {TASK_COLUMNS} FROM tasks WHERE " + " AND ".join(where) + " "
+        "ORDER BY MATCH (name, description) AGAINST (%s IN BOOLEAN MODE) DESC, id DESC "
+        "LIMIT %s",
+        (against, *params, against, limit),
+    ).fetchall()
+
+
+def _check_version(version):
+    """Ověří očekávanou verzi úkolu.
+    Raises:
+        ValueError: Pokud verze není kladné celé číslo.
+    """
+
+    if not isinstance(version, int) or isinstance(version, bool) or version < 1:
+        raise ValueError("Invalid task version.")
+
+
+def _task_exists(connection, task_id, owner=None):
+    """Ověří existenci úkolu jedním dotazem přes primární klíč.
+    Pokud úkol zná zapnutá cache, dotaz do databáze se neprovádí.
+    Args:
+        connection: Připojení k databázi MySQL.
+        task_id (int): ID úkolu.
+        owner (str): Vlastník, kterému musí úkol patřit.
+    Returns:
+        bool: True, pokud úkol existuje.
+    """
+
+    # cache vlastníky úkolů v řádcích nemá, ověřuje jen úkoly bez omezení
+    cache = _task_cache
+    if owner is None and cache is not None and cache.known_task(task_id, _cache_scope(connection)):
+        return True
+    query, params = "SELECT 1 AS found FROM tasks WHERE id = %s", [task_id]
+    if owner is not None:
+        query += " AND owner = %s"
+        params.append(owner)
+    cursor = _execute(connection, query + " LIMIT 1", params)
+    return bool(cursor.fetchall())
+
+
+def _update_state_query(task_id, new_state, expected_version, owner=None):
+    """Sestaví příkaz změny stavu jednoho úkolu (s kontrolou verze, je-li zadaná,
+    a omezený na vlastníka owner).
+    Returns:
+        tuple: SQL dotaz a jeho parametry.
+    """
+
+    query = "UPDATE tasks SET state = %s, version = version + 1 WHERE id = %s"
+    params = [new_state, task_id]
+    if expected_version is not None:
+        query += " AND version = %s"
+        params.append(expected_version)
+    if owner is not None:
+        query += " AND owner = %s"
+        params.append(owner)
+    return query, params
+
+
+@_instrumented
+@_stale_cache_on_conflict
+def update_task_state(connection, task_id, new_state, expected_version=None, owner=None):
+    """Aktualizuje stav úkolu v databázi a zvýší jeho verzi.
+    Se zadanou expected_version jde o porovnání a záměnu (compare-and-set):
+    úkol se změní jen tehdy, pokud má stále verzi načtenou klientem, jinak
+    funkce hned skončí výjimkou TaskConflictError. Řádek se přitom nezamyká
+    déle než po dobu jednoho příkazu UPDATE.
+    Args:
+        connection: Připojení k databázi.
+        task_id (int): ID úkolu.
+        new_state (str): Nový stav úkolu.
+        expected_version (int): Verze úkolu, ze které klient vychází (klíč
+            "version" načteného úkolu), None pro změnu bez kontroly.
+        owner (str): Změní úkol jen tehdy, pokud patří tomuto vlastníkovi;
+            úkol jiného vlastníka se bere jako neexistující.
+    Raises:
+        RuntimeError: Pokud není k dispozici připojení k databázi.
+        TaskConflictError: Pokud úkol mezitím změnil jiný klient.
+        ValueError: Pokud je zadaný neplatný stav úkolu, verze, vlastník nebo
+            neexistující ID.
+    """
+
+    if not connection:
+        raise RuntimeError("No database connection.")
+    if new_state not in TASK_STATES:
+        raise ValueError("Invalid task state.")
+    if expected_version is not None:
+        _check_version(expected_version)
+    _check_owner(owner)
+
+    if isinstance(connection, TaskBackend):
+        if not connection.update_task_state(task_id, new_state, expected_version, owner):
+            raise ValueError("Invalid task ID.")
+        if _task_cache is not None:
+            _task_cache.task_updated(task_id, new_state, owner, _cache_scope(connection))
+        return
+
+    query, params = _update_state_query(task_id, new_state, expected_version, owner)
+    try:
+        # změna vždy zvýší verzi, 0 řádků tedy znamená chybějící úkol nebo jinou verzi
+        updated = _execute(connection, query, params).rowcount > 0
+        if updated:
+            _log_changes(connection, "update", [task_id])
+            _commit(connection)
+        else:
+            connection.rollback()
+    except _mysql().Error as e:
+        raise _write_error(connection, e)
+    if not updated:
+        if expected_version is not None and _task_exists(connection, task_id, owner):
+            raise TaskConflictError([task_id])
+        raise ValueError("Invalid task ID.")
+    if _task_cache is not None:
+        _task_cache.task_updated(task_id, new_state, owner, _cache_scope(connection))
+
+
+@_instrumented
+@_stale_cache_on_conflict
+def delete_task(connection, task_id, owner=None, expected_version=None):
+    """Odstraní úkol z databáze.
+    Se zadanou expected_version se úkol odstraní jen tehdy, pokud má stále
+    verzi načtenou klientem (stejně jako u update_task_state).
+    Args:
+        connection: Připojení k databázi.
+        task_id (int): ID úkolu.
+        owner (str): Odstraní úkol jen tehdy, pokud patří tomuto vlastníkovi.
+        expected_version (int): Verze úkolu, ze které klient vychází, None
+            pro odstranění bez kontroly.
+    Raises:
+        RuntimeError: Pokud není k dispozici připojení k databázi.
+        TaskConflictError: Pokud úkol mezitím změnil jiný klient.
+        ValueError: Pokud úkol se zadaným ID (u daného vlastníka) neexistuje
+            nebo je zadaná neplatná verze.
+    """
+
+    if not connection:
+        raise RuntimeError("No database connection.")
+    if expected_version is not None:
+        _check_version(expected_version)
+    where, params = _task_filters(owner=owner)
+
+    if isinstance(connection, TaskBackend):
+        if not connection.delete_task(task_id, owner, expected_version):
+            raise ValueError("Invalid task ID.")
+        if _task_cache is not None:
+            _task_cache.task_deleted(task_id, owner, _cache_scope(connection))
+        return
+
+    if expected_version is not None:
+        where.append("version = %s")
+        params.append(expected_version)
+    query = " AND ".join(["DELETE FROM tasks WHERE id = %s", *where])
+    try:
+        deleted = _execute(connection, query, [task_id, *params]).rowcount > 0
+        if deleted:
+            _log_changes(connection, "delete", [task_id])
+            _commit(connection)
+        else:
+            connection.rollback()
+    except _mysql().Error as e:
+        raise _write_error(connection, e)
+    if not deleted:
+        if expected_version is not None and _task_exists(connection, task_id, owner):
+            raise TaskConflictError([task_id])
+        raise ValueError("Invalid task ID.")
+    if _task_cache is not None:
+        _task_cache.task_deleted(task_id, owner, _cache_scope(connection))
+
+
+def _task_selection(task_ids, state, created_before, chunk_size):
+    """Ověří výběr úkolů pro hromadné operace.
+    Úkoly se vybírají buď seznamem ID, nebo filtrem (stav, čas vytvoření).
+    Args:
+        task_ids (iterable): ID úkolů, nebo None při výběru filtrem.
+        state (str): Stav vybíraných úkolů.
+        created_before (datetime): Horní mez času vytvoření (bez).
+        chunk_size (int): Počet ID v jednom příkazu.
+    Returns:
+        list: ID úkolů bez duplicit, nebo None při výběru filtrem.
+    Raises:
+        ValueError: Pokud je výběr neplatný.
+    """
+
+    if chunk_size < 1:
+        raise ValueError("Invalid chunk size.")
+    if state is not None and state not in TASK_STATES:
+        raise ValueError("Invalid task state.")
+    has_filter = state is not None or created_before is not None
+    if (task_ids is None) == (not has_filter):
+        # buď ID, nebo filtr - bez výběru by se změnila celá tabulka
+        raise ValueError("Invalid task selection.")
+    if task_ids is None:
+        return None
+    task_ids = list(dict.fromkeys(task_ids))
+    if not all(isinstance(task_id, int) for task_id in task_ids):
+        raise ValueError("Invalid task ID.")
+    return task_ids
+
+
+def _chunks(items, size):
+    """Rozdělí seznam na části o nejvýše size prvcích."""
+
+    return (items[start : start + size] for start in range(0, len(items), size))
+
+
+def _locked_ids(cursor, state, created_before, owner=None):
+    """Vrátí ID úkolů odpovídajících filtru hromadné operace a zamkne je
+    (SELECT ... FOR UPDATE) do konce transakce.
+    Args:
+        cursor: Kurzor otevřené transakce.
+        state (str): Stav vybíraných úkolů.
+        created_before (datetime): Horní mez času vytvoření (bez).
+        owner (str): Vlastník vybíraných úkolů.
+    Returns:
+        list: ID vybraných úkolů.
+    """
+
+    where, params = _task_filters(state=state, created_before=created_before, owner=owner)
+    _run(cursor, "SELECT id FROM tasks WHERE " + " AND ".join(where) + " FOR UPDATE", params)
+    return [row[0] for row in cursor.fetchall()]
+
+
+def _log_changes(connection, operation, task_ids):
+    """Zapíše změny úkolů do logu task_changes v rámci otevřené transakce.
+    Pořadová čísla přiděluje AUTO_INCREMENT, souběžné zápisy se proto
+    navzájem neblokují. Transakce se ale mohou potvrdit v jiném pořadí, než
+    mají čísla, get_changes_since() proto vrací jen změny starší než
+    CHANGE_SETTLE_TIME. Volá se jako poslední příkaz před COMMIT, aby mezi
+    přidělením čísla a potvrzením uběhlo co nejméně času.
+    Args:
+        connection: Připojení k databázi MySQL.
+        operation (str): 'insert', 'update' nebo 'delete'.
+        task_ids (list): ID změněných úkolů.
+    """
+
+    if not task_ids:
+        return
+    rows = [(task_id, operation) for task_id in task_ids]
+    query = "INSERT INTO task_changes (task_id, operation) VALUES (%s, %s)"
+    if len(rows) == 1:
+        _execute(connection, query, rows[0])
+        return
+    cursor = connection.cursor()
+    try:
+        for chunk in _chunks(rows, 1000):
+            _run(cursor, query, chunk, many=True)
+    finally:
+        cursor.close()
+
+
+@_instrumented
+@_stale_cache_on_conflict
+def update_task_states(
+    connection,
+    new_state,
+    task_ids=None,
+    state=None,
+    created_before=None,
+    chunk_size=500,
+    expected_versions=None,
+    owner=None,
+):
+    """Hromadně změní stav úkolů vybraných seznamem ID nebo filtrem.
+    Každá dávka ID se mění jedním příkazem UPDATE ... WHERE id IN (...),
+    všechny dávky proběhnou v jedné transakci. Se zadanými expected_versions
+    se změna provede jen tehdy, pokud žádný z vybraných úkolů mezitím
+    nezměnil jiný klient; jinak se nezmění nic a funkce skončí výjimkou
+    TaskConflictError.
+    Args:
+        connection: Připojení k databázi.
+        new_state (str): Nový stav úkolů.
+        task_ids (iterable): ID úkolů; nelze kombinovat s filtrem.
+        state (str): Změní jen úkoly v tomto stavu.
+        created_before (datetime): Změní jen úkoly vytvořené před tímto časem.
+        chunk_size (int): Počet ID v jednom příkazu.
+        expected_versions (dict): Očekávané verze úkolů podle ID; vybrané
+            úkoly jsou pak klíče slovníku (nelze kombinovat s task_ids ani filtrem).
+        owner (str): Změní jen úkoly tohoto vlastníka; vybrané úkoly jiných
+            vlastníků se vrátí mezi chybějícími ID.
+    Returns:
+        tuple: Počet úkolů, kterých se změna týkala, a seznam ID,
+            která v databázi neexistují.
+    Raises:
+        RuntimeError: Pokud není k dispozici připojení k databázi.
+        TaskConflictError: Pokud se verze některého úkolu liší od očekávané.
+        ValueError: Pokud je zadaný neplatný stav, verze nebo výběr úkolů.
+    """
+
+    if not connection:
+        raise RuntimeError("No database connection.")
+    if new_state not in TASK_STATES:
+        raise ValueError("Invalid task state.")
+    if expected_versions is not None:
+        if task_ids is not None:
+            raise ValueError("Invalid task selection.")
+        for version in expected_versions.values():
+            _check_version(version)
+        task_ids = list(expected_versions)
+    task_ids = _task_selection(task_ids, state, created_before, chunk_size)
+    scope, scope_params = _task_filters(owner=owner)
+    scope = "".join(f" AND {condition}" for condition in scope)
+
+    if isinstance(connection, TaskBackend):
+        count, missing = connection.update_task_states(
+            new_state, task_ids, state, created_before, chunk_size, expected_versions, owner
+        )
+    else:
+        cursor = connection.cursor()
+        try:
+            if task_ids is None:
+                # změněná ID se zapisují do logu změn, filtr se proto převede
+                # na seznam zamčených ID a dál se pokračuje jako při výběru podle ID
+                task_ids = _locked_ids(cursor, state, created_before, owner)
+            if expected_versions is not None:
+                missing = []
+                for chunk in _chunks(task_ids, chunk_size):
+                    missing.extend(
+                        _update_versioned_chunk(
+                            cursor, new_state, chunk, expected_versions, owner
+                        )
+                    )
+                count = len(task_ids) - len(missing)
+            else:
+                missing = []
+                for chunk in _chunks(task_ids, chunk_size):
+                    placeholders = ", ".join(["%s"] * len(chunk))
+                    _run(
+                        cursor,
+                        "UPDATE tasks SET state = %s, version = version + 1 "
+                        f"WHERE id IN ({placeholders}){scope}",
+                        [new_state, *chunk, *scope_params],
+                    )
+                    # změna vždy zvýší verzi, menší rowcount znamená chybějící ID
+                    if cursor.rowcount < len(chunk):
+                        _run(
+                            cursor,
+                            f"SELECT id FROM tasks WHERE id IN ({placeholders}){scope}",
+                            [*chunk, *scope_params],
+                        )
+                        found = {row[0] for row in cursor.fetchall()}
+                        missing.extend(i for i in chunk if i not in found)
+                count = len(task_ids) - len(missing)
+            absent = set(missing)
+            _log_changes(connection, "update", [i for i in task_ids if i not in absent])
+            _commit(connection)
+        except _mysql().Error as e:
+            raise _write_error(connection, e)
+        except TaskConflictError:
+            _rollback(connection)
+            raise
+        finally:
+            cursor.close()
+    if count and _task_cache is not None:
+        _task_cache.clear()
+    return count, missing
+
+
+def _update_versioned_chunk(cursor, new_state, chunk, expected_versions, owner=None):
+    """Změní stav dávky úkolů, pokud mají očekávané verze (bez zamykání čtením).
+    Verze se nejdřív přečtou a porovnají; UPDATE pak mění jen řádky se
+    stejnou verzí, takže souběžnou změnu mezi čtením a zápisem odhalí
+    menší počet změněných řádků.
+    Args:
+        cursor: Kurzor otevřené transakce.
+        new_state (str): Nový stav úkolů.
+        chunk (list): ID úkolů v dávce.
+        expected_versions (dict): Očekávané verze úkolů podle ID.
+        owner (str): Vlastník úkolů, None bez omezení.
+    Returns:
+        list: ID úkolů z dávky, které v databázi (u vlastníka) neexistují.
+    Raises:
+        TaskConflictError: Pokud se verze některého úkolu liší.
+    """
+
+    placeholders = ", ".join(["%s"] * len(chunk))
+    where, params = _task_filters(owner=owner)
+    where.insert(0, f"id IN ({placeholders})")
+    # UPDATE níže mění jen nalezené dvojice (id, verze), vlastník stačí tady
+    _run(
+        cursor, "SELECT id, version FROM tasks WHERE " + " AND ".join(where), [*chunk, *params]
+    )
+    versions = dict(cursor.fetchall())
+    conflicts = version_conflicts(chunk, versions, expected_versions)
+    if conflicts:
+        raise TaskConflictError(conflicts)
+
+    found = [task_id for task_id in chunk if task_id in versions]
+    if found:
+        pairs = ", ".join(["(%s, %s)"] * len(found))
+        _run(
+            cursor,
+            "UPDATE tasks SET state = %s, version = version + 1 "
+            f"WHERE (id, version) IN ({pairs})",
+            [new_state, *(value for task_id in found for value in (task_id, versions[task_id]))],
+        )
+        if cursor.rowcount < len(found):
+            # některý úkol změnil jiný klient až po přečtení verzí
+            raise TaskConflictError(found)
+    return [task_id for task_id in chunk if task_id not in versions]
+
+
+@_instrumented
+def delete_tasks(
+    connection, task_ids=None, state=None, created_before=None, chunk_size=500, owner=None
+):
+    """Hromadně odstraní úkoly vybrané seznamem ID nebo filtrem.
+    Každá dávka ID se maže jedním příkazem DELETE ... WHERE id IN (...),
+    všechny dávky proběhnou v jedné transakci.
+    Args:
+        connection: Připojení k databázi.
+        task_ids (iterable): ID úkolů; nelze kombinovat s filtrem.
+        state (str): Odstraní jen úkoly v tomto stavu.
+        created_before (datetime): Odstraní jen úkoly vytvořené před tímto časem.
+        chunk_size (int): Počet ID v jednom příkazu.
+        owner (str): Odstraní jen úkoly tohoto vlastníka; vybrané úkoly
+            jiných vlastníků se vrátí mezi chybějícími ID.
+    Returns:
+        tuple: Počet odstraněných úkolů a seznam ID, která v databázi neexistují.
+    Raises:
+        RuntimeError: Pokud není k dispozici připojení k databázi.
+        ValueError: Pokud je zadaný neplatný výběr úkolů.
+    """
+
+    if not connection:
+        raise RuntimeError("No database connection.")
+    task_ids = _task_selection(task_ids, state, created_before, chunk_size)
+    scope, scope_params = _task_filters(owner=owner)
+    scope = "".join(f" AND {condition}" for condition in scope)
+
+    if isinstance(connection, TaskBackend):
+        count, missing = connection.delete_tasks(
+            task_ids, state, created_before, chunk_size, owner
+        )
+    else:
+        cursor = connection.cursor()
+        try:
+            if task_ids is None:
+                # smazaná ID se zapisují do logu změn, zjistí se proto předem
+                deleted, missing = _locked_ids(cursor, state, created_before, owner), []
+                for chunk in _chunks(deleted, chunk_size):
+                    placeholders = ", ".join(["%s"] * len(chunk))
+                    _run(cursor, f"DELETE FROM tasks WHERE id IN ({placeholders})", chunk)
+            else:
+                deleted, missing = [], []
+                for chunk in _chunks(task_ids, chunk_size):
+                    placeholders = ", ".join(["%s"] * len(chunk))
+                    # po smazání už nejde zjistit, která ID chyběla - zamkneme
+                    # a zjistíme existující řádky předem
+                    _run(
+                        cursor,
+                        f"SELECT id FROM tasks WHERE id IN ({placeholders}){scope} FOR UPDATE",
+                        [*chunk, *scope_params],
+                    )
+                    found = {row[0] for row in cursor.fetchall()}
+                    missing.extend(i for i in chunk if i not in found)
+                    if found:
+                        deleted.extend(i for i in chunk if i in found)
+                        _run(
+                            cursor,
+                            f"DELETE FROM tasks WHERE id IN ({placeholders}){scope}",
+                            [*chunk, *scope_params],
+                        )
+            count = len(deleted)
+            _log_changes(connection, "delete", deleted)
+            _commit(connection)
+        except _mysql().Error as e:
+            raise _write_error(connection, e)
+        finally:
+            cursor.close()
+    if count and _task_cache is not None:
+        _task_cache.clear()
+    return count, missing
+
+
+@_instrumented
+def archive_completed_tasks(connection, completed_before, chunk_size=1000):
+    """Přesune dokončené úkoly, které se nezměnily od daného času, z tabulky
+    tasks do archivu tasks_archive, aby tabulka tasks zůstala malá.
+    Úkoly se přesouvají po dávkách, každá dávka ve vlastní krátké transakci,
+    takže zámky se nikdy nedrží déle než po dobu jedné dávky. Archivované
+    úkoly vrací get_tasks(include_archived=True); v logu změn se přesun
+    projeví jako smazání.
+    Args:
+        connection: Připojení k databázi.
+        completed_before (datetime): Přesune úkoly ve stavu 'completed'
+            s poslední změnou (updated_at) před tímto časem.
+        chunk_size (int): Počet úkolů přesunutých v jedné transakci.
+    Returns:
+        int: Počet archivovaných úkolů.
+    Raises:
+        RuntimeError: Pokud není k dispozici připojení k databázi.
+        ValueError: Pokud je velikost dávky menší než 1.
+    """
+
+    if not connection:
+        raise RuntimeError("No database connection.")
+    if chunk_size < 1:
+        raise ValueError("Invalid chunk size.")
+
+    if isinstance(connection, TaskBackend):
+        count = connection.archive_tasks(completed_before, chunk_size)
+    else:
+        count = 0
+        cursor = connection.cursor()
+        try:
+            while True:
+                # index (state, updated_at) vybere dávku bez procházení tabulky
+                _run(
+                    cursor,
+                    "SELECT id FROM tasks WHERE state = %s AND updated_at < %s "
+                    "ORDER BY updated_at LIMIT %s FOR UPDATE",
+                    ("completed", completed_before, chunk_size),
+                )
+                ids = [row[0] for row in cursor.fetchall()]
+                if ids:
+                    placeholders = ", ".join(["%s"] * len(ids))
+                    _run(
+                        cursor,
+                        f"INSERT INTO tasks_archive ({TASK_COLUMNS}, owner) "
+                        f"SELECT {TASK_COLUMNS}, owner FROM tasks WHERE id IN ({placeholders})",
+                        ids,
+                    )
+                    _run(cursor, f"DELETE FROM tasks WHERE id IN ({placeholders})", ids)
+                    _log_changes(connection, "delete", ids)
+                _commit(connection)
+                count += len(ids)
+                if len(ids) < chunk_size:
+                    break
+        except _mysql().Error as e:
+            raise _write_error(connection, e)
+        finally:
+            cursor.close()
+    if count and _task_cache is not None:
+        _task_cache.clear()
+    return count
+
+
+@_instrumented
+@_retry_reads
+def get_changes_since(connection, token=None, limit=1000, owner=None):
+    """Vrátí úkoly změněné od daného tokenu (přírůstková synchronizace).
+    Každý zápis přes funkce tohoto modulu se zaznamená do logu změn
+    (task_changes), smazání jako záznam o odstranění. Funkce čte jen log od
+    tokenu, cena dotazu proto odpovídá počtu změn, ne velikosti tabulky.
+    Klient si nejdřív vyžádá token (bez argumentu token), potom načte všechny
+    úkoly (např. iter_tasks) a dál se ptá jen na změny od posledního tokenu.
+    Úkol změněný vícekrát se vrátí jednou v aktuálním stavu. U MySQL se
+    změny vrací se zpožděním CHANGE_SETTLE_TIME a připojení nesmí mít
+    otevřenou transakci (čtecí snímek předchozích čtení je třeba ukončit,
+    např. rollback(), nebo číst log přes samostatné připojení).
+    Args:
+        connection: Připojení k databázi.
+        token (int): Token z předchozího volání, None pro aktuální token.
+        limit (int): Nejvyšší počet záznamů logu přečtených jedním voláním.
+        owner (str): Vrátí jen změny úkolů tohoto vlastníka; smazané úkoly
+            už vlastníka nemají, v "deleted" jsou proto ID všech smazaných.
+    Returns:
+        dict: Slovník s klíči "token" (token pro další volání), "updated"
+            (přidané nebo změněné úkoly), "deleted" (ID smazaných úkolů)
+            a "has_more" (True, pokud další změny čekají na další volání).
+    Raises:
+        ChangeTokenExpiredError: Pokud už log změny od tokenu neobsahuje
+            (viz purge_changes) - úkoly je třeba načíst znovu celé.
+        RuntimeError: Pokud není k dispozici připojení k databázi nebo je na
+            připojení MySQL otevřená transakce.
+        ValueError: Pokud je zadaný neplatný token, limit nebo vlastník.
+    """
+
+    if not connection:
+        raise RuntimeError("No database connection.")
+    if token is not None and (not isinstance(token, int) or isinstance(token, bool) or token < 0):
+        raise ValueError("Invalid change token.")
+    if limit < 1:
+        raise ValueError("Invalid limit.")
+    _check_owner(owner)
+
+    after, limit = (0, 0) if token is None else (token, limit)
+    if isinstance(connection, TaskBackend):
+        seq, purged_seq, changes, tasks = connection.changes_since(after, limit, owner)
+    else:
+        seq, purged_seq, changes, tasks = _mysql_changes_since(connection, after, limit, owner)
+    if token is None:
+        return {"token": seq, "updated": [], "deleted": [], "has_more": False}
+    if token < purged_seq:
+        raise ChangeTokenExpiredError()
+    if token > seq:  # token z jiné databáze
+        raise ValueError("Invalid change token.")
+
+    last_change = {}  # ID úkolu -> pořadí poslední změny
+    for change_seq, task_id in changes:
+        last_change.pop(task_id, None)
+        last_change[task_id] = change_seq
+    has_more = len(changes) == limit
+    return {
+        "token": changes[-1][0] if has_more else seq,
+        "updated": [tasks[task_id] for task_id in last_change if task_id in tasks],
+        "deleted": [task_id for task_id in last_change if task_id not in tasks],
+        "has_more": has_more,
+    }
+
+
+def _mysql_changes_since(connection, after_seq, limit, owner=None):
+    """Přečte log změn MySQL v transakci jen pro čtení (viz
+    TaskBackend.changes_since). V už otevřené transakci by čtení vidělo
+    stav z jejího začátku (REPEATABLE READ), připojení proto nesmí mít
+    otevřenou transakci - volající ji nejdřív sám potvrdí nebo zahodí, nebo
+    čte log přes samostatné připojení.
+    Vrací jen změny pod horizontem: před první změnou mladší než
+    CHANGE_SETTLE_TIME, která ještě může mít před sebou nepotvrzenou změnu
+    s nižším pořadovým číslem (viz _log_changes).
+    Args:
+        connection: Připojení k databázi MySQL.
+        after_seq (int): Pořadí poslední změny, kterou klient zná.
+        limit (int): Nejvyšší počet přečtených záznamů logu.
+        owner (str): Vynechá změny existujících úkolů jiných vlastníků.
+    Returns:
+        tuple: (seq, purged_seq, seznam dvojic (seq, task_id), úkoly podle ID).
+    Raises:
+        RuntimeError: Pokud je na připojení otevřená transakce.
+    """
+
+    if connection.in_transaction:
+        raise RuntimeError("Cannot read changes inside an open transaction.")
+    connection.start_transaction(consistent_snapshot=True, readonly=True)
+    try:
+        result = _read_changes(connection, after_seq, limit, owner)
+    except _mysql().Error:
+        _rollback(connection)
+        raise
+    connection.rollback()  # snímek jen pro čtení, není co potvrdit
+    return result
+
+
+def _read_changes(connection, after_seq, limit, owner):
+    """Přečte horizont, záznamy logu a změněné úkoly (viz _mysql_changes_since)."""
+
+    row = _execute(
+        connection,
+        "SELECT purged_seq, (SELECT MAX(seq) FROM task_changes) AS last_seq, "
+        "(SELECT MIN(seq) FROM task_changes "
+        "WHERE changed_at > NOW(6) - INTERVAL %s MICROSECOND) AS recent_seq "
+        "FROM task_change_seq WHERE id = 1",
+        (int(CHANGE_SETTLE_TIME * 1_000_000),),
+    ).fetchall()[0]
+    last = max(row["last_seq"] or 0, row["purged_seq"])
+    seq = last if row["recent_seq"] is None else row["recent_seq"] - 1
+    # horizont nesmí klesnout pod token, který už klient dostal (posun hodin serveru)
+    seq = max(seq, min(after_seq, last))
+
+    query, params = "SELECT seq, task_id FROM task_changes WHERE seq > %s", [after_seq]
+    if owner is not None:
+        # smazaný úkol už v tabulce není, jeho změny se vrací všem vlastníkům
+        query = (
+            "SELECT seq, task_id FROM task_changes "
+            "LEFT JOIN tasks ON tasks.id = task_changes.task_id "
+            "WHERE seq > %s AND (tasks.id IS NULL OR tasks.owner = %s)"
+        )
+        params.append(owner)
+    cursor = _execute(
+        connection, query + " AND seq <= %s ORDER BY seq LIMIT %s", (*params, seq, limit)
+    )
+    changes = [(change["seq"], change["task_id"]) for change in cursor.fetchall()]
+
+    tasks = {}
+    task_ids = list(dict.fromkeys(task_id for _, task_id in changes))
+    cursor = connection.cursor(dictionary=True)
+    try:
+        for chunk in _chunks(task_ids, 500):
+            placeholders = ", ".join(["%s"] * len(chunk))
+            _run(cursor, f"SELECT {TASK_COLUMNS} FROM tasks WHERE id IN ({placeholders})", chunk)
+            tasks.update((task["id"], task) for task in cursor.fetchall())
+    finally:
+        cursor.close()
+    return seq, row["purged_seq"], changes, tasks
+
+
+@_instrumented
+def purge_changes(connection, older_than):
+    """Odstraní z logu změn záznamy starší než zadaný čas.
+    Klient, jehož token ukazuje do odstraněné části logu, dostane při dalším
+    volání get_changes_since() výjimku ChangeTokenExpiredError.
+    Args:
+        connection: Připojení k databázi.
+        older_than (datetime): Odstraní změny provedené před tímto časem.
+    Returns:
+        int: Počet odstraněných záznamů logu.
+    Raises:
+        RuntimeError: Pokud není k dispozici připojení k databázi.
+    """
+
+    if not connection:
+        raise RuntimeError("No database connection.")
+    if isinstance(connection, TaskBackend):
+        return connection.purge_changes(older_than)
+
+    cursor = connection.cursor()
+    try:
+        _run(cursor, "SELECT MAX(seq) FROM task_changes WHERE changed_at < %s", (older_than,))
+        last = cursor.fetchall()[0][0]
+        if last is None:
+            return 0
+        _run(cursor, "DELETE FROM task_changes WHERE seq <= %s", (last,))
+        count = cursor.rowcount
+        _run(
+            cursor,
+            "UPDATE task_change_seq SET purged_seq = GREATEST(purged_seq, %s) WHERE id = 1",
+            (last,),
+        )
+        _commit(connection)
+    except _mysql().Error as e:
+        raise _write_error(connection, e)
+    finally:
+        cursor.close()
+    return count
+
+
+def open_replica(path, owner=None):
+    """Otevře (nebo vytvoří) místní repliku úkolů jednoho vlastníka v SQLite.
+    Replika se předává funkcím modulu místo připojení: čte se z místního
+    souboru a změny se zapisují do jejího žurnálu, na server je odešle
+    sync_replica().
+    Args:
+        path (str): Cesta k souboru repliky.
+        owner (str): Vlastník, jehož úkoly replika drží, None pro společný seznam.
+    Returns:
+        TaskReplica: Otevřená replika.
+    Raises:
+        ConnectionError: Pokud se soubor repliky nepodaří otevřít.
+        ValueError: Pokud je vlastník neplatný nebo replika patří jinému vlastníkovi.
+    """
+
+    owner = _insert_owner(owner)
+    try:
+        return TaskReplica(path, owner)
+    except sqlite3.Error as e:
+        raise ConnectionError(f"Database connection failed: {e}")
+
+
+@_instrumented
+def sync_replica(replica, connection, limit=1000):
+    """Synchronizuje místní repliku se serverem v obou směrech.
+    Nejdřív stáhne změny úkolů vlastníka repliky od posledního tokenu logu
+    změn (get_changes_since) a vyřeší konflikty s žurnálem repliky, potom
+    odešle změny ze žurnálu s kontrolou verze, ze které vychází. Při první
+    synchronizaci, nebo když log token už nepokrývá, načte všechny úkoly
+    vlastníka znovu. Úkol, který se na serveru mezi stažením a odesláním
+    změnil, zůstane v žurnálu do příští synchronizace, kde má přednost
+    změna na serveru. Během synchronizace se do repliky nesmí zapisovat a
+    připojení k serveru nesmí mít otevřenou transakci (viz get_changes_since).
+    Args:
+        replica (TaskReplica): Místní replika (viz open_replica).
+        connection: Připojení k serveru.
+        limit (int): Nejvyšší počet změn nebo úkolů načtených jedním dotazem.
+    Returns:
+        dict: Počty "pulled" (stažené změny), "pushed" (odeslané změny),
+            "conflicts" (změny z repliky zahozené kvůli změně na serveru)
+            a "pending" (změny, které zůstaly v žurnálu).
+    Raises:
+        RuntimeError: Pokud není k dispozici připojení k databázi nebo je na
+            připojení otevřená transakce.
+        ValueError: Pokud je zadaný neplatný limit.
+    """
+
+    if not connection or not replica:
+        raise RuntimeError("No database connection.")
+    if limit < 1:
+        raise ValueError("Invalid limit.")
+
+    pulled = conflicts = 0
+    token = replica.token
+    if token is not None:
+        try:
+            pulled, conflicts = _pull_changes(replica, connection, token, limit)
+        except ChangeTokenExpiredError:
+            token = None  # log změn už token nepokrývá, úkoly se načtou znovu
+    if token is None:
+        token = get_changes_since(connection, owner=replica.owner)["token"]
+        task_ids = set()
+        tasks = iter_tasks(connection, limit, owner=replica.owner)
+        while batch := list(itertools.islice(tasks, limit)):
+            task_ids.update(task["id"] for task in batch)
+            conflicts += replica.apply_remote(batch, [])
+        replica.remove_missing(task_ids, token)
+        _end_snapshot(connection)
+        # změny provedené během načítání
+        pulled, more_conflicts = _pull_changes(replica, connection, token, limit)
+        pulled += len(task_ids)
+        conflicts += more_conflicts
+
+    pushed = 0
+    for task_id, base_version, task in replica.pending_changes():
+        if base_version is None:  # úkol vytvořený v replice
+            if task is not None:
+                new_id = add_task(
+                    connection, task["name"], task["description"], task["state"], task["owner"]
+                )
+                replica.mark_inserted(task_id, new_id)
+                pushed += 1
+            else:
+                replica.mark_pushed(task_id)  # vytvořený a zase smazaný, není co odeslat
+            continue
+        try:
+            if task is None:
+                delete_task(connection, task_id, replica.owner, base_version)
+            else:
+                update_task_state(
+                    connection, task_id, task["state"], base_version, task["owner"]
+                )
+        except TaskConflictError:
+            continue  # úkol se na serveru změnil po stažení, vyřeší příští synchronizace
+        except ValueError:  # úkol mezitím smazali na serveru, smazání má přednost
+            replica.drop(task_id)
+            conflicts += task is not None
+            continue
+        replica.mark_pushed(task_id, None if task is None else base_version + 1)
+        pushed += 1
+
+    _end_snapshot(connection)  # např. po kontrole existence úkolu při konfliktu
+    if _task_cache is not None:  # replika se měnila mimo funkce modulu
+        _task_cache.clear()
+    return {
+        "pulled": pulled,
+        "pushed": pushed,
+        "conflicts": conflicts,
+        "pending": len(replica.pending_changes()),
+    }
+
+
+def _end_snapshot(connection):
+    """Ukončí čtecí snímek, který na připojení MySQL nechala čtení během
+    synchronizace. Synchronizace začíná bez otevřené transakce (jinak
+    get_changes_since skončí chybou), zápisy modulu se vždy potvrzují, v
+    transakci tak není nic než čtení."""
+
+    if not isinstance(connection, TaskBackend) and connection.in_transaction:
+        connection.rollback()
+
+
+def _pull_changes(replica, connection, token, limit):
+    """Stáhne do repliky změny na serveru od tokenu.
+    Returns:
+        tuple: Počet stažených změn a počet vyřešených konfliktů.
+    Raises:
+        ChangeTokenExpiredError: Pokud log změn token už nepokrývá.
+    """
+
+    pulled = conflicts = 0
+    while True:
+        changes = get_changes_since(connection, token, limit, replica.owner)
+        pulled += len(changes["updated"]) + len(changes["deleted"])
+        conflicts += replica.apply_remote(changes["updated"], changes["deleted"], changes["token"])
+        token = changes["token"]
+        if not changes["has_more"]:
+            return pulled, conflicts
+
+
+def enable_write_behind(connection, max_pending=10000, batch_size=500, flush_interval=0.01):
+    """Zapne pro připojení odložený zápis (write-behind). Funkce queue_add_task()
+    a queue_update_task_state() pak zápis jen zařadí do omezené fronty a vlákno
+    na pozadí ho provede v dávce s dalšími zápisy, potvrzené jedním COMMIT.
+    Připojení od té chvíle používá jen vlákno zapisovače, čtení a ostatní
+    operace patří na jiné připojení. Po ztrátě spojení dostanou chybu zápisy
+    rozepsané dávky a zapisovač připojení obnoví pro další dávky. Zápisy,
+    které ve frontě zbudou, dopíše close_connection() (případně ukončení
+    procesu) před uzavřením připojení.
+    Args:
+        connection: Připojení k databázi.
+        max_pending (int): Maximální počet zápisů čekajících ve frontě.
+        batch_size (int): Maximální počet zápisů v jedné transakci.
+        flush_interval (float): Jak dlouho (v sekundách) nejvýše čeká první
+            zápis dávky na další zápisy.
+    Returns:
+        TaskWriter: Zapnutý zapisovač (počty zapsaných dávek a zápisů).
+    Raises:
+        RuntimeError: Pokud není k dispozici připojení nebo je už odložený
+            zápis zapnutý.
+        ValueError: Pokud jsou zadané neplatné parametry.
+    """
+
+    if not connection:
+        raise RuntimeError("No database connection.")
+    with _writers_lock:
+        if connection in _writers:
+            raise RuntimeError("Write-behind is already enabled.")
+        writer = TaskWriter(
+            functools.partial(_write_batch, connection), max_pending, batch_size, flush_interval
+        )
+        _writers[connection] = writer
+    atexit.register(writer.close)
+    return writer
+
+
+def queue_add_task(connection, name, description, state, timeout=None, owner=None):
+    """Zařadí přidání úkolu do fronty odloženého zápisu (viz enable_write_behind).
+    Hodnoty se ověří hned, stejně jako v add_task().
+    Args:
+        connection: Připojení k databázi se zapnutým odloženým zápisem.
+        name (str): Název úkolu.
+        description (str): Popis úkolu.
+        state (str): Stav úkolu ('pending', 'in_progress', 'completed').
+        timeout (float): Jak dlouho čekat na místo v plné frontě, None bez omezení.
+        owner (str): Vlastník úkolu, None pro společný seznam.
+    Returns:
+        Future: ID nového úkolu, dostupné (result()) po potvrzení transakce.
+    Raises:
+        RuntimeError: Pokud odložený zápis není zapnutý nebo fronta zůstala plná.
+        ValueError: Pokud jsou zadané neplatné hodnoty.
+    """
+
+    writer = _writer(connection)
+    _validate_task(name, description, state)
+    return writer.submit("insert", (name, description, state, _insert_owner(owner)), timeout)
+
+
+def queue_update_task_state(
+    connection, task_id, new_state, expected_version=None, timeout=None, owner=None
+):
+    """Zařadí změnu stavu úkolu do fronty odloženého zápisu (viz
+    enable_write_behind). Hodnoty se ověří hned, stejně jako v
+    update_task_state(); neexistující úkol nebo konflikt verzí se pozná až
+    při zápisu a ohlásí se výjimkou z Future.
+    Args:
+        connection: Připojení k databázi se zapnutým odloženým zápisem.
+        task_id (int): ID úkolu.
+        new_state (str): Nový stav úkolu.
+        expected_version (int): Verze úkolu, ze které klient vychází, None
+            pro změnu bez kontroly.
+        timeout (float): Jak dlouho čekat na místo v plné frontě, None bez omezení.
+        owner (str): Změní úkol jen tehdy, pokud patří tomuto vlastníkovi.
+    Returns:
+        Future: None po potvrzení změny, nebo výjimka ValueError (neexistující
+            ID) či TaskConflictError.
+    Raises:
+        RuntimeError: Pokud odložený zápis není zapnutý nebo fronta zůstala plná.
+        ValueError: Pokud je zadaný neplatný stav úkolu, verze nebo vlastník.
+    """
+
+    writer = _writer(connection)
+    if new_state not in TASK_STATES:
+        raise ValueError("Invalid task state.")
+    if expected_version is not None:
+        _check_version(expected_version)
+    _check_owner(owner)
+    return writer.submit("update", (task_id, new_state, expected_version, owner), timeout)
+
+
+def flush_writes(connection, timeout=None):
+    """Počká, až budou potvrzené všechny zápisy dosud zařazené do fronty
+    odloženého zápisu připojení (trvalé potvrzení pro volající, kteří ho
+    potřebují).
+    Args:
+        connection: Připojení k databázi se zapnutým odloženým zápisem.
+        timeout (float): Jak dlouho nejvýše čekat, None bez omezení.
+    Raises:
+        RuntimeError: Pokud odložený zápis není zapnutý.
+        TimeoutError: Pokud se zápisy do timeout nepotvrdily.
+        Exception: První chyba odloženého zápisu od předchozího volání.
+    """
+
+    _writer(connection).flush(timeout)
+
+
+def _writer(connection):
+    """Vrátí zapisovač odloženého zápisu připojení.
+    Raises:
+        RuntimeError: Pokud není k dispozici připojení nebo zapisovač.
+    """
+
+    if not connection:
+        raise RuntimeError("No database connection.")
+    writer = _writers.get(connection)
+    if writer is None:
+        raise RuntimeError("Write-behind is not enabled.")
+    return writer
+
+
+def _write_batch(connection, writes):
+    """Provede dávku odložených zápisů v jedné transakci a aktualizuje cache.
+    Volá ji vlákno zapisovače (TaskWriter).
+    Args:
+        connection: Připojení k databázi.
+        writes (list): Dvojice ("insert", (name, description, state, owner))
+            nebo ("update", (task_id, new_state, expected_version, owner)).
+    Returns:
+        list: Pro každý zápis ID nového úkolu, None u změny stavu, nebo
+            výjimku, pokud změna neproběhla (neexistující ID, konflikt verzí).
+    """
+
+    metrics = _metrics
+    if metrics is None:
+        outcomes = _apply_writes(connection, writes)
+    else:
+        with metrics.operation("write_behind") as call:
+            outcomes = _apply_writes(connection, writes)
+            call.rows = len(writes)
+
+    results = []
+    for (operation, args), outcome in zip(writes, outcomes):
+        if operation == "insert":
+            if _task_cache is not None:
+                _task_cache.task_added(args[0], args[2], args[3], _cache_scope(connection))
+            results.append(outcome)
+        elif outcome is True:
+            if _task_cache is not None:
+                _task_cache.task_updated(args[0], args[1], args[3], _cache_scope(connection))
+            results.append(None)
+        elif outcome is False:
+            results.append(ValueError("Invalid task ID."))
+        else:  # TaskConflictError, cache mohla mít zastaralou verzi
+            if _task_cache is not None:
+                _task_cache.clear()
+            results.append(outcome)
+    return results
+
+
+def _apply_writes(connection, writes):
+    """Provede zápisy dávky v jedné transakci.
+    Returns:
+        list: ID nového úkolu u přidání; u změny stavu True, False pro
+            neexistující úkol, nebo TaskConflictError.
+    """
+
+    if isinstance(connection, TaskBackend):
+        return connection.apply_writes(writes)
+
+    outcomes = []
+    changes = []
+    try:
+        for operation, args in writes:
+            if operation == "insert":
+                task_id = _execute(
+                    connection,
+                    "INSERT INTO tasks (name, description, state, owner) VALUES (%s, %s, %s, %s)",
+                    args,
+                ).lastrowid
+                outcomes.append(task_id)
+                changes.append(("insert", task_id))
+                continue
+            task_id, new_state, expected_version, owner = args
+            query, params = _update_state_query(task_id, new_state, expected_version, owner)
+            if _execute(connection, query, params).rowcount > 0:
+                outcomes.append(True)
+                changes.append(("update", task_id))
+            elif expected_version is not None and _task_exists(connection, task_id, owner):
+                outcomes.append(TaskConflictError([task_id]))
+            else:
+                outcomes.append(False)
+        # log změn ve stejném pořadí jako zápisy, po úsecích stejné operace
+        for operation, group in itertools.groupby(changes, key=operator.itemgetter(0)):
+            _log_changes(connection, operation, [task_id for _, task_id in group])
+        _commit(connection)
+    except _mysql().Error as e:
+        error = _write_error(connection, e)
+        if isinstance(error, ServerUnreachableError):
+            _restore_writer(connection)
+        raise error
+    return outcomes
+
+
+def _restore_writer(connection):
+    """Po ztrátě spojení obnoví připojení zapisovače, aby další dávky nezůstaly
+    na spadlém spojení. Neúspěšná dávka se neopakuje (není jisté, zda COMMIT
+    proběhl); nepodaří-li se spojení obnovit, zkusí to znovu další dávka.
+    """
+
+    try:
+        _reconnect(connection)
+    except _mysql().Error:
+        pass
 
 
 def close_connection(connection):
-    """Uzavře připojení k databázi.
+    """Uzavře připojení k databázi. Se zapnutým odloženým zápisem nejdřív
+    dopíše všechny zápisy, které zůstaly ve frontě.
     Args:
         connection: Připojení k databázi.
     """
 
     if connection:
+        with _writers_lock:
+            writer = _writers.pop(connection, None)
+        if writer is not None:
+            writer.close()
+            atexit.unregister(writer.close)
+        _close_statements(connection)
         connection.close()
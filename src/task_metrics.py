@@ -0,0 +1,323 @@
+"""
+task_metrics.py: Měření databázových operací - histogramy latence, počty
+vrácených řádků a dotazů (round trips) a log pomalých dotazů.
+
+Metriky se zapínají v modulu task_manager_db funkcí enable_metrics(). Každá
+veřejná funkce modulu (add_task, get_tasks, ...) se měří jako jedna operace,
+každý příkaz poslaný na server MySQL (včetně COMMIT) jako jeden dotaz dané
+operace. Dotazy pomalejší než nastavený práh se zapisují do logu
+"task_manager.slow_query" s parametry nahrazenými jen jejich typy.
+Výsledky lze vypsat ve formátu Prometheus (to_prometheus) nebo jako JSON
+(to_json).
+
+Author: Jan Bláha
+Email: jan.blaha@bcas.cz
+"""
+
+import contextvars
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+# Horní meze košů histogramů latence v sekundách (poslední koš je +Inf).
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# Metriky ve výstupu to_prometheus(): název, typ, atribut OperationStats, popis.
+PROMETHEUS_METRICS = (
+    ("task_db_operation_seconds", "histogram", "latency", "Duration of task_manager_db calls."),
+    ("task_db_query_seconds", "histogram", "query_latency", "Duration of server statements."),
+    ("task_db_rows_total", "counter", "rows", "Rows returned to the caller."),
+    ("task_db_round_trips_total", "counter", "round_trips", "Statements sent to the server."),
+    ("task_db_errors_total", "counter", "errors", "Calls that raised an exception."),
+    ("task_db_slow_queries_total", "counter", "slow_queries", "Statements over the threshold."),
+)
+
+slow_query_log = logging.getLogger("task_manager.slow_query")
+
+
+class Histogram:
+    """Histogram dob trvání s pevnými koši (kumulativní jako v Prometheu)."""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds):
+        """Zaznamená jednu dobu trvání v sekundách."""
+
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                break
+        else:
+            i = len(BUCKETS)
+        self.counts[i] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def cumulative(self):
+        """Vrátí dvojice (horní mez, počet hodnot <= mez) včetně +Inf."""
+
+        total = 0
+        result = []
+        for bound, count in zip((*BUCKETS, float("inf")), self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+    def quantile(self, q):
+        """Odhadne kvantil (horní mez koše, do kterého padne); 0 bez hodnot."""
+
+        rank = q * self.count
+        for bound, total in self.cumulative():
+            if total >= rank and total:
+                return bound if bound != float("inf") else BUCKETS[-1]
+        return 0.0
+
+
+class OperationStats:
+    """Souhrnné metriky jedné operace (např. get_tasks_page)."""
+
+    def __init__(self):
+        self.latency = Histogram()
+        self.query_latency = Histogram()
+        self.rows = 0
+        self.round_trips = 0
+        self.errors = 0
+        self.slow_queries = 0
+
+
+class Call:
+    """Jedno volání operace; plní se během měření."""
+
+    def __init__(self, operation, parent=None):
+        self.operation = operation
+        self.parent = parent  # vnější volání, None u samostatné operace
+        self.seconds = 0.0
+        self.rows = 0
+        self.round_trips = 0
+        self.error = False
+
+    def root(self):
+        """Vrátí nejvnější volání, do kterého se započítávají dotazy."""
+
+        call = self
+        while call.parent is not None:
+            call = call.parent
+        return call
+
+
+class TaskMetrics:
+    """Sběr metrik databázových operací, bezpečný pro více vláken."""
+
+    def __init__(self, slow_query_ms=100.0):
+        """
+        Args:
+            slow_query_ms (float): Práh pro log pomalých dotazů v milisekundách.
+        Raises:
+            ValueError: Pokud je práh záporný.
+        """
+
+        if slow_query_ms < 0:
+            raise ValueError("Invalid slow query threshold.")
+        self.slow_query_ms = slow_query_ms
+        self._operations = {}
+        self._lock = threading.Lock()
+        # právě měřené volání a seznam z collect(); každé vlákno (i úloha
+        # asyncio) má vlastní kontext, vnořené volání ho obnoví při ukončení
+        self._call = contextvars.ContextVar("call", default=None)
+        self._collected = contextvars.ContextVar("collected", default=None)
+
+    @contextmanager
+    def operation(self, name):
+        """Změří jedno volání operace. Dotazy vnořených volání (veřejná funkce
+        volaná z jiné) se započítají do vnější operace; vnořené volání má
+        vlastní záznam, takže jeho řádky ani chyba (např. zachycená vnější
+        funkcí) vnější volání nepřepíšou.
+        Args:
+            name (str): Název operace.
+        Yields:
+            Call: Záznam volání, do kterého lze doplnit počet řádků (rows).
+        """
+
+        call = Call(name, self._call.get())
+        token = self._call.set(call)
+        start = time.perf_counter()
+        try:
+            yield call
+        except BaseException:
+            call.error = True
+            raise
+        finally:
+            call.seconds = time.perf_counter() - start
+            self._call.reset(token)
+            if call.parent is None:
+                self._finish(call)
+
+    def record_query(self, query, params, seconds, operation=None):
+        """Zaznamená jeden dotaz poslaný na server.
+        Args:
+            query (str): SQL dotaz.
+            params: Parametry dotazu (do logu se zapíší jen jejich typy).
+            seconds (float): Doba trvání dotazu.
+            operation (str): Název operace, pokud dotaz neběží uvnitř měřené
+                operace (např. iter_tasks).
+        """
+
+        call = self._call.get()
+        if call is not None:
+            call = call.root()
+            call.round_trips += 1
+            operation = call.operation
+        operation = operation or "other"
+        slow = seconds * 1000 >= self.slow_query_ms
+        with self._lock:
+            stats = self._stats(operation)
+            stats.query_latency.observe(seconds)
+            if call is None:
+                stats.round_trips += 1
+            if slow:
+                stats.slow_queries += 1
+        if slow:
+            slow_query_log.warning(
+                "slow query in %s (%.1f ms): %s; params: %s",
+                operation,
+                seconds * 1000,
+                " ".join(query.split()),
+                redact(params),
+            )
+
+    @contextmanager
+    def collect(self):
+        """Shromáždí volání operací provedená v aktuálním vlákně (např. během
+        jedné akce uživatele).
+        Yields:
+            list: Seznam objektů Call, doplňuje se po skončení každého volání.
+        """
+
+        calls = []
+        token = self._collected.set(calls)
+        try:
+            yield calls
+        finally:
+            self._collected.reset(token)
+
+    def snapshot(self):
+        """Vrátí aktuální metriky jako slovník podle názvu operace.
+        Returns:
+            dict: Počty, součty, kvantily latence (p50, p99 v ms) a koše histogramů.
+        """
+
+        with self._lock:
+            return {
+                name: {
+                    "calls": stats.latency.count,
+                    "errors": stats.errors,
+                    "rows": stats.rows,
+                    "round_trips": stats.round_trips,
+                    "slow_queries": stats.slow_queries,
+                    "latency_seconds_sum": stats.latency.sum,
+                    "latency_p50_ms": stats.latency.quantile(0.5) * 1000,
+                    "latency_p99_ms": stats.latency.quantile(0.99) * 1000,
+                    "latency_buckets": _buckets(stats.latency),
+                    "queries": stats.query_latency.count,
+                    "query_seconds_sum": stats.query_latency.sum,
+                    "query_buckets": _buckets(stats.query_latency),
+                }
+                for name, stats in sorted(self._operations.items())
+            }
+
+    def to_json(self):
+        """Vrátí metriky jako text JSON (viz snapshot)."""
+
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self):
+        """Vrátí metriky v textovém formátu Prometheus (exposition format).
+        Returns:
+            str: Text pro endpoint /metrics nebo node_exporter textfile.
+        """
+
+        with self._lock:
+            operations = sorted(self._operations.items())
+            lines = []
+            for metric, kind, attribute, help_text in PROMETHEUS_METRICS:
+                lines.append(f"# HELP {metric} {help_text}")
+                lines.append(f"# TYPE {metric} {kind}")
+                for name, stats in operations:
+                    label = f'operation="{name}"'
+                    value = getattr(stats, attribute)
+                    if kind == "counter":
+                        lines.append(f"{metric}{{{label}}} {value}")
+                        continue
+                    for bound, total in value.cumulative():
+                        le = "+Inf" if bound == float("inf") else repr(bound)
+                        lines.append(f'{metric}_bucket{{{label},le="{le}"}} {total}')
+                    lines.append(f"{metric}_sum{{{label}}} {value.sum!r}")
+                    lines.append(f"{metric}_count{{{label}}} {value.count}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        """Vynuluje všechny metriky."""
+
+        with self._lock:
+            self._operations.clear()
+
+    def _stats(self, operation):
+        """Vrátí (případně založí) metriky operace; volá se pod zámkem."""
+
+        stats = self._operations.get(operation)
+        if stats is None:
+            stats = self._operations[operation] = OperationStats()
+        return stats
+
+    def _finish(self, call):
+        """Započítá dokončené volání do souhrnných metrik."""
+
+        with self._lock:
+            stats = self._stats(call.operation)
+            stats.latency.observe(call.seconds)
+            stats.rows += call.rows
+            stats.round_trips += call.round_trips
+            stats.errors += call.error
+        collected = self._collected.get()
+        if collected is not None:
+            collected.append(call)
+
+
+def redact(params):
+    """Nahradí hodnoty parametrů jejich typy, aby se do logu nedostala data.
+    Args:
+        params: Parametry dotazu (n-tice, seznam), nebo seznam řádků u executemany.
+    Returns:
+        str: Např. "(str, str, int)" nebo "1000 rows".
+    """
+
+    if not params:
+        return "()"
+    params = list(params)
+    if isinstance(params[0], (tuple, list)):
+        return f"{len(params)} rows"
+    return "(" + ", ".join(type(value).__name__ for value in params) + ")"
+
+
+def row_count(result):
+    """Vrátí počet řádků ve výsledku operace (seznam úkolů, slovník počtů,
+    změny z get_changes_since)."""
+
+    if isinstance(result, dict) and "has_more" in result:
+        return len(result["updated"]) + len(result["deleted"])
+    if isinstance(result, (list, dict)):
+        return len(result)
+    return 0
+
+
+def _buckets(histogram):
+    """Vrátí kumulativní koše histogramu jako slovník {"mez": počet}."""
+
+    return {
+        "+Inf" if bound == float("inf") else repr(bound): total
+        for bound, total in histogram.cumulative()
+    }
@@ -0,0 +1,308 @@
+"""
+task_replica.py: Místní replika úkolů v SQLite pro práci offline.
+
+TaskReplica je úložiště SQLite (viz task_backends.SQLiteBackend) s kopií
+úkolů jednoho vlastníka ze serveru. Funkce modulu task_manager_db s ní
+pracují jako s každým jiným úložištěm, čtení proto neprochází sítí. Změny
+provedené v replice zapisují triggery do žurnálu (tabulka replica_journal),
+jeden záznam na změněný úkol s verzí, ze které změna vychází. Synchronizaci
+se serverem provádí funkce task_manager_db.sync_replica(): stáhne změny od
+posledního tokenu logu změn, vyřeší konflikty a odešle žurnál.
+
+Konflikty se řeší podle verze úkolu na serveru, ne podle hodin: změna
+v replice se odešle jen s kontrolou verze, ze které vychází (expected_version),
+a pokud se úkol na serveru od této verze změnil nebo byl smazán, má přednost
+potvrzená změna na serveru a změna z repliky se zahodí. Stejně se odesílá
+i smazání úkolu. Úkoly vytvořené v replice mají dočasné ID, po odeslání na
+server dostanou ID přidělené serverem.
+
+Author: Jan Bláha
+Email: jan.blaha@bcas.cz
+"""
+
+from contextlib import contextmanager
+
+from src.task_backends import TASK_COLUMNS, SQLiteBackend, _to_text
+
+# Tabulky a triggery repliky. Zápisy ze synchronizace běží s příznakem
+# applying = 1, do žurnálu se proto dostanou jen změny provedené v replice.
+_REPLICA_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS replica_state (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        token INTEGER,
+        owner TEXT,
+        applying INTEGER NOT NULL DEFAULT 0
+    )
+    """,
+    "INSERT OR IGNORE INTO replica_state (id) VALUES (1)",
+    """
+    CREATE TABLE IF NOT EXISTS replica_journal (
+        task_id INTEGER PRIMARY KEY,
+        base_version INTEGER,
+        changed_at TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS replica_journal_insert AFTER INSERT ON tasks
+    WHEN (SELECT applying FROM replica_state) = 0 BEGIN
+        INSERT INTO replica_journal (task_id, base_version, changed_at)
+        VALUES (new.id, NULL, datetime('now', 'localtime'));
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS replica_journal_update AFTER UPDATE ON tasks
+    WHEN (SELECT applying FROM replica_state) = 0 BEGIN
+        INSERT OR IGNORE INTO replica_journal (task_id, base_version, changed_at)
+        VALUES (old.id, old.version, datetime('now', 'localtime'));
+        UPDATE replica_journal SET changed_at = datetime('now', 'localtime')
+        WHERE task_id = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS replica_journal_delete AFTER DELETE ON tasks
+    WHEN (SELECT applying FROM replica_state) = 0 BEGIN
+        INSERT OR IGNORE INTO replica_journal (task_id, base_version, changed_at)
+        VALUES (old.id, old.version, datetime('now', 'localtime'));
+        UPDATE replica_journal SET changed_at = datetime('now', 'localtime')
+        WHERE task_id = old.id;
+    END
+    """,
+]
+
+# Uložení úkolu ze serveru; vlastník se nemění, replika drží jen jednoho.
+_UPSERT_TASK = (
+    f"INSERT INTO tasks ({TASK_COLUMNS}, owner) VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT (id) DO UPDATE SET name = excluded.name, "
+    "description = excluded.description, state = excluded.state, "
+    "created_at = excluded.created_at, version = excluded.version, "
+    "updated_at = excluded.updated_at"
+)
+
+# Kopie úkolu pod jiným ID; ID se nemění příkazem UPDATE, aby index FTS5
+# (content_rowid='id') zůstal v souladu s tabulkou.
+_COPY_TASK = (
+    f"INSERT INTO tasks ({TASK_COLUMNS}, owner) "
+    "SELECT ?, name, description, state, created_at, ?, updated_at, owner "
+    "FROM tasks WHERE id = ?"
+)
+
+
+class TaskReplica(SQLiteBackend):
+    """Místní kopie úkolů jednoho vlastníka se žurnálem neodeslaných změn."""
+
+    def __init__(self, path, owner=""):
+        """
+        Args:
+            path (str): Cesta k souboru repliky, nebo ':memory:'.
+            owner (str): Vlastník, jehož úkoly replika drží ('' pro společný
+                seznam).
+        Raises:
+            ValueError: Pokud replika už obsahuje úkoly jiného vlastníka.
+        """
+
+        super().__init__(path)
+        token, stored_owner = self._connection.execute(
+            "SELECT token, owner FROM replica_state"
+        ).fetchone()
+        if token is not None and stored_owner != owner:
+            self.close()
+            raise ValueError("Replica belongs to another owner.")
+        with self._connection:
+            self._connection.execute("UPDATE replica_state SET owner = ?", (owner,))
+        self.owner = owner
+
+    def migrate(self):
+        version = super().migrate()
+        with self._connection:
+            for statement in _REPLICA_SCHEMA:
+                self._connection.execute(statement)
+        return version
+
+    @property
+    def token(self):
+        """Token logu změn serveru z poslední synchronizace, None před první."""
+
+        return self._connection.execute("SELECT token FROM replica_state").fetchone()[0]
+
+    def pending_changes(self):
+        """Vrátí neodeslané změny v pořadí, v jakém vznikly.
+        Returns:
+            list: N-tice (task_id, base_version, task): base_version je verze
+                ze serveru (None u úkolu vytvořeného v replice), task slovník
+                s klíči name, description, state, owner, nebo None u smazaného.
+        """
+
+        rows = self._connection.execute(
+            "SELECT replica_journal.task_id, base_version, tasks.id IS NOT NULL AS present, "
+            "name, description, state, owner FROM replica_journal "
+            "LEFT JOIN tasks ON tasks.id = replica_journal.task_id "
+            "ORDER BY changed_at, replica_journal.task_id"
+        ).fetchall()
+        return [
+            (
+                row["task_id"],
+                row["base_version"],
+                {key: row[key] for key in ("name", "description", "state", "owner")}
+                if row["present"]
+                else None,
+            )
+            for row in rows
+        ]
+
+    def apply_remote(self, updated, deleted, token=None):
+        """Uloží úkoly změněné a smazané na serveru a vyřeší konflikty.
+        Úkol se změnou v žurnálu, který se na serveru od verze base_version
+        nezměnil, zůstane v replice beze změny. Pokud se na serveru změnil,
+        uloží se verze ze serveru a změna ze žurnálu se zahodí.
+        Args:
+            updated (list): Úkoly ze serveru (slovníky jako z get_tasks).
+            deleted (list): ID úkolů smazaných na serveru.
+            token (int): Nový token logu změn, None pro ponechání stávajícího.
+        Returns:
+            int: Počet vyřešených konfliktů.
+        """
+
+        conflicts = 0
+        with self._applying() as db:
+            # ID úkolu -> verze ze serveru, ze které změna vychází (None u nového)
+            journal = dict(db.execute("SELECT task_id, base_version FROM replica_journal"))
+            for task in updated:
+                if task["id"] in journal and journal[task["id"]] is None:
+                    # ID zabral úkol vytvořený v replice, dostane nové dočasné ID
+                    new_id = self._move(db, task["id"])
+                    if new_id is not None:
+                        journal[new_id] = None
+                    del journal[task["id"]]
+                if task["id"] in journal:
+                    if task["version"] == journal[task["id"]]:
+                        continue  # na serveru se úkol od naší verze nezměnil
+                    # potvrzená změna na serveru má přednost před změnou v replice
+                    conflicts += 1
+                    db.execute("DELETE FROM replica_journal WHERE task_id = ?", (task["id"],))
+                db.execute(
+                    _UPSERT_TASK,
+                    (
+                        task["id"],
+                        task["name"],
+                        task["description"],
+                        task["state"],
+                        _to_text(task["created_at"]),
+                        task["version"],
+                        _to_text(task["updated_at"]),
+                        self.owner,
+                    ),
+                )
+            for task_id in deleted:
+                if task_id in journal and journal[task_id] is None:
+                    continue  # stejné ID má úkol vytvořený v replice
+                db.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+                db.execute("DELETE FROM replica_journal WHERE task_id = ?", (task_id,))
+            if token is not None:
+                db.execute("UPDATE replica_state SET token = ?", (token,))
+        return conflicts
+
+    def remove_missing(self, task_ids, token):
+        """Po úplném načtení ze serveru odstraní úkoly, které na serveru už nejsou.
+        Args:
+            task_ids (set): ID všech úkolů vlastníka na serveru.
+            token (int): Token logu změn z doby před načtením.
+        """
+
+        with self._applying() as db:
+            stale = [
+                row[0]
+                for row in db.execute(
+                    "SELECT id FROM tasks WHERE id NOT IN "
+                    "(SELECT task_id FROM replica_journal WHERE base_version IS NULL)"
+                )
+                if row[0] not in task_ids
+            ]
+            stale.extend(
+                row[0]
+                for row in db.execute(
+                    "SELECT task_id FROM replica_journal "
+                    "WHERE base_version IS NOT NULL "
+                    "AND task_id NOT IN (SELECT id FROM tasks)"
+                )
+                if row[0] not in task_ids
+            )
+            for start in range(0, len(stale), 500):
+                chunk = stale[start : start + 500]
+                placeholders = ", ".join("?" * len(chunk))
+                db.execute(f"DELETE FROM tasks WHERE id IN ({placeholders})", chunk)
+                db.execute(
+                    f"DELETE FROM replica_journal WHERE task_id IN ({placeholders})", chunk
+                )
+            db.execute("UPDATE replica_state SET token = ?", (token,))
+
+    def mark_pushed(self, task_id, version=None):
+        """Odebere odeslanou změnu ze žurnálu.
+        Args:
+            task_id (int): ID úkolu.
+            version (int): Verze úkolu na serveru po změně, None beze změny.
+        """
+
+        with self._applying() as db:
+            if version is not None:
+                db.execute("UPDATE tasks SET version = ? WHERE id = ?", (version, task_id))
+            db.execute("DELETE FROM replica_journal WHERE task_id = ?", (task_id,))
+
+    def mark_inserted(self, local_id, server_id):
+        """Převede úkol vytvořený v replice na ID přidělené serverem.
+        Args:
+            local_id (int): Dočasné ID úkolu v replice.
+            server_id (int): ID úkolu na serveru.
+        """
+
+        with self._applying() as db:
+            db.execute("DELETE FROM replica_journal WHERE task_id = ?", (local_id,))
+            if local_id == server_id:
+                db.execute("UPDATE tasks SET version = 1 WHERE id = ?", (local_id,))
+                return
+            if db.execute("SELECT 1 FROM tasks WHERE id = ?", (server_id,)).fetchone():
+                self._move(db, server_id)  # ID má jiný dosud neodeslaný úkol
+            db.execute(_COPY_TASK, (server_id, 1, local_id))
+            db.execute("DELETE FROM tasks WHERE id = ?", (local_id,))
+
+    def drop(self, task_id):
+        """Odstraní úkol smazaný na serveru i s jeho změnou v žurnálu."""
+
+        with self._applying() as db:
+            db.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+            db.execute("DELETE FROM replica_journal WHERE task_id = ?", (task_id,))
+
+    def archive_tasks(self, completed_before, chunk_size):
+        # archivace přesouvá úkoly na serveru, v replice by se odeslala jako smazání
+        raise RuntimeError("Archiving is not supported on a replica.")
+
+    def restore_tasks(self, rows, progress=None):
+        # obnovené úkoly by se odeslaly jako nové a dostaly by na serveru jiná ID
+        raise RuntimeError("Restoring is not supported on a replica.")
+
+    @contextmanager
+    def _applying(self):
+        """Transakce pro zápisy ze synchronizace, které se nezapisují do žurnálu."""
+
+        with self._connection:
+            self._connection.execute("UPDATE replica_state SET applying = 1")
+            yield self._connection
+            self._connection.execute("UPDATE replica_state SET applying = 0")
+
+    def _move(self, db, task_id):
+        """Přesune úkol vytvořený v replice na nové dočasné ID a vrátí ho
+        (None, pokud byl úkol v replice mezitím smazán a není co přesouvat).
+        """
+
+        row = db.execute("SELECT version FROM tasks WHERE id = ?", (task_id,)).fetchone()
+        if row is None:
+            db.execute("DELETE FROM replica_journal WHERE task_id = ?", (task_id,))
+            return None
+        new_id = db.execute(
+            "SELECT MAX(COALESCE(MAX(id), 0), COALESCE((SELECT seq FROM sqlite_sequence "
+            "WHERE name = 'tasks'), 0)) + 1 FROM tasks"
+        ).fetchone()[0]
+        db.execute(_COPY_TASK, (new_id, row[0], task_id))
+        db.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+        db.execute("UPDATE replica_journal SET task_id = ? WHERE task_id = ?", (new_id, task_id))
+        return new_id
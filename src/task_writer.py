@@ -0,0 +1,167 @@
+"""
+task_writer.py: Odložený zápis úkolů na pozadí (write-behind) se skupinovým
+potvrzováním.
+
+Zapisovač se zapíná v modulu task_manager_db funkcí enable_write_behind().
+Zápisy čekají v omezené frontě, ze které je vlákno na pozadí bere po dávkách
+a každou dávku potvrdí jedním COMMIT. Dávka se zapíše, jakmile má batch_size
+zápisů, nebo nejpozději flush_interval sekund po svém prvním zápisu. Plná
+fronta volajícího zdrží, dokud se v ní neuvolní místo (back-pressure).
+Výsledek zápisu (ID úkolu nebo chyba) dostane volající přes Future, a to až
+po potvrzení transakce.
+
+Author: Jan Bláha
+Email: jan.blaha@bcas.cz
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+# Značky, které se ve frontě řadí mezi zápisy.
+_FLUSH = "flush"
+_STOP = "stop"
+
+
+class TaskWriter:
+    """Omezená fronta odložených zápisů a vlákno, které je zapisuje po dávkách."""
+
+    def __init__(self, write_batch, max_pending=10000, batch_size=500, flush_interval=0.01):
+        """
+        Args:
+            write_batch (callable): Provede seznam dvojic (operace, argumenty)
+                v jedné transakci a vrátí výsledek každého zápisu (hodnotu,
+                nebo výjimku, pokud daný zápis neproběhl).
+            max_pending (int): Maximální počet zápisů čekajících ve frontě.
+            batch_size (int): Maximální počet zápisů v jedné transakci.
+            flush_interval (float): Jak dlouho (v sekundách) nejvýše čeká
+                první zápis dávky na další zápisy.
+        Raises:
+            ValueError: Pokud jsou zadané neplatné parametry.
+        """
+
+        if max_pending < 1 or batch_size < 1 or flush_interval < 0:
+            raise ValueError("Invalid write-behind settings.")
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.batches = 0  # počet zapsaných dávek (transakcí)
+        self.written = 0  # počet zpracovaných zápisů
+        self._write_batch = write_batch
+        self._queue = queue.Queue()
+        # volná místa ve frontě; značky flush/stop místo nezabírají
+        self._slots = threading.Semaphore(max_pending)
+        self._closed = False
+        # zámek pro zařazování, aby po uzavření nic nezůstalo ve frontě; drží
+        # se jen krátce, na volné místo se čeká mimo něj
+        self._lock = threading.Lock()
+        self._error = None  # první chyba zápisu od posledního flush()
+        self._error_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="task-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, operation, args, timeout=None):
+        """Zařadí zápis do fronty; při plné frontě čeká na volné místo.
+        Args:
+            operation (str): Druh zápisu ('insert' nebo 'update').
+            args (tuple): Již ověřené argumenty zápisu.
+            timeout (float): Jak dlouho čekat na místo ve frontě, None bez omezení.
+        Returns:
+            Future: Výsledek zápisu, dostupný po potvrzení transakce.
+        Raises:
+            RuntimeError: Pokud je zapisovač uzavřený nebo fronta zůstala plná.
+        """
+
+        if not self._slots.acquire(timeout=timeout):
+            raise RuntimeError("Write-behind queue is full.")
+        future = Future()
+        try:
+            self._put((operation, args, future))
+        except RuntimeError:
+            self._slots.release()
+            raise
+        return future
+
+    def flush(self, timeout=None):
+        """Počká, až budou potvrzené všechny dosud zařazené zápisy.
+        Args:
+            timeout (float): Jak dlouho nejvýše čekat, None bez omezení.
+        Raises:
+            RuntimeError: Pokud je zapisovač uzavřený.
+            TimeoutError: Pokud se zápisy do timeout nepotvrdily.
+            Exception: První chyba zápisu od předchozího flush(), aby se
+                neztratila ani u volajících, kteří na výsledky zápisů nečekají.
+        """
+
+        marker = Future()
+        self._put((_FLUSH, None, marker))
+        marker.result(timeout)
+        with self._error_lock:
+            error, self._error = self._error, None
+        if error is not None:
+            raise error
+
+    def close(self):
+        """Přestane přijímat zápisy, dopíše všechny zařazené a ukončí vlákno."""
+
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put((_STOP, None, None))
+        self._thread.join()
+
+    def _put(self, item):
+        """Vloží položku do fronty, pokud zapisovač ještě přijímá zápisy.
+        Fronta sama není omezená (místo hlídá semafor), vložení neblokuje.
+        """
+
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Write-behind writer is closed.")
+            self._queue.put(item)
+
+    def _run(self):
+        """Hlavní smyčka vlákna: skládá zápisy do dávek a zapisuje je."""
+
+        batch = []
+        deadline = None
+        while True:
+            wait = None if deadline is None else max(deadline - time.monotonic(), 0)
+            try:
+                item = self._queue.get(timeout=wait)
+            except queue.Empty:
+                item = None  # dávka čekala flush_interval
+            if item is not None and item[0] not in (_FLUSH, _STOP):
+                self._slots.release()  # zápis opustil frontu
+                batch.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+                if len(batch) < self.batch_size:
+                    continue
+            if batch:
+                self._write(batch)
+                batch = []
+                deadline = None
+            if item is None or item[0] not in (_FLUSH, _STOP):
+                continue
+            if item[0] == _STOP:
+                return
+            item[2].set_result(None)  # vše zařazené před flush() je potvrzené
+
+    def _write(self, batch):
+        """Zapíše jednu dávku a předá výsledky čekajícím Future."""
+
+        try:
+            results = self._write_batch([(operation, args) for operation, args, _ in batch])
+        except Exception as e:  # selhala celá transakce, neproběhl žádný zápis
+            results = [e] * len(batch)
+        self.batches += 1
+        self.written += len(batch)
+        for (_, _, future), result in zip(batch, results):
+            if isinstance(result, Exception):
+                with self._error_lock:
+                    self._error = self._error or result
+                future.set_exception(result)
+            else:
+                future.set_result(result)
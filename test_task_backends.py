@@ -0,0 +1,570 @@
+from src.task_manager_db import (
+    add_task,
+    add_tasks,
+    close_connection,
+    connect_to_database,
+    count_tasks_by_state,
+    create_connection_pool,
+    delete_task,
+    delete_tasks,
+    get_tasks,
+    get_tasks_page,
+    initialize_database,
+    iter_tasks,
+    migrate_database,
+    pooled_connection,
+    search_tasks,
+    update_task_state,
+    update_task_states,
+    MIGRATIONS,
+    ChangeTokenExpiredError,
+    PoolExhaustedError,
+    TaskConflictError,
+    archive_completed_tasks,
+    get_changes_since,
+    purge_changes,
+    enable_write_behind,
+    flush_writes,
+    queue_add_task,
+    queue_update_task_state,
+    check_schema,
+    disable_task_cache,
+    enable_task_cache,
+)
+from src.task_backends import SQLITE_MIGRATIONS
+import datetime
+import itertools
+import sqlite3
+import threading
+import time
+import pytest
+
+_memory_names = itertools.count()
+
+
+@pytest.fixture(params=["sqlite", "memory"])
+def backend_conn(request, tmp_path):
+    # každý test dostane vlastní prázdné úložiště
+    if request.param == "sqlite":
+        database = str(tmp_path / "tasks.db")
+    else:
+        database = f"test_{next(_memory_names)}"
+    conn = connect_to_database(None, None, None, database, backend=request.param)
+    yield conn
+    close_connection(conn)
+
+
+def test_backend_add_and_get_tasks(backend_conn):
+    add_task(backend_conn, "První úkol", "Popis 1", "pending")
+    add_task(backend_conn, "Druhý úkol", "Popis 2", "completed")
+
+    tasks = get_tasks(backend_conn)
+
+    assert [task["name"] for task in tasks] == ["První úkol", "Druhý úkol"]
+    assert set(tasks[0]) == {
+        "id",
+        "name",
+        "description",
+        "state",
+        "created_at",
+        "version",
+        "updated_at",
+    }
+    assert tasks[0]["version"] == 1 and tasks[0]["updated_at"] == tasks[0]["created_at"]
+
+
+def test_backend_validation_matches_mysql(backend_conn):
+    with pytest.raises(ValueError) as error:
+        add_task(backend_conn, "Úkol", "Popis", "invalid_state")
+    assert str(error.value) == "Invalid task state."
+
+    with pytest.raises(ValueError) as error:
+        update_task_state(backend_conn, 99999, "completed")
+    assert str(error.value) == "Invalid task ID."
+
+    with pytest.raises(ValueError) as error:
+        delete_task(backend_conn, 99999)
+    assert str(error.value) == "Invalid task ID."
+
+
+def test_backend_update_and_delete(backend_conn):
+    add_task(backend_conn, "Úkol ke změně", "Popis", "pending")
+    task_id = get_tasks(backend_conn)[0]["id"]
+
+    update_task_state(backend_conn, task_id, "in_progress")
+    update_task_state(backend_conn, task_id, "in_progress")  # stejný stav není chyba
+    assert get_tasks(backend_conn)[0]["state"] == "in_progress"
+
+    delete_task(backend_conn, task_id)
+    assert get_tasks(backend_conn) == []
+
+
+def test_backend_batch_update_and_delete(backend_conn):
+    add_tasks(backend_conn, [(f"Úkol {i}", "Popis", "pending") for i in range(5)])
+    ids = [task["id"] for task in get_tasks(backend_conn)]
+
+    count, missing = update_task_states(
+        backend_conn, "in_progress", ids[:3] + [99999], chunk_size=2
+    )
+    assert (count, missing) == (3, [99999])
+    assert count_tasks_by_state(backend_conn)["in_progress"] == 3
+
+    count, missing = update_task_states(backend_conn, "completed", state="in_progress")
+    assert (count, missing) == (3, [])
+
+    count, missing = delete_tasks(backend_conn, [ids[0], 99999], chunk_size=1)
+    assert (count, missing) == (1, [99999])
+    count, missing = delete_tasks(backend_conn, state="completed")
+    assert (count, missing) == (2, [])
+    assert [task["id"] for task in get_tasks(backend_conn)] == ids[3:]
+
+
+def test_backend_filters_and_counts(backend_conn):
+    inserted, errors = add_tasks(
+        backend_conn,
+        [
+            ("Filtr_100% A", "Popis", "in_progress"),
+            ("Filtr_100% B", "Popis", "completed"),
+            ("Filtr_1000 C", "Popis", "in_progress"),
+            ("", "Neplatný", "pending"),
+        ],
+    )
+    assert inserted == 3
+    assert [index for index, _ in errors] == [3]
+
+    by_prefix = get_tasks(backend_conn, name_prefix="filtr_100%")
+    assert [task["name"] for task in by_prefix] == ["Filtr_100% A", "Filtr_100% B"]
+    by_state = get_tasks(backend_conn, state="in_progress")
+    assert [task["name"] for task in by_state] == ["Filtr_100% A", "Filtr_1000 C"]
+    newest = get_tasks(backend_conn, order="desc", limit=1)
+    assert [task["name"] for task in newest] == ["Filtr_1000 C"]
+
+    assert count_tasks_by_state(backend_conn) == {
+        "pending": 0,
+        "in_progress": 2,
+        "completed": 1,
+    }
+
+
+def test_backend_compact_tasks(backend_conn):
+    add_tasks(backend_conn, [(f"Úkol {i}", "Popis", "pending") for i in range(3)])
+    update_task_state(backend_conn, 2, "completed")
+
+    compact = get_tasks(backend_conn, compact=True)
+    assert [task._asdict() for task in compact] == get_tasks(backend_conn)
+    assert compact[1].state == "completed" and compact[1].version == 2
+    # stejné hodnoty stavu a času sdílí všechny záznamy jedním objektem
+    assert compact[0].state is compact[2].state
+    assert [task.id for task in get_tasks(backend_conn, order="desc", compact=True)] == [3, 2, 1]
+
+
+def test_backend_paging_and_streaming(backend_conn):
+    add_tasks(backend_conn, [(f"Úkol {i}", "Popis", "pending") for i in range(7)])
+    all_tasks = get_tasks(backend_conn)
+
+    pages = []
+    after_created_at, after_id = None, None
+    while page := get_tasks_page(backend_conn, after_created_at, after_id, limit=3):
+        pages.extend(page)
+        after_created_at, after_id = page[-1]["created_at"], page[-1]["id"]
+
+    assert pages == all_tasks
+    assert list(iter_tasks(backend_conn, batch_size=2)) == all_tasks
+
+
+def test_backend_search(backend_conn):
+    add_tasks(
+        backend_conn,
+        [
+            ("Nákup potravin", "Koupit mléko a chléb", "pending"),
+            ("Úklid", "Odnést nákupní tašky", "pending"),
+            ("Zahrada", "Posekat trávník", "completed"),
+        ],
+    )
+
+    # bez ohledu na diakritiku a velikost písmen, i podle začátku slova
+    assert [task["name"] for task in search_tasks(backend_conn, "NAKUP")] == [
+        "Nákup potravin",
+        "Úklid",
+    ]
+    assert [task["name"] for task in search_tasks(backend_conn, "nák taš")] == ["Úklid"]
+    assert search_tasks(backend_conn, "kolo") == []
+
+    delete_task(backend_conn, search_tasks(backend_conn, "úklid")[0]["id"])
+    assert [task["name"] for task in search_tasks(backend_conn, "nákup")] == ["Nákup potravin"]
+
+
+def test_task_cache_separates_databases(tmp_path, request):
+    first = connect_to_database(None, None, None, f"x_{next(_memory_names)}", backend="memory")
+    second = connect_to_database(None, None, None, f"y_{next(_memory_names)}", backend="memory")
+    path = str(tmp_path / "tasks.db")
+    pool = create_connection_pool(None, None, None, path, pool_size=2, backend="sqlite")
+    request.addfinalizer(disable_task_cache)
+    enable_task_cache()
+
+    add_task(first, "Úkol v x", "Popis", "pending")
+    assert [task["name"] for task in get_tasks(first)] == ["Úkol v x"]
+    assert get_tasks(second) == [] and count_tasks_by_state(second)["pending"] == 0
+
+    # různá připojení ke stejnému souboru SQLite sdílí položky cache
+    with pooled_connection(pool) as reader, pooled_connection(pool) as writer:
+        assert get_tasks(reader) == []
+        add_task(writer, "Úkol v souboru", "Popis", "pending")
+        assert [task["name"] for task in get_tasks(reader)] == ["Úkol v souboru"]
+
+
+def test_backend_migrations(backend_conn):
+    assert migrate_database(backend_conn) == MIGRATIONS[-1][0]
+    assert check_schema(backend_conn) == MIGRATIONS[-1][0]
+
+
+def test_sqlite_migration_adds_versions_to_existing_tasks(tmp_path):
+    database = str(tmp_path / "tasks.db")
+    raw = sqlite3.connect(database)
+    for version, statements in SQLITE_MIGRATIONS[:3]:
+        for statement in statements:
+            raw.execute(statement)
+    raw.execute("PRAGMA user_version = 3")
+    raw.execute("INSERT INTO tasks (name, description) VALUES ('Starý úkol', 'Popis')")
+    raw.commit()
+    raw.close()
+
+    conn = connect_to_database(None, None, None, database, backend="sqlite")
+    task = get_tasks(conn)[0]
+    close_connection(conn)
+    assert task["version"] == 1 and task["updated_at"] == task["created_at"]
+
+
+def test_backend_compare_and_set(backend_conn):
+    task_id = add_task(backend_conn, "Úkol", "Popis", "pending")
+
+    update_task_state(backend_conn, task_id, "in_progress", expected_version=1)
+    with pytest.raises(TaskConflictError) as error:
+        update_task_state(backend_conn, task_id, "completed", expected_version=1)
+    assert error.value.task_ids == [task_id]
+    with pytest.raises(ValueError):
+        update_task_state(backend_conn, 999, "completed", expected_version=1)
+    with pytest.raises(ValueError):
+        update_task_state(backend_conn, task_id, "completed", expected_version=0)
+
+    task = get_tasks(backend_conn)[0]
+    assert (task["state"], task["version"]) == ("in_progress", 2)
+    # změna bez kontroly verzi také zvyšuje
+    update_task_state(backend_conn, task_id, "in_progress")
+    assert get_tasks(backend_conn)[0]["version"] == 3
+
+    # odstranění se stejnou kontrolou verze
+    with pytest.raises(TaskConflictError):
+        delete_task(backend_conn, task_id, expected_version=2)
+    with pytest.raises(ValueError):
+        delete_task(backend_conn, 999, expected_version=1)
+    delete_task(backend_conn, task_id, expected_version=3)
+    assert get_tasks(backend_conn) == []
+
+
+def test_backend_batch_compare_and_set(backend_conn):
+    first = add_task(backend_conn, "První", "Popis", "pending")
+    second = add_task(backend_conn, "Druhý", "Popis", "pending")
+    update_task_state(backend_conn, second, "in_progress")
+
+    # jeden úkol v konfliktu - nezmění se nic
+    with pytest.raises(TaskConflictError) as error:
+        update_task_states(backend_conn, "completed", expected_versions={first: 1, second: 1})
+    assert error.value.task_ids == [second]
+    assert [t["state"] for t in get_tasks(backend_conn)] == ["pending", "in_progress"]
+
+    assert update_task_states(
+        backend_conn, "completed", expected_versions={first: 1, second: 2, 999: 1}
+    ) == (2, [999])
+    assert [t["version"] for t in get_tasks(backend_conn)] == [2, 3]
+    with pytest.raises(ValueError):
+        update_task_states(backend_conn, "completed", [first], expected_versions={first: 2})
+
+
+def test_backend_concurrent_compare_and_set(tmp_path, request):
+    # více vláken souběžně čte úkol a mění ho s kontrolou verze; žádná změna
+    # se nesmí ztratit, každá úspěšná zvýší verzi právě o 1
+    for backend, database in (("sqlite", str(tmp_path / "cas.db")), ("memory", request.node.name)):
+        initialize_database(None, None, None, database, backend)
+        pool = create_connection_pool(None, None, None, database, pool_size=8, backend=backend)
+        with pooled_connection(pool) as conn:
+            task_id = add_task(conn, "Sdílený úkol", "Popis", "pending")
+
+        successes = []
+        conflicts = []
+        start = threading.Barrier(8)
+
+        def worker():
+            done = 0
+            start.wait()
+            with pooled_connection(pool) as conn:
+                while done < 25:
+                    task = get_tasks(conn)[0]
+                    time.sleep(0.0002)  # uvolní GIL mezi čtením a zápisem
+                    new_state = "completed" if task["state"] == "in_progress" else "in_progress"
+                    try:
+                        update_task_state(conn, task_id, new_state, task["version"])
+                    except TaskConflictError:
+                        conflicts.append(1)
+                    else:
+                        done += 1
+            successes.append(done)
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        with pooled_connection(pool) as conn:
+            assert get_tasks(conn)[0]["version"] == 1 + sum(successes) == 1 + 8 * 25
+        assert conflicts, backend
+
+
+def test_backend_change_feed(backend_conn):
+    token = get_changes_since(backend_conn)["token"]
+    first = add_task(backend_conn, "První", "Popis", "pending")
+    second = add_task(backend_conn, "Druhý", "Popis", "pending")
+    add_tasks(backend_conn, [("Třetí", "Popis", "pending")])
+    update_task_state(backend_conn, first, "completed")
+    delete_task(backend_conn, second)
+
+    # každý úkol jednou, v pořadí poslední změny a v aktuálním stavu
+    changes = get_changes_since(backend_conn, token)
+    updated = [(task["id"], task["state"]) for task in changes["updated"]]
+    assert updated == [(3, "pending"), (1, "completed")]
+    assert changes["deleted"] == [second] and not changes["has_more"]
+    assert get_changes_since(backend_conn, changes["token"]) == {
+        "token": changes["token"],
+        "updated": [],
+        "deleted": [],
+        "has_more": False,
+    }
+
+    # hromadné operace podle filtru se logují také
+    update_task_states(backend_conn, "in_progress", state="pending")
+    delete_tasks(backend_conn, state="completed")
+    later = get_changes_since(backend_conn, changes["token"])
+    assert [t["id"] for t in later["updated"]] == [3] and later["deleted"] == [first]
+
+
+def test_backend_change_feed_paging_and_purge(backend_conn):
+    token = get_changes_since(backend_conn)["token"]
+    add_tasks(backend_conn, [(f"Úkol {i}", "Popis", "pending") for i in range(5)])
+
+    seen = []
+    while True:
+        changes = get_changes_since(backend_conn, token, limit=2)
+        seen.extend(task["id"] for task in changes["updated"])
+        token = changes["token"]
+        if not changes["has_more"]:
+            break
+    assert seen == [1, 2, 3, 4, 5]
+
+    assert purge_changes(backend_conn, datetime.datetime.now() - datetime.timedelta(days=1)) == 0
+    assert purge_changes(backend_conn, datetime.datetime.now() + datetime.timedelta(days=1)) == 5
+    with pytest.raises(ChangeTokenExpiredError):
+        get_changes_since(backend_conn, 0)
+    assert get_changes_since(backend_conn, token)["updated"] == []
+    for bad_token in (-1, "5", token + 1):
+        with pytest.raises(ValueError, match="Invalid change token."):
+            get_changes_since(backend_conn, bad_token)
+
+
+def test_backend_change_feed_owner_scope(backend_conn):
+    token = get_changes_since(backend_conn)["token"]
+    own = add_task(backend_conn, "Vlastní", "Popis", "pending", owner="jan")
+    foreign = add_task(backend_conn, "Cizí", "Popis", "pending", owner="eva")
+    gone = add_task(backend_conn, "Smazaný", "Popis", "pending", owner="eva")
+    delete_task(backend_conn, gone)
+
+    # smazaný úkol už vlastníka nemá, jeho ID se vrací všem
+    changes = get_changes_since(backend_conn, token, owner="jan")
+    assert [task["id"] for task in changes["updated"]] == [own]
+    assert changes["deleted"] == [gone] and foreign not in changes["deleted"]
+    # změny cizích úkolů se do limitu nepočítají
+    changes = get_changes_since(backend_conn, token, limit=1, owner="eva")
+    assert [task["id"] for task in changes["updated"]] == [foreign] and changes["has_more"]
+
+
+def test_sqlite_change_feed_sees_other_clients(tmp_path):
+    # log plní triggery, zachytí proto i zápisy mimo task_manager_db
+    database = str(tmp_path / "tasks.db")
+    conn = connect_to_database(None, None, None, database, backend="sqlite")
+    token = get_changes_since(conn)["token"]
+    raw = sqlite3.connect(database)
+    raw.execute(
+        "INSERT INTO tasks (name, description, updated_at) VALUES ('Cizí', 'Popis', '2024-01-01')"
+    )
+    raw.commit()
+    raw.close()
+
+    changes = get_changes_since(conn, token)
+    close_connection(conn)
+    assert [task["name"] for task in changes["updated"]] == ["Cizí"]
+
+
+def test_backend_archive_completed_tasks(backend_conn):
+    for i in range(5):
+        add_task(backend_conn, f"Úkol {i}", "Popis", "pending")
+    update_task_states(backend_conn, "completed", [1, 2, 3, 4])
+    token = get_changes_since(backend_conn)["token"]
+    now = datetime.datetime.now()
+
+    assert archive_completed_tasks(backend_conn, now - datetime.timedelta(days=1)) == 0
+    # dávky po třech úkolech, poslední neúplná
+    assert archive_completed_tasks(backend_conn, now + datetime.timedelta(days=1), 3) == 4
+
+    assert [task["id"] for task in get_tasks(backend_conn)] == [5]
+    archived = get_tasks(backend_conn, include_archived=True)
+    assert [task["id"] for task in archived] == [1, 2, 3, 4, 5]
+    assert archived[0]["state"] == "completed" and archived[0]["version"] == 2
+    newest = get_tasks(
+        backend_conn, state="completed", limit=2, order="desc", include_archived=True
+    )
+    assert [task["id"] for task in newest] == [4, 3]
+    assert count_tasks_by_state(backend_conn)["completed"] == 0
+    # pro odběratele logu změn je archivace smazáním
+    assert sorted(get_changes_since(backend_conn, token)["deleted"]) == [1, 2, 3, 4]
+    with pytest.raises(ValueError):
+        archive_completed_tasks(backend_conn, now, chunk_size=0)
+
+
+def test_backend_write_behind(backend_conn):
+    writer = enable_write_behind(backend_conn, batch_size=10, flush_interval=0.05)
+    futures = [queue_add_task(backend_conn, f"Úkol {i}", "Popis", "pending") for i in range(25)]
+    ids = [future.result(timeout=5) for future in futures]
+    assert len(set(ids)) == 25 and writer.batches < 25
+
+    with pytest.raises(ValueError):
+        queue_add_task(backend_conn, "Úkol", "Popis", "invalid_state")
+    stale = queue_update_task_state(backend_conn, ids[0], "completed", expected_version=1)
+    conflict = queue_update_task_state(backend_conn, ids[0], "completed", expected_version=1)
+    missing = queue_update_task_state(backend_conn, 999, "completed")
+    with pytest.raises(TaskConflictError):
+        flush_writes(backend_conn)  # první chyba od minulého flush
+    assert stale.result() is None
+    assert isinstance(conflict.exception(), TaskConflictError)
+    assert str(missing.exception()) == "Invalid task ID."
+    assert get_tasks(backend_conn, state="completed")[0]["version"] == 2
+
+
+def test_write_behind_drains_on_close(tmp_path):
+    database = str(tmp_path / "tasks.db")
+    conn = connect_to_database(None, None, None, database, backend="sqlite")
+    enable_write_behind(conn, batch_size=1000, flush_interval=60)
+    future = queue_add_task(conn, "Úkol", "Popis", "pending")
+    close_connection(conn)
+    assert future.result(timeout=0) == 1
+
+    conn = connect_to_database(None, None, None, database, backend="sqlite")
+    assert [task["name"] for task in get_tasks(conn)] == ["Úkol"]
+    with pytest.raises(RuntimeError):
+        queue_add_task(conn, "Úkol", "Popis", "pending")  # odložený zápis není zapnutý
+    close_connection(conn)
+
+
+def test_backend_owner_scoping(backend_conn):
+    alice = add_task(backend_conn, "Úkol Alice", "Nákup", "pending", owner="alice")
+    bob = add_task(backend_conn, "Úkol Boba", "Nákup", "pending", owner="bob")
+    add_tasks(backend_conn, [("Hotový úkol Alice", "Popis", "completed")], owner="alice")
+    add_task(backend_conn, "Společný úkol", "Popis", "pending")
+
+    assert [task["name"] for task in get_tasks(backend_conn, owner="alice")] == [
+        "Úkol Alice",
+        "Hotový úkol Alice",
+    ]
+    assert [task["name"] for task in get_tasks(backend_conn, owner="")] == ["Společný úkol"]
+    assert len(get_tasks(backend_conn)) == 4  # bez vlastníka se čte vše
+    assert count_tasks_by_state(backend_conn, owner="alice") == {
+        "pending": 1,
+        "in_progress": 0,
+        "completed": 1,
+    }
+    assert [task["id"] for task in get_tasks_page(backend_conn, owner="bob")] == [bob]
+    assert [task["id"] for task in iter_tasks(backend_conn, owner="bob")] == [bob]
+    assert [task["id"] for task in search_tasks(backend_conn, "nákup", owner="bob")] == [bob]
+
+    # úkol jiného vlastníka se chová jako neexistující
+    with pytest.raises(ValueError, match="Invalid task ID."):
+        update_task_state(backend_conn, bob, "completed", owner="alice")
+    with pytest.raises(ValueError, match="Invalid task ID."):
+        delete_task(backend_conn, bob, owner="alice")
+    assert update_task_states(backend_conn, "in_progress", [alice, bob], owner="alice") == (
+        1,
+        [bob],
+    )
+    assert delete_tasks(backend_conn, state="pending", owner="bob") == (1, [])
+    assert get_tasks(backend_conn, owner="bob") == []
+    with pytest.raises(ValueError, match="Invalid task owner."):
+        get_tasks(backend_conn, owner="x" * 51)
+
+    # archivovaný úkol si vlastníka ponechá
+    archive_completed_tasks(backend_conn, datetime.datetime.now() + datetime.timedelta(days=1))
+    archived = get_tasks(backend_conn, include_archived=True, owner="alice")
+    assert [task["name"] for task in archived] == ["Úkol Alice", "Hotový úkol Alice"]
+
+
+def test_sqlite_tenant_listing_cost_independent_of_other_tenants(tmp_path):
+    # cena čtení = počet kroků virtuálního stroje SQLite; díky indexům
+    # začínajícím vlastníkem se nezmění, když přibudou úkoly jiného vlastníka
+    conn = connect_to_database(None, None, None, str(tmp_path / "tasks.db"), backend="sqlite")
+    add_tasks(conn, [(f"Úkol {i}", "Popis", "pending") for i in range(20)], owner="alice")
+
+    def add_foreign_tasks(count):
+        add_tasks(conn, [("Cizí úkol", "Popis", "pending")] * count, owner="bob")
+
+    def listing_steps():
+        steps = [0]
+
+        def count_step():
+            steps[0] += 1
+
+        conn._connection.set_progress_handler(count_step, 1)
+        try:
+            get_tasks(conn, owner="alice")
+            get_tasks(conn, state="pending", owner="alice", limit=10)
+            get_tasks_page(conn, limit=10, owner="alice")
+            count_tasks_by_state(conn, owner="alice")
+        finally:
+            conn._connection.set_progress_handler(None, 1)
+        return steps[0]
+
+    add_foreign_tasks(100)
+    before = listing_steps()
+    add_foreign_tasks(10000)
+    assert listing_steps() == before
+    close_connection(conn)
+
+
+def test_sqlite_persists_between_connections(tmp_path):
+    database = str(tmp_path / "tasks.db")
+    initialize_database(None, None, None, database, backend="sqlite")
+
+    conn = connect_to_database(None, None, None, database, backend="sqlite")
+    add_task(conn, "Trvalý úkol", "Popis", "pending")
+    close_connection(conn)
+
+    conn = connect_to_database(None, None, None, database, backend="sqlite")
+    assert [task["name"] for task in get_tasks(conn)] == ["Trvalý úkol"]
+    close_connection(conn)
+
+
+def test_backend_pool(tmp_path):
+    pool = create_connection_pool(
+        None, None, None, str(tmp_path / "tasks.db"), pool_size=1, backend="sqlite"
+    )
+
+    with pooled_connection(pool) as conn:
+        add_task(conn, "Úkol přes pool", "Popis", "pending")
+        with pytest.raises(PoolExhaustedError):
+            with pooled_connection(pool, timeout=0):
+                pass
+    with pooled_connection(pool) as conn:
+        assert len(get_tasks(conn)) == 1
+
+
+def test_unsupported_backend():
+    with pytest.raises(ValueError) as error:
+        connect_to_database(None, None, None, "db", backend="oracle")
+    assert str(error.value) == "Unsupported database backend."
@@ -0,0 +1,172 @@
+from src.task_cache import TaskCache
+import datetime
+import pytest
+
+CREATED = datetime.datetime(2024, 1, 1)
+
+
+def make_rows(*states):
+    return [
+        {"id": i, "name": f"Úkol {i}", "description": "Popis", "state": state, "created_at": CREATED}
+        for i, state in enumerate(states, 1)
+    ]
+
+
+def test_get_put_counts_hits_and_misses():
+    cache = TaskCache()
+    assert cache.get(("tasks",)) is None
+    cache.put(("tasks",), make_rows("pending"))
+
+    assert cache.get(("tasks",)) == make_rows("pending")
+    assert cache.stats() == {"hits": 1, "misses": 1, "entries": 1}
+
+
+def test_get_returns_copy():
+    cache = TaskCache()
+    cache.put(("tasks",), make_rows("pending"))
+    cache.get(("tasks",))[0]["state"] = "completed"
+
+    assert cache.get(("tasks",))[0]["state"] == "pending"
+
+
+def test_ttl_expiry(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("src.task_cache.time.monotonic", lambda: now[0])
+    cache = TaskCache(ttl=5)
+    cache.put(("counts",), {"pending": 1, "in_progress": 0, "completed": 0})
+
+    now[0] += 6
+    assert cache.get(("counts",)) is None
+
+
+def test_lru_eviction():
+    cache = TaskCache(max_entries=2)
+    cache.put(("a",), [])
+    cache.put(("b",), [])
+    cache.get(("a",))  # "a" je nyní naposledy použitá položka
+    cache.put(("c",), [])
+
+    assert cache.get(("b",)) is None
+    assert cache.get(("a",)) == []
+
+
+def test_task_added_drops_only_matching_lists():
+    cache = TaskCache()
+    cache.put(("all",), make_rows("pending"))
+    cache.put(("completed",), make_rows("completed"), state="completed")
+    cache.put(("prefix",), make_rows("pending"), name_prefix="Jiný")
+    cache.put(("counts",), {"pending": 1, "in_progress": 0, "completed": 1})
+
+    cache.task_added("Úkol 9", "pending")
+
+    assert cache.get(("all",)) is None
+    assert cache.get(("completed",)) is not None
+    assert cache.get(("prefix",)) is not None
+    assert cache.get(("counts",)) == {"pending": 2, "in_progress": 0, "completed": 1}
+
+
+def test_task_updated_patches_rows_and_counts():
+    cache = TaskCache()
+    cache.put(("all",), make_rows("pending", "pending"))
+    cache.put(("pending",), make_rows("pending", "pending"), state="pending")
+    cache.put(("completed",), [], state="completed")
+    cache.put(("in_progress",), [], state="in_progress")
+    cache.put(("counts",), {"pending": 2, "in_progress": 0, "completed": 0})
+
+    cache.task_updated(1, "completed")
+
+    assert [row["state"] for row in cache.get(("all",))] == ["completed", "pending"]
+    assert cache.get(("pending",)) is None
+    assert cache.get(("completed",)) is None
+    assert cache.get(("in_progress",)) == []
+    assert cache.get(("counts",)) == {"pending": 1, "in_progress": 0, "completed": 1}
+
+
+def test_task_updated_unknown_task_drops_counts():
+    cache = TaskCache()
+    cache.put(("counts",), {"pending": 2, "in_progress": 0, "completed": 0})
+
+    cache.task_updated(42, "completed")
+
+    assert cache.get(("counts",)) is None
+
+
+def test_task_deleted_removes_row_or_drops_page():
+    cache = TaskCache()
+    cache.put(("all",), make_rows("pending", "completed"))
+    cache.put(("page1",), make_rows("pending", "completed"), limited=True)
+    cache.put(("page2",), [], limited=True)
+    cache.put(("counts",), {"pending": 1, "in_progress": 0, "completed": 1})
+
+    cache.task_deleted(2)
+
+    assert [row["id"] for row in cache.get(("all",))] == [1]
+    assert cache.get(("page1",)) is None
+    assert cache.get(("page2",)) == []
+    assert cache.get(("counts",)) == {"pending": 1, "in_progress": 0, "completed": 0}
+
+
+def test_known_task():
+    cache = TaskCache()
+    cache.put(("all",), make_rows("pending"))
+
+    assert cache.known_task(1)
+    assert not cache.known_task(2)
+
+
+def test_invalid_settings():
+    with pytest.raises(ValueError):
+        TaskCache(ttl=0)
+
+
+def test_task_updated_bumps_version():
+    cache = TaskCache()
+    rows = make_rows("pending")
+    rows[0].update(version=3, updated_at=CREATED)
+    cache.put(("all",), rows)
+
+    cache.task_updated(1, "completed")
+
+    row = cache.get(("all",))[0]
+    assert (row["state"], row["version"]) == ("completed", 4)
+    assert row["updated_at"] > CREATED
+
+
+def test_writes_skip_entries_of_other_owners():
+    cache = TaskCache()
+    counts = {"pending": 1, "in_progress": 0, "completed": 0}
+    cache.put(("alice",), make_rows("pending"), owner="alice")
+    cache.put(("counts", "alice"), dict(counts), owner="alice")
+    cache.put(("counts", "bob"), dict(counts), owner="bob")
+    cache.put(("counts", None), dict(counts))
+
+    cache.task_added("Úkol 9", "pending", "bob")
+    cache.task_updated(1, "completed", "alice")
+
+    assert cache.get(("counts", "bob")) == {"pending": 2, "in_progress": 0, "completed": 0}
+    assert cache.get(("counts", "alice")) == {"pending": 0, "in_progress": 0, "completed": 1}
+    assert cache.get(("counts", None)) == {"pending": 1, "in_progress": 0, "completed": 1}
+    assert cache.get(("alice",))[0]["state"] == "completed"
+
+    # vlastník odstraněného úkolu není známý, počty vlastníků se zahodí
+    cache.task_deleted(1)
+    assert cache.get(("counts", "alice")) is None
+    assert cache.get(("counts", None)) == {"pending": 1, "in_progress": 0, "completed": 0}
+
+
+def test_entries_are_separated_by_database():
+    cache = TaskCache()
+    counts = {"pending": 1, "in_progress": 0, "completed": 0}
+    cache.put(("all",), make_rows("pending"), scope="x")
+    cache.put(("counts", None), dict(counts), scope="x")
+    cache.put(("all",), make_rows("completed"), scope="y")
+
+    assert cache.get(("all",), "y")[0]["state"] == "completed"
+    assert cache.get(("all",), "z") is None
+    assert cache.known_task(1, "x") and not cache.known_task(1, "z")
+
+    # zápis do databáze y nemění položky databáze x
+    cache.task_added("Úkol 9", "pending", scope="y")
+    cache.task_deleted(1, scope="y")
+    assert cache.get(("all",), "x") == make_rows("pending")
+    assert cache.get(("counts", None), "x") == counts
@@ -0,0 +1,256 @@
+from src import task_manager_db
+from src.task_cli import run
+import json
+import os
+import subprocess
+import sys
+import pytest
+
+# Rozpočet doby importu CLI (bez ovladače MySQL a python-dotenv) v milisekundách.
+STARTUP_BUDGET_MS = 60
+
+
+@pytest.fixture
+def cli_env(monkeypatch, tmp_path):
+    # CLI nad prázdnou databází SQLite, konfigurace z proměnných prostředí
+    monkeypatch.setenv("DB_BACKEND", "sqlite")
+    monkeypatch.setenv("DB_NAME", str(tmp_path / "cli.db"))
+    return tmp_path
+
+
+def run_json(capsys, *argv):
+    code = run(list(argv))
+    return code, json.loads(capsys.readouterr().out)
+
+
+def import_progress(cli_env, checkpoint):
+    # průběh importu uložený v databázi CLI
+    connection = task_manager_db.connect_to_database(
+        None, None, None, str(cli_env / "cli.db"), backend="sqlite"
+    )
+    try:
+        return task_manager_db.get_import_progress(connection, checkpoint)
+    finally:
+        task_manager_db.close_connection(connection)
+
+
+@pytest.mark.testCli
+def test_cli_add_list_update_delete(cli_env, capsys):
+    assert run_json(capsys, "add", "Úkol 1", "Popis 1") == (0, {"id": 1})
+    assert run_json(capsys, "add", "Úkol 2", "Popis 2", "--state", "in_progress") == (0, {"id": 2})
+
+    code, tasks = run_json(capsys, "list", "--state", "in_progress")
+    assert code == 0 and [task["id"] for task in tasks] == [2]
+
+    assert run_json(capsys, "update", "1-3", "--state", "completed") == (
+        1,
+        {"updated": 2, "missing": [3]},
+    )
+    assert run_json(capsys, "delete", "--from-state", "completed") == (
+        0,
+        {"deleted": 2, "missing": []},
+    )
+    assert run_json(capsys, "list") == (0, [])
+
+
+@pytest.mark.testCli
+def test_cli_tsv_output(cli_env, capsys):
+    run(["add", "Úkol", "Popis", "--format", "tsv"])
+    assert capsys.readouterr().out == "id\t1\n"
+
+    run(["list", "--format", "tsv"])
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0] == "id\tname\tdescription\tstate\tcreated_at"
+    assert lines[1].split("\t")[:4] == ["1", "Úkol", "Popis", "pending"]
+
+
+@pytest.mark.testCli
+def test_cli_import_and_export(cli_env, capsys):
+    source = cli_env / "ukoly.csv"
+    source.write_text("name,description\nÚkol 1,Popis 1\n,Bez názvu\n", encoding="utf-8")
+
+    assert run_json(capsys, "import", str(source)) == (
+        1,
+        {"inserted": 1, "errors": [[2, "Invalid task name."]]},
+    )
+
+    run(["export"])
+    exported = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [(task["id"], task["name"]) for task in exported] == [(1, "Úkol 1")]
+
+
+@pytest.mark.testCli
+def test_cli_errors(cli_env, capsys):
+    assert run(["delete"]) == 1
+    assert capsys.readouterr().err == "error: Invalid task selection.\n"
+
+    with pytest.raises(SystemExit) as error:
+        run(["update", "x", "--state", "completed"])
+    assert error.value.code == 2
+
+    # obrovský rozsah se odmítne hned, bez rozepsání do paměti
+    with pytest.raises(SystemExit) as error:
+        run(["delete", "1-999999999"])
+    assert error.value.code == 2
+    assert "too many task ids (max 100000)" in capsys.readouterr().err
+
+
+@pytest.mark.testCli
+def test_cli_does_not_import_heavy_modules(cli_env):
+    # konfigurace v prostředí: .env se nečte a SQLite nepotřebuje ovladač MySQL
+    code = (
+        "import sys; from src.task_cli import run; run(['list']); "
+        "print([m for m in ('dotenv', 'mysql.connector') if m in sys.modules])"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, env=os.environ.copy()
+    )
+    assert result.stdout.splitlines()[-1] == "[]"
+
+
+@pytest.mark.testCli
+def test_cli_import_time_budget():
+    # nejlepší ze tří měření, aby test nezávisel na náhodném zpomalení stroje
+    timings = []
+    for _ in range(3):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import src.task_cli"],
+            capture_output=True,
+            text=True,
+        )
+        for line in result.stderr.splitlines():
+            _, cumulative, name = line.split("|")
+            if name.strip() == "src.task_cli":
+                timings.append(int(cumulative) / 1000)
+    assert min(timings) < STARTUP_BUDGET_MS, f"Import CLI trval {min(timings):.1f} ms"
+
+
+@pytest.mark.testCli
+def test_cli_export_to_compressed_file(cli_env, capsys):
+    run(["add", "Úkol", "Popis"])
+    capsys.readouterr()
+    target = cli_env / "ukoly.jsonl.gz"
+
+    assert run_json(capsys, "export", "--output", str(target)) == (
+        0,
+        {"exported": 1, "path": str(target)},
+    )
+    assert run_json(capsys, "import", str(target), "--resume") == (
+        0,
+        {"inserted": 1, "errors": []},
+    )
+    # po úplném importu se průběh z databáze smaže
+    assert import_progress(cli_env, str(target)) is None
+
+
+@pytest.mark.testCli
+def test_cli_import_resumes_after_interruption(cli_env, capsys, monkeypatch):
+    source = cli_env / "ukoly.jsonl"
+    source.write_text(
+        "".join(f'{{"name": "Úkol {i}", "description": "Popis"}}\n' for i in range(5)),
+        encoding="utf-8",
+    )
+
+    # druhá dávka selže, jako by spadlo připojení k databázi
+    original = task_manager_db.add_tasks
+    calls = []
+
+    def failing_add_tasks(*args, **kwargs):
+        calls.append(args)
+        if len(calls) == 2:
+            raise RuntimeError("No database connection.")
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(task_manager_db, "add_tasks", failing_add_tasks)
+    assert run(["import", str(source), "--resume", "--chunk-size", "2"]) == 1
+    assert "error: No database connection." in capsys.readouterr().err
+    assert import_progress(cli_env, str(source)) == (str(source), 2)
+
+    monkeypatch.setattr(task_manager_db, "add_tasks", original)
+    assert run_json(capsys, "import", str(source), "--resume", "--chunk-size", "2") == (
+        0,
+        {"inserted": 3, "errors": []},
+    )
+    assert import_progress(cli_env, str(source)) is None
+    code, tasks = run_json(capsys, "list")
+    assert code == 0 and [task["name"] for task in tasks] == [f"Úkol {i}" for i in range(5)]
+
+
+@pytest.mark.testCli
+def test_cli_changes(cli_env, capsys):
+    code, start = run_json(capsys, "changes")
+    assert code == 0 and start["updated"] == []
+    run(["add", "Úkol", "Popis"])
+    capsys.readouterr()
+
+    code, changes = run_json(capsys, "changes", "--since", str(start["token"]))
+    assert code == 0 and [task["name"] for task in changes["updated"]] == ["Úkol"]
+    assert run_json(capsys, "purge-changes", "--older-than", "1") == (0, {"purged": 0})
+
+
+@pytest.mark.testCli
+def test_cli_archive(cli_env, capsys):
+    run(["add", "Úkol", "Popis", "--state", "completed"])
+    capsys.readouterr()
+
+    assert run_json(capsys, "archive", "--older-than", "1") == (0, {"archived": 0})
+    assert run_json(capsys, "archive", "--older-than", "-1") == (0, {"archived": 1})
+    assert run_json(capsys, "list") == (0, [])
+    code, tasks = run_json(capsys, "list", "--archived")
+    assert code == 0 and [task["name"] for task in tasks] == ["Úkol"]
+
+
+@pytest.mark.testCli
+def test_cli_sync_replica(cli_env, capsys):
+    run(["add", "Úkol", "Popis"])
+    capsys.readouterr()
+    replica = str(cli_env / "replika.db")
+
+    assert run_json(capsys, "sync", "--replica", replica) == (
+        0,
+        {"pulled": 1, "pushed": 0, "conflicts": 0, "pending": 0},
+    )
+    assert run_json(capsys, "sync", "--replica", replica)[1]["pulled"] == 0
+
+
+@pytest.mark.testCli
+def test_cli_reads_timeouts(cli_env, monkeypatch, capsys):
+    # časové limity se čtou stejně jako v interaktivní aplikaci
+    monkeypatch.setenv("DB_CONNECT_TIMEOUT", "2.5")
+    assert run(["list"]) == 1
+    assert "invalid literal for int()" in capsys.readouterr().err
+
+    # platné celé číslo se předá připojení
+    connect = task_manager_db.connect_to_database
+    settings = []
+
+    def recording_connect(*args):
+        settings.append(args[-2:])
+        return connect(*args)
+
+    monkeypatch.setattr(task_manager_db, "connect_to_database", recording_connect)
+    monkeypatch.setenv("DB_CONNECT_TIMEOUT", "7")
+    monkeypatch.setenv("DB_READ_TIMEOUT", "9")
+    assert run(["list"]) == 0
+    assert settings == [(7, 9)]
+
+
+@pytest.mark.testCli
+@pytest.mark.parametrize(
+    "errno, message",
+    [
+        (1146, "Database schema is missing"),
+        (2013, "database server is unreachable"),
+        (1205, "Database error"),
+    ],
+)
+def test_cli_reports_driver_errors(cli_env, monkeypatch, capsys, errno, message):
+    # chyba ovladače MySQL se nevypíše jako traceback, ale podle příčiny
+    from mysql.connector import errors
+
+    def failing_get_tasks(*args, **kwargs):
+        raise errors.DatabaseError(msg="Chyba serveru", errno=errno)
+
+    monkeypatch.setattr(task_manager_db, "get_tasks", failing_get_tasks)
+    assert run(["list"]) == 1
+    assert capsys.readouterr().err.startswith(f"error: {message}")
@@ -0,0 +1,265 @@
+from src import task_manager_db
+from src.task_io import export_tasks, import_tasks, read_tasks_file, write_tasks
+from src.task_manager_db import (
+    add_tasks,
+    close_connection,
+    connect_to_database,
+    get_import_progress,
+    get_tasks,
+    iter_tasks,
+    update_task_state,
+)
+import datetime
+import io
+import pytest
+
+
+def test_read_tasks_file_csv(tmp_path):
+    path = tmp_path / "ukoly.csv"
+    path.write_text(
+        "name,description,state\nÚkol 1,Popis 1,completed\nÚkol 2,Popis 2,\n",
+        encoding="utf-8",
+    )
+
+    assert list(read_tasks_file(str(path))) == [
+        ("Úkol 1", "Popis 1", "completed"),
+        ("Úkol 2", "Popis 2", "pending"),
+    ]
+
+
+def test_read_tasks_file_jsonl(tmp_path):
+    path = tmp_path / "ukoly.jsonl"
+    path.write_text(
+        '{"name": "Úkol 1", "description": "Popis 1", "state": "in_progress"}\n'
+        "\n"
+        '{"name": "Úkol 2", "description": "Popis 2"}\n',
+        encoding="utf-8",
+    )
+
+    assert list(read_tasks_file(str(path))) == [
+        ("Úkol 1", "Popis 1", "in_progress"),
+        ("Úkol 2", "Popis 2", "pending"),
+    ]
+
+
+def test_read_tasks_file_unsupported_format(tmp_path):
+    with pytest.raises(ValueError) as error:
+        list(read_tasks_file(str(tmp_path / "ukoly.txt")))
+    assert str(error.value) == "Unsupported file format."
+
+
+def test_write_tasks_csv_and_jsonl():
+    tasks = [
+        {
+            "id": 1,
+            "name": "Úkol, s čárkou",
+            "description": "Popis",
+            "state": "pending",
+            "created_at": datetime.datetime(2024, 5, 1, 12, 30),
+            "version": 2,
+            "updated_at": datetime.datetime(2024, 5, 2, 8, 0),
+            "owner": "jan",
+        }
+    ]
+
+    output = io.StringIO()
+    assert write_tasks(output, iter(tasks), "csv") == 1
+    assert output.getvalue() == (
+        "id,name,description,state,created_at,version,updated_at,owner\n"
+        '1,"Úkol, s čárkou",Popis,pending,2024-05-01 12:30:00,2,2024-05-02 08:00:00,jan\n'
+    )
+
+    output = io.StringIO()
+    write_tasks(output, tasks, "jsonl")
+    assert '"created_at": "2024-05-01 12:30:00"' in output.getvalue()
+    assert '"updated_at": "2024-05-02 08:00:00"' in output.getvalue()
+
+    with pytest.raises(ValueError):
+        write_tasks(io.StringIO(), tasks, "xml")
+
+
+@pytest.fixture
+def sqlite_conn(tmp_path):
+    conn = connect_to_database(None, None, None, str(tmp_path / "io.db"), backend="sqlite")
+    yield conn
+    close_connection(conn)
+
+
+@pytest.mark.parametrize(
+    "filename, module",
+    [
+        ("ukoly.jsonl", None),
+        ("ukoly.csv.gz", None),
+        ("ukoly.tsv", None),
+        ("ukoly.jsonl.zst", "zstandard"),
+        ("ukoly.parquet", "pyarrow"),
+    ],
+)
+def test_export_and_import_roundtrip(sqlite_conn, tmp_path, filename, module):
+    if module:
+        pytest.importorskip(module)
+    tasks = [(f"Úkol {i}", f"Popis, \"{i}\"\tse znaky", "completed") for i in range(25)]
+    add_tasks(sqlite_conn, tasks)
+    path = str(tmp_path / filename)
+
+    assert export_tasks(sqlite_conn, path, batch_size=10) == 25
+    assert not (tmp_path / (filename + ".part")).exists()
+    assert list(read_tasks_file(path)) == tasks
+
+    target = connect_to_database(None, None, None, str(tmp_path / "cil.db"), backend="sqlite")
+    try:
+        assert import_tasks(target, path, chunk_size=7) == (25, [])
+        restored = [(t["name"], t["description"], t["state"]) for t in get_tasks(target)]
+        assert restored == tasks
+    finally:
+        close_connection(target)
+
+
+@pytest.mark.parametrize("filename", ["zaloha.jsonl", "zaloha.csv", "zaloha.parquet"])
+def test_export_and_restore_keeps_ids_and_times(sqlite_conn, tmp_path, filename):
+    if filename.endswith(".parquet"):
+        pytest.importorskip("pyarrow")
+    add_tasks(sqlite_conn, [("Společný", "Popis", "pending")])
+    add_tasks(sqlite_conn, [(f"Úkol {i}", "Popis", "pending") for i in range(5)], owner="jan")
+    update_task_state(sqlite_conn, 3, "completed")
+    path = str(tmp_path / filename)
+    assert export_tasks(sqlite_conn, path) == 6
+
+    target = connect_to_database(None, None, None, str(tmp_path / "cil.db"), backend="sqlite")
+    try:
+        assert import_tasks(target, path, chunk_size=4, restore=True) == (6, [])
+        assert list(iter_tasks(target, with_owner=True)) == list(
+            iter_tasks(sqlite_conn, with_owner=True)
+        )
+        # opakovaná obnova nic nezdvojí, existující ID se ohlásí jako chyby
+        inserted, errors = import_tasks(target, path, restore=True)
+        assert inserted == 0 and errors == [(i, "Task ID already exists.") for i in range(6)]
+    finally:
+        close_connection(target)
+
+
+def test_restore_reports_invalid_records(sqlite_conn, tmp_path):
+    path = tmp_path / "zaloha.jsonl"
+    record = (
+        '{{"id": {id}, "name": "Úkol", "description": "Popis", "state": "pending", '
+        '"created_at": "{time}", "version": 1, "updated_at": "2024-05-01 12:00:00", '
+        '"owner": ""}}\n'
+    )
+    path.write_text(
+        record.format(id=7, time="2024-05-01 12:00:00")
+        + record.format(id=0, time="2024-05-01 12:00:00")
+        + record.format(id=8, time="včera")
+        + record.format(id=7, time="2024-05-01 12:00:00"),
+        encoding="utf-8",
+    )
+
+    inserted, errors = import_tasks(sqlite_conn, str(path), restore=True, owner="eva")
+    assert inserted == 1
+    assert errors == [
+        (1, "Invalid task ID."),
+        (2, "Invalid task time."),
+        (3, "Task ID already exists."),
+    ]
+    assert [task["id"] for task in get_tasks(sqlite_conn, owner="eva")] == [7]
+    # další úkoly dostanou ID za obnovenými
+    assert add_tasks(sqlite_conn, [("Nový", "Popis", "pending")]) == (1, [])
+    assert get_tasks(sqlite_conn)[-1]["id"] == 8
+
+
+def test_import_tasks_resumes_after_failure(sqlite_conn, tmp_path, monkeypatch):
+    path = tmp_path / "ukoly.jsonl"
+    path.write_text(
+        "".join(f'{{"name": "Úkol {i}", "description": "Popis"}}\n' for i in range(10))
+        + '{"name": "", "description": "Bez názvu"}\n',
+        encoding="utf-8",
+    )
+    checkpoint = "ukoly"
+
+    # druhá dávka selže, jako by spadlo připojení k databázi
+    original = task_manager_db.add_tasks
+    calls = []
+
+    def failing_add_tasks(connection, chunk, chunk_size, **kwargs):
+        calls.append(len(chunk))
+        if len(calls) == 2:
+            raise RuntimeError("No database connection.")
+        return original(connection, chunk, chunk_size, **kwargs)
+
+    monkeypatch.setattr(task_manager_db, "add_tasks", failing_add_tasks)
+    with pytest.raises(RuntimeError):
+        import_tasks(sqlite_conn, str(path), chunk_size=4, checkpoint=checkpoint)
+    assert len(get_tasks(sqlite_conn)) == 4
+    # průběh se uložil ve stejné transakci jako první dávka
+    assert get_import_progress(sqlite_conn, checkpoint) == (str(path), 4)
+
+    monkeypatch.setattr(task_manager_db, "add_tasks", original)
+    inserted, errors = import_tasks(sqlite_conn, str(path), chunk_size=4, checkpoint=checkpoint)
+
+    assert inserted == 6 and errors == [(10, "Invalid task name.")]
+    assert [task["name"] for task in get_tasks(sqlite_conn)] == [f"Úkol {i}" for i in range(10)]
+    assert get_import_progress(sqlite_conn, checkpoint) is None
+
+
+def test_import_tasks_reports_bad_jsonl_records(sqlite_conn, tmp_path):
+    path = tmp_path / "ukoly.jsonl"
+    path.write_text(
+        '{"name": "Úkol 1", "description": "Popis"}\n'
+        "[1, 2]\n"
+        '{"name": "Úkol 2", "description": "Popis"}\n'
+        '{"name": "Nedokončený\n'
+        '{"name": "", "description": "Bez názvu"}\n'
+        '{"name": "Úkol 3", "description": "Popis"}\n',
+        encoding="utf-8",
+    )
+
+    # vadné záznamy se ohlásí s pořadím v souboru, platné z téže dávky se vloží
+    inserted, errors = import_tasks(sqlite_conn, str(path), chunk_size=4, checkpoint="ukoly")
+    assert inserted == 3
+    assert errors == [
+        (1, "Invalid task record."),
+        (3, "Invalid JSON record."),
+        (4, "Invalid task name."),
+    ]
+    assert [task["name"] for task in get_tasks(sqlite_conn)] == ["Úkol 1", "Úkol 2", "Úkol 3"]
+    assert get_import_progress(sqlite_conn, "ukoly") is None
+    with pytest.raises(ValueError, match="Invalid task record."):
+        list(read_tasks_file(str(path)))
+
+
+def test_import_progress_commits_with_chunk(sqlite_conn, tmp_path, monkeypatch):
+    path = tmp_path / "ukoly.jsonl"
+    path.write_text(
+        "".join(f'{{"name": "Úkol {i}", "description": "Popis"}}\n' for i in range(6)),
+        encoding="utf-8",
+    )
+
+    # pád při ukládání průběhu vrátí i vložení dávky, resume ji tak nezdvojí
+    original = sqlite_conn._save_progress
+    calls = []
+
+    def failing_save_progress(progress):
+        calls.append(progress)
+        original(progress)
+        if len(calls) == 2:
+            raise RuntimeError("Spadlo to.")
+
+    monkeypatch.setattr(sqlite_conn, "_save_progress", failing_save_progress)
+    with pytest.raises(RuntimeError):
+        import_tasks(sqlite_conn, str(path), chunk_size=3, checkpoint="ukoly")
+    assert len(get_tasks(sqlite_conn)) == 3
+    assert get_import_progress(sqlite_conn, "ukoly") == (str(path), 3)
+
+    monkeypatch.undo()
+    assert import_tasks(sqlite_conn, str(path), chunk_size=3, checkpoint="ukoly") == (3, [])
+    assert [task["name"] for task in get_tasks(sqlite_conn)] == [f"Úkol {i}" for i in range(6)]
+
+
+def test_import_tasks_rejects_foreign_checkpoint(sqlite_conn, tmp_path):
+    (tmp_path / "ukoly.jsonl").write_text(
+        '{"name": "Úkol", "description": "Popis"}\n', encoding="utf-8"
+    )
+    # přerušený import jiného souboru
+    sqlite_conn.insert_tasks([], progress=("ukoly", "/jiny/soubor.jsonl", 3))
+    with pytest.raises(ValueError) as error:
+        import_tasks(sqlite_conn, str(tmp_path / "ukoly.jsonl"), checkpoint="ukoly")
+    assert str(error.value) == "Checkpoint belongs to a different file."
@@ -0,0 +1,54 @@
+from src.task_manager_aio import AsyncTaskManager
+from src.task_manager_db import create_connection_pool
+import asyncio
+import pytest
+
+
+@pytest.fixture
+def pool(tmp_path):
+    return create_connection_pool(
+        None, None, None, str(tmp_path / "tasks.db"), pool_size=4, backend="sqlite"
+    )
+
+
+def test_async_concurrent_adds(pool):
+    async def scenario():
+        async with AsyncTaskManager(pool) as tasks:
+            await asyncio.gather(
+                *(tasks.add_task(f"Úkol {i}", "Popis", "pending") for i in range(20))
+            )
+            return await tasks.count_tasks_by_state()
+
+    assert asyncio.run(scenario())["pending"] == 20
+
+
+def test_async_crud_flow(pool):
+    async def scenario():
+        async with AsyncTaskManager(pool) as tasks:
+            await tasks.add_tasks([("Úkol A", "Popis", "pending"), ("Úkol B", "Popis", "pending")])
+            listed = await tasks.get_tasks(name_prefix="Úkol")
+            await tasks.update_task_state(listed[0]["id"], "completed")
+            await tasks.delete_task(listed[1]["id"])
+            return [task async for task in tasks.iter_tasks(batch_size=1)]
+
+    remaining = asyncio.run(scenario())
+
+    assert [(task["name"], task["state"]) for task in remaining] == [("Úkol A", "completed")]
+
+
+@pytest.mark.parametrize(
+    "call, error_message",
+    [
+        (lambda tasks: tasks.add_task("", "Popis", "pending"), "Invalid task name."),
+        (lambda tasks: tasks.update_task_state(99999, "completed"), "Invalid task ID."),
+        (lambda tasks: tasks.delete_task(99999), "Invalid task ID."),
+    ],
+)
+def test_async_errors_match_sync_api(pool, call, error_message):
+    async def scenario():
+        async with AsyncTaskManager(pool) as tasks:
+            await call(tasks)
+
+    with pytest.raises(ValueError) as error:
+        asyncio.run(scenario())
+    assert str(error.value) == error_message
@@ -1,5 +1,43 @@
 #### ZDE BUDOU TESTY ####
-from src.task_manager_db import add_task, get_tasks, update_task_state, delete_task
+from src.task_manager_db import (
+    add_task,
+    count_tasks_by_state,
+    add_tasks,
+    restore_tasks,
+    get_tasks,
+    get_tasks_page,
+    iter_tasks,
+    migrate_database,
+    search_tasks,
+    pooled_connection,
+    MIGRATIONS,
+    update_task_state,
+    update_task_states,
+    delete_task,
+    delete_tasks,
+    disable_task_cache,
+    enable_task_cache,
+    close_connection,
+    connect_to_database,
+    create_connection_pool,
+    TaskConflictError,
+    archive_completed_tasks,
+    get_changes_since,
+    CHANGE_SETTLE_TIME,
+    enable_write_behind,
+    queue_add_task,
+    queue_update_task_state,
+    flush_writes,
+    check_schema,
+    ServerUnreachableError,
+    SchemaMissingError,
+    PoolExhaustedError,
+    _statements,
+)
+import datetime
+import os
+import threading
+import time
 import pytest
 
 
@@ -75,6 +113,57 @@ def test_add_task_fail_flow(conn, name, description, state, error_type, error_me
     ), f"Očekáváme chybovou hlášku {error_message}, ale dostali jsme {str(error.value)}"
 
 
+@pytest.mark.testAddTasks
+def test_add_tasks_happy_flow(conn):
+    # generátor úkolů, vkládaný po dávkách o velikosti 2
+    tasks = ((f"Hromadný úkol {i}", f"Hromadný popis {i}", "pending") for i in range(5))
+    inserted, errors = add_tasks(conn, tasks, chunk_size=2)
+
+    assert inserted == 5
+    assert errors == []
+
+    cursor = conn.cursor()
+    cursor.execute("SELECT COUNT(*) FROM tasks WHERE name LIKE %s", ("Hromadný úkol %",))
+    assert cursor.fetchone()[0] == 5
+
+
+@pytest.mark.testAddTasks
+def test_add_tasks_reports_invalid_rows(conn):
+    tasks = [
+        ("Platný hromadný úkol", "Platný popis", "pending"),
+        ("", "Úkol bez názvu", "pending"),
+        ("Úkol se špatným stavem", "Popis", "invalid_state"),
+        ("Neúplný řádek",),
+        ("Další platný hromadný úkol", "Platný popis", "completed"),
+    ]
+    inserted, errors = add_tasks(conn, tasks)
+
+    assert inserted == 2
+    assert [index for index, _ in errors] == [1, 2, 3]
+    assert errors[0][1] == "Invalid task name."
+    assert errors[1][1] == "Invalid task state."
+
+
+@pytest.mark.testAddTasks
+def test_add_tasks_no_connection():
+    with pytest.raises(RuntimeError) as error:
+        add_tasks(None, [])
+    assert str(error.value) == "No database connection."
+
+
+@pytest.mark.testAddTasks
+def test_restore_tasks_keeps_ids_and_times(conn):
+    add_tasks(conn, [(f"Záloha {i}", "Popis", "pending") for i in range(3)], owner="jan")
+    update_task_state(conn, get_tasks(conn)[1]["id"], "completed")
+    backup = list(iter_tasks(conn, with_owner=True))
+    delete_tasks(conn, [task["id"] for task in backup[:2]])
+
+    inserted, errors = restore_tasks(conn, backup, chunk_size=2)
+    assert inserted == 2 and errors == [(2, "Task ID already exists.")]
+    assert list(iter_tasks(conn, with_owner=True)) == backup
+    assert add_task(conn, "Nový", "Popis", "pending") > backup[-1]["id"]
+
+
 @pytest.mark.testGetTasks
 def test_get_tasks_ok(conn):
     add_task(conn, "Úkol 1", "Popis 1", "pending")
@@ -88,6 +177,70 @@ def test_get_tasks_ok(conn):
     assert get_tasks_list[-1]["state"] == "pending"
 
 
+@pytest.mark.testGetTasks
+def test_get_tasks_filters(conn):
+    add_tasks(
+        conn,
+        [
+            ("Filtr_100% A", "Popis", "in_progress"),
+            ("Filtr_100% B", "Popis", "completed"),
+            ("Filtr_1000 C", "Popis", "in_progress"),
+        ],
+    )
+
+    by_prefix = get_tasks(conn, name_prefix="Filtr_100%")
+    assert [task["name"] for task in by_prefix] == ["Filtr_100% A", "Filtr_100% B"]
+
+    by_state = get_tasks(conn, state="in_progress", name_prefix="Filtr_")
+    assert [task["name"] for task in by_state] == ["Filtr_100% A", "Filtr_1000 C"]
+
+    newest = get_tasks(conn, name_prefix="Filtr_", order="desc", limit=1)
+    assert [task["name"] for task in newest] == ["Filtr_1000 C"]
+
+    created = by_state[0]["created_at"]
+    assert all(t["created_at"] >= created for t in get_tasks(conn, created_after=created))
+    assert all(t["created_at"] < created for t in get_tasks(conn, created_before=created))
+
+
+@pytest.mark.testGetTasks
+@pytest.mark.parametrize(
+    "kwargs, error_message",
+    [
+        ({"state": "invalid_state"}, "Invalid task state."),
+        ({"order": "sideways"}, "Invalid order."),
+        ({"limit": 0}, "Invalid limit."),
+    ],
+)
+def test_get_tasks_invalid_filters(conn, kwargs, error_message):
+    with pytest.raises(ValueError) as error:
+        get_tasks(conn, **kwargs)
+    assert str(error.value) == error_message
+
+
+@pytest.mark.testGetTasks
+def test_get_tasks_compact(conn):
+    add_task(conn, "Kompaktní úkol", "Popis", "in_progress")
+
+    tasks = get_tasks(conn, state="in_progress")
+    compact = get_tasks(conn, state="in_progress", compact=True)
+
+    assert [task._asdict() for task in compact] == tasks
+    assert compact[-1].name == "Kompaktní úkol" and compact[-1].state == "in_progress"
+
+
+@pytest.mark.testGetTasks
+def test_count_tasks_by_state(conn):
+    add_task(conn, "Úkol pro souhrn", "Popis pro souhrn", "in_progress")
+
+    counts = count_tasks_by_state(conn)
+    tasks = get_tasks(conn)
+
+    assert counts == {
+        state: sum(1 for task in tasks if task["state"] == state)
+        for state in ("pending", "in_progress", "completed")
+    }
+
+
 @pytest.mark.testGetTasks
 def test_get_tasks_no_connection():
     with pytest.raises(RuntimeError) as error:
@@ -97,6 +250,48 @@ def test_get_tasks_no_connection():
     ), f"Očekáváme chybovou hlášku 'No database connection.', ale dostali jsme {str(error.value)}"
 
 
+@pytest.mark.testGetTasks
+def test_iter_tasks_matches_get_tasks(conn):
+    add_task(conn, "Úkol pro iteraci", "Popis pro iteraci", "pending")
+
+    assert list(iter_tasks(conn, batch_size=2)) == get_tasks(conn)
+
+
+@pytest.mark.testGetTasks
+def test_iter_tasks_early_stop_keeps_connection_usable(conn):
+    add_task(conn, "Úkol A pro předčasné ukončení", "Popis", "pending")
+    add_task(conn, "Úkol B pro předčasné ukončení", "Popis", "pending")
+
+    tasks = iter_tasks(conn, batch_size=1)
+    next(tasks)
+    tasks.close()
+
+    # zbytek výsledku musí být dočten, jinak by další dotaz selhal
+    assert len(get_tasks(conn)) >= 2
+
+
+@pytest.mark.testGetTasks
+def test_get_tasks_page_walks_all_tasks(conn):
+    add_tasks(conn, [(f"Stránkovaný úkol {i}", "Popis", "pending") for i in range(7)])
+    all_tasks = get_tasks(conn)
+
+    pages = []
+    after_created_at, after_id = None, None
+    while page := get_tasks_page(conn, after_created_at, after_id, limit=3):
+        assert len(page) <= 3
+        pages.extend(page)
+        after_created_at, after_id = page[-1]["created_at"], page[-1]["id"]
+
+    assert [task["id"] for task in pages] == [task["id"] for task in all_tasks]
+
+
+@pytest.mark.testGetTasks
+def test_get_tasks_page_invalid_limit(conn):
+    with pytest.raises(ValueError) as error:
+        get_tasks_page(conn, limit=0)
+    assert str(error.value) == "Invalid page limit."
+
+
 @pytest.mark.testUpdateTaskState
 @pytest.mark.parametrize(
     "name, description, state, new_state",
@@ -176,6 +371,25 @@ def test_update_task_state_invalid_state(conn):
     ), f"Očekáváme chybovou hlášku 'Invalid task state.', ale dostali jsme {str(error.value)}"
 
 
+@pytest.mark.testUpdateTaskState
+def test_update_task_state_same_state(conn):
+    # přidáme úkol a nastavíme mu stejný stav, jaký už má
+    add_task(conn, "Úkol se stejným stavem", "Popis úkolu se stejným stavem", "pending")
+
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute(
+        f"SELECT id FROM tasks WHERE name = %s AND description = %s",
+        ("Úkol se stejným stavem", "Popis úkolu se stejným stavem"),
+    )
+    task_id = cursor.fetchone()["id"]
+
+    # UPDATE nezmění žádný řádek, ale ID je platné, takže nesmí vzniknout chyba
+    update_task_state(conn, task_id, "pending")
+
+    cursor.execute(f"SELECT state FROM tasks WHERE id = %s", (task_id,))
+    assert cursor.fetchone()["state"] == "pending"
+
+
 @pytest.mark.testUpdateTaskState
 def test_update_task_state_invalid_id(conn):
     # zkusíme aktualizovat stav neexistujícího úkolu
@@ -187,6 +401,137 @@ def test_update_task_state_invalid_id(conn):
     ), f"Očekáváme chybovou hlášku 'Invalid task ID.', ale dostali jsme {str(error.value)}"
 
 
+@pytest.mark.testUpdateTaskState
+def test_update_task_states_by_ids(conn):
+    # přidáme úkoly, jeden z nich už je v cílovém stavu
+    add_tasks(
+        conn,
+        [
+            ("Hromadný úkol 1", "Popis", "pending"),
+            ("Hromadný úkol 2", "Popis", "in_progress"),
+            ("Hromadný úkol 3", "Popis", "completed"),
+        ],
+    )
+    ids = [task["id"] for task in get_tasks(conn, name_prefix="Hromadný úkol")]
+
+    # malá dávka ověří i rozdělení ID do více příkazů
+    count, missing = update_task_states(conn, "completed", ids + [99999], chunk_size=2)
+
+    assert count == 3 and missing == [99999]
+    states = {task["state"] for task in get_tasks(conn, name_prefix="Hromadný úkol")}
+    assert states == {"completed"}
+
+
+@pytest.mark.testUpdateTaskState
+def test_update_task_states_by_filter(conn):
+    add_task(conn, "Starý probíhající úkol", "Popis", "in_progress")
+    before = count_tasks_by_state(conn)
+
+    count, missing = update_task_states(conn, "completed", state="in_progress")
+
+    assert count == before["in_progress"] and missing == []
+    assert count_tasks_by_state(conn)["in_progress"] == 0
+
+
+@pytest.mark.testUpdateTaskState
+@pytest.mark.parametrize(
+    "kwargs, error_message",
+    [
+        ({}, "Invalid task selection."),
+        ({"task_ids": [1], "state": "pending"}, "Invalid task selection."),
+        ({"task_ids": ["1"]}, "Invalid task ID."),
+        ({"state": "done"}, "Invalid task state."),
+        ({"task_ids": [1], "chunk_size": 0}, "Invalid chunk size."),
+    ],
+)
+def test_update_task_states_invalid_selection(conn, kwargs, error_message):
+    with pytest.raises(ValueError) as error:
+        update_task_states(conn, "completed", **kwargs)
+    assert str(error.value) == error_message
+
+
+@pytest.mark.testUpdateTaskState
+def test_update_task_state_compare_and_set(conn):
+    task_id = add_task(conn, "Verzovaný úkol", "Popis", "pending")
+    task = get_tasks(conn, name_prefix="Verzovaný úkol")[0]
+    assert task["version"] == 1 and task["updated_at"] is not None
+
+    update_task_state(conn, task_id, "in_progress", expected_version=1)
+    # druhý klient vychází ze staré verze - změna se neprovede
+    with pytest.raises(TaskConflictError) as error:
+        update_task_state(conn, task_id, "completed", expected_version=1)
+    assert error.value.task_ids == [task_id]
+    assert str(error.value) == "Task was modified by another client."
+
+    task = get_tasks(conn, name_prefix="Verzovaný úkol")[0]
+    assert (task["state"], task["version"]) == ("in_progress", 2)
+    with pytest.raises(ValueError) as error:
+        update_task_state(conn, 99999, "completed", expected_version=1)
+    assert str(error.value) == "Invalid task ID."
+
+
+@pytest.mark.testUpdateTaskState
+def test_update_task_states_compare_and_set(conn):
+    first = add_task(conn, "Verzovaná dávka 1", "Popis", "pending")
+    second = add_task(conn, "Verzovaná dávka 2", "Popis", "pending")
+    update_task_state(conn, second, "in_progress")
+
+    with pytest.raises(TaskConflictError) as error:
+        update_task_states(conn, "completed", expected_versions={first: 1, second: 1})
+    assert error.value.task_ids == [second]
+    # konflikt zruší celou transakci, první úkol zůstává beze změny
+    assert get_tasks(conn, name_prefix="Verzovaná dávka")[0]["version"] == 1
+
+    count, missing = update_task_states(
+        conn, "completed", expected_versions={first: 1, second: 2, 99999: 1}, chunk_size=2
+    )
+    assert (count, missing) == (2, [99999])
+    tasks = get_tasks(conn, name_prefix="Verzovaná dávka")
+    assert [(t["state"], t["version"]) for t in tasks] == [("completed", 2), ("completed", 3)]
+
+
+@pytest.mark.testUpdateTaskState
+def test_update_task_state_concurrent_writers(conn):
+    # 8 klientů souběžně čte úkol a mění ho s kontrolou verze; žádná změna
+    # se nesmí ztratit a žádný klient nečeká na zámek
+    pool = create_connection_pool(
+        os.getenv("DB_HOST"),
+        os.getenv("DB_USER"),
+        os.getenv("DB_PASSWORD"),
+        os.getenv("DB_NAME"),
+        pool_size=8,
+        pool_name="task_manager_cas",
+    )
+    task_id = add_task(conn, "Sdílený úkol", "Popis", "pending")
+    start = threading.Barrier(8)
+    successes, conflicts = [], []
+
+    def worker():
+        done = 0
+        start.wait()
+        with pooled_connection(pool) as client:
+            while done < 20:
+                task = get_tasks(client, name_prefix="Sdílený úkol")[0]
+                time.sleep(0.001)
+                new_state = "completed" if task["state"] == "in_progress" else "in_progress"
+                try:
+                    update_task_state(client, task_id, new_state, task["version"])
+                except TaskConflictError:
+                    conflicts.append(task_id)
+                else:
+                    done += 1
+        successes.append(done)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sum(successes) == 8 * 20 and conflicts
+    assert get_tasks(conn, name_prefix="Sdílený úkol")[0]["version"] == 1 + 8 * 20
+
+
 @pytest.mark.testDeleteTask
 def test_delete_task_ok(conn):
     # přidáme úkol ve stavu čekající
@@ -213,6 +558,40 @@ def test_delete_task_ok(conn):
     ), f"Očekáváme, že smazaný úkol nebude v databázi, ale je stále tam je."
 
 
+@pytest.mark.testDeleteTask
+def test_delete_tasks_by_ids_and_filter(conn):
+    add_tasks(
+        conn,
+        [
+            ("Mazaný úkol 1", "Popis", "pending"),
+            ("Mazaný úkol 2", "Popis", "pending"),
+            ("Mazaný úkol 3", "Popis", "completed"),
+        ],
+    )
+    tasks = get_tasks(conn, name_prefix="Mazaný úkol")
+    ids = [task["id"] for task in tasks if task["state"] == "pending"]
+
+    count, missing = delete_tasks(conn, ids + [99999], chunk_size=1)
+    assert count == 2 and missing == [99999]
+
+    count, missing = delete_tasks(conn, state="completed")
+    assert count >= 1 and missing == []
+    assert get_tasks(conn, name_prefix="Mazaný úkol") == []
+
+
+@pytest.mark.testDeleteTask
+def test_delete_task_compare_and_set(conn):
+    task_id = add_task(conn, "Verzovaně mazaný úkol", "Popis", "pending")
+    update_task_state(conn, task_id, "in_progress")
+
+    # klient vychází ze staré verze - úkol se neodstraní
+    with pytest.raises(TaskConflictError) as error:
+        delete_task(conn, task_id, expected_version=1)
+    assert error.value.task_ids == [task_id]
+    delete_task(conn, task_id, expected_version=2)
+    assert get_tasks(conn, name_prefix="Verzovaně mazaný") == []
+
+
 @pytest.mark.testDeleteTask
 def test_delete_task_fail(conn):
     # odstraň neexistující úkol
@@ -222,3 +601,411 @@ def test_delete_task_fail(conn):
     assert (
         str(error.value) == "Invalid task ID."
     ), f"Očekáváme chybovou hlášku 'Invalid task ID.', ale dostali jsme {str(error.value)}"
+
+
+@pytest.mark.testGetTasks
+def test_search_tasks_ranks_matches(conn):
+    add_tasks(
+        conn,
+        [
+            ("Fakturace dodavatelům", "Zaplatit faktury za fakturační období", "pending"),
+            ("Úklid kanceláře", "Vynést krabice od faktur", "pending"),
+            ("Zahrada", "Posekat trávník", "pending"),
+        ],
+    )
+
+    tasks = search_tasks(conn, "faktur")
+
+    names = [task["name"] for task in tasks]
+    assert names[0] == "Fakturace dodavatelům"
+    assert "Úklid kanceláře" in names and "Zahrada" not in names
+    assert search_tasks(conn, "faktur", limit=1) == tasks[:1]
+    assert search_tasks(conn, "faktur krabice")[0]["name"] == "Úklid kanceláře"
+
+
+@pytest.mark.testGetTasks
+@pytest.mark.parametrize(
+    "query, limit, error_message",
+    [("", 20, "Invalid search query."), ("+*", 20, "Invalid search query."), ("úkol", 0, "Invalid limit.")],
+)
+def test_search_tasks_invalid_input(conn, query, limit, error_message):
+    with pytest.raises(ValueError) as error:
+        search_tasks(conn, query, limit)
+    assert str(error.value) == error_message
+
+
+@pytest.mark.testSchema
+def test_migrate_database_is_idempotent(conn):
+    latest = MIGRATIONS[-1][0]
+
+    assert migrate_database(conn) == latest
+    assert migrate_database(conn) == latest
+
+    cursor = conn.cursor()
+    cursor.execute("SELECT version FROM schema_version ORDER BY version")
+    assert [row[0] for row in cursor.fetchall()] == [v for v, _ in MIGRATIONS]
+
+
+@pytest.mark.testSchema
+@pytest.mark.parametrize(
+    "query, params, expected_index",
+    [
+        (
+            "SELECT id, name, description, state, created_at FROM tasks "
+            "ORDER BY created_at ASC, id ASC LIMIT %s",
+            (20,),
+            "idx_tasks_created_at_id",
+        ),
+        (
+            "SELECT id, name, description, state, created_at FROM tasks "
+            "WHERE state = %s ORDER BY created_at ASC LIMIT %s",
+            ("in_progress", 20),
+            "idx_tasks_state_created_at",
+        ),
+        (
+            "SELECT id FROM tasks WHERE MATCH (name, description) "
+            "AGAINST (%s IN BOOLEAN MODE) LIMIT %s",
+            ("+explain*", 20),
+            "idx_tasks_fulltext",
+        ),
+    ],
+)
+def test_hot_queries_use_index(conn, query, params, expected_index):
+    add_tasks(conn, [(f"Úkol pro EXPLAIN {i}", "Popis", "pending") for i in range(50)])
+
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute("ANALYZE TABLE tasks")
+    cursor.fetchall()
+    cursor.execute("EXPLAIN " + query, params)
+    plan = cursor.fetchall()
+
+    assert plan[0]["key"] == expected_index, f"Dotaz nepoužil index: {plan}"
+
+
+@pytest.mark.testPool
+def test_pooled_connection_works_with_crud(pool):
+    with pooled_connection(pool) as connection:
+        add_task(connection, "Úkol přes pool", "Popis přes pool", "pending")
+        assert any(task["name"] == "Úkol přes pool" for task in get_tasks(connection))
+
+
+@pytest.mark.testPool
+def test_pooled_connection_is_returned_to_pool(pool):
+    # pool má jediné připojení, druhé zapůjčení projde jen po vrácení prvního
+    with pooled_connection(pool) as connection:
+        first_id = connection.connection_id
+    with pooled_connection(pool) as connection:
+        assert connection.connection_id == first_id
+
+
+@pytest.mark.testPool
+def test_pooled_connection_exhausted(pool):
+    with pooled_connection(pool):
+        with pytest.raises(PoolExhaustedError):
+            with pooled_connection(pool, timeout=0):
+                pass
+
+
+@pytest.mark.testPool
+def test_pooled_connection_reconnects_after_disconnect(pool):
+    with pooled_connection(pool) as connection:
+        connection.cmd_quit()  # simulace spadlého připojení
+
+    with pooled_connection(pool) as connection:
+        assert connection.is_connected()
+
+
+@pytest.mark.testCache
+def test_task_cache_serves_repeated_reads_and_stays_consistent(conn):
+    cache = enable_task_cache()
+    try:
+        add_task(conn, "Úkol v cache", "Popis úkolu v cache", "pending")
+        tasks = get_tasks(conn)
+        counts = count_tasks_by_state(conn)
+        assert get_tasks(conn) == tasks
+        assert cache.stats()["hits"] == 1
+
+        task_id = tasks[-1]["id"]
+        update_task_state(conn, task_id, "completed")
+        assert get_tasks(conn)[-1]["state"] == "completed"
+        assert count_tasks_by_state(conn)["completed"] == counts["completed"] + 1
+
+        delete_task(conn, task_id)
+        assert task_id not in [task["id"] for task in get_tasks(conn)]
+    finally:
+        disable_task_cache()
+
+    # bez cache musí databáze vracet totéž, co vracela cache
+    assert task_id not in [task["id"] for task in get_tasks(conn)]
+
+
+@pytest.mark.testStatements
+def test_prepared_statements_are_reused(conn):
+    add_task(conn, "Připravený úkol 1", "Popis", "pending")
+    inserts = [entry for query, entry in _statements[conn].items() if query.startswith("INSERT")]
+    assert len(inserts) == 1
+    cursor = inserts[0][0]
+
+    # další volání použije stejný připravený kurzor, nový se nevytváří
+    add_task(conn, "Připravený úkol 2", "Popis", "pending")
+    inserts = [entry for query, entry in _statements[conn].items() if query.startswith("INSERT")]
+    assert len(inserts) == 1 and inserts[0][0] is cursor
+    assert [task["name"] for task in get_tasks(conn, name_prefix="Připravený")] == [
+        "Připravený úkol 1",
+        "Připravený úkol 2",
+    ]
+
+
+@pytest.mark.testStatements
+def test_close_connection_closes_prepared_statements(conn):
+    connection = connect_to_database(
+        os.getenv("DB_HOST"), os.getenv("DB_USER"), os.getenv("DB_PASSWORD"), os.getenv("DB_NAME")
+    )
+    count_tasks_by_state(connection)
+    assert len(_statements[connection]) == 1
+
+    close_connection(connection)
+    assert connection not in _statements
+
+
+@pytest.mark.testChanges
+def test_get_changes_since_returns_delta(conn):
+    conn.rollback()  # čtecí snímek po předchozích testech
+    token = get_changes_since(conn)["token"]
+    first = add_task(conn, "Změna 1", "Popis", "pending")
+    second = add_task(conn, "Změna 2", "Popis", "pending")
+    update_task_state(conn, first, "completed")
+    delete_task(conn, second)
+    delete_tasks(conn, [99999])
+    added = add_tasks(conn, [("Změna 3", "Popis", "pending"), ("Změna 4", "Popis", "pending")])
+    assert added == (2, [])
+
+    time.sleep(CHANGE_SETTLE_TIME)
+    changes = get_changes_since(conn, token)
+    assert [(t["name"], t["state"]) for t in changes["updated"]] == [
+        ("Změna 1", "completed"),
+        ("Změna 3", "pending"),
+        ("Změna 4", "pending"),
+    ]
+    assert changes["updated"][0]["id"] == first
+    assert changes["deleted"] == [second] and not changes["has_more"]
+    assert get_changes_since(conn, changes["token"])["updated"] == []
+
+
+@pytest.mark.testChanges
+def test_add_tasks_logs_actual_ids(conn):
+    # s krokem AUTO_INCREMENT > 1 (Galera, více primárních serverů) nejdou
+    # ID hromadně vložených úkolů po sobě, log musí obsahovat skutečná ID
+    cursor = conn.cursor()
+    cursor.execute("SET SESSION auto_increment_increment = 3")
+    conn.rollback()
+    token = get_changes_since(conn)["token"]
+    try:
+        add_tasks(conn, [(f"Krok {i}", "Popis", "pending") for i in range(4)])
+    finally:
+        cursor.execute("SET SESSION auto_increment_increment = 1")
+        cursor.close()
+
+    ids = [task["id"] for task in get_tasks(conn, name_prefix="Krok")]
+    time.sleep(CHANGE_SETTLE_TIME)
+    changes = get_changes_since(conn, token)
+    assert [task["id"] for task in changes["updated"]] == ids
+    assert ids[1] - ids[0] == 3
+
+
+@pytest.mark.testChanges
+def test_get_changes_since_keeps_open_transaction(conn):
+    # log se nečte v cizí transakci, rozepsaný zápis se nesmí potvrdit
+    conn.rollback()
+    token = get_changes_since(conn)["token"]
+    cursor = conn.cursor()
+    cursor.execute("INSERT INTO tasks (name, description) VALUES ('Rozepsaný', 'Popis')")
+    cursor.close()
+    with pytest.raises(RuntimeError, match="Cannot read changes inside an open transaction."):
+        get_changes_since(conn, token)
+    conn.rollback()
+    assert get_tasks(conn, name_prefix="Rozepsaný") == []
+
+
+@pytest.mark.testChanges
+def test_get_changes_since_concurrent_writers(conn):
+    # čtenář se dotazuje během souběžných zápisů; po skončení zápisů musí mít
+    # všechny vložené úkoly, i když se transakce potvrzovaly v jiném pořadí
+    pool = create_connection_pool(
+        os.getenv("DB_HOST"),
+        os.getenv("DB_USER"),
+        os.getenv("DB_PASSWORD"),
+        os.getenv("DB_NAME"),
+        pool_size=4,
+        pool_name="task_manager_changes",
+    )
+    conn.rollback()
+    token = get_changes_since(conn)["token"]
+    inserted, seen = [], set()
+
+    def writer(number):
+        with pooled_connection(pool) as client:
+            for i in range(25):
+                inserted.append(add_task(client, f"Feed {number}-{i}", "Popis", "pending"))
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    while any(thread.is_alive() for thread in threads):
+        changes = get_changes_since(conn, token, limit=10)
+        seen.update(task["id"] for task in changes["updated"])
+        token = changes["token"]
+    time.sleep(CHANGE_SETTLE_TIME)
+    while True:
+        changes = get_changes_since(conn, token, limit=10)
+        seen.update(task["id"] for task in changes["updated"])
+        token = changes["token"]
+        if not changes["has_more"]:
+            break
+
+    assert set(inserted) <= seen
+
+
+@pytest.mark.testArchive
+def test_archive_completed_tasks(conn):
+    done = add_task(conn, "Archiv 1", "Popis", "completed")
+    kept = add_task(conn, "Archiv 2", "Popis", "pending")
+    conn.rollback()
+    token = get_changes_since(conn)["token"]
+    tomorrow = datetime.datetime.now() + datetime.timedelta(days=1)
+
+    assert archive_completed_tasks(conn, tomorrow, chunk_size=1) >= 1
+    assert [task["id"] for task in get_tasks(conn, name_prefix="Archiv")] == [kept]
+    tasks = get_tasks(conn, name_prefix="Archiv", include_archived=True)
+    assert [(task["id"], task["state"]) for task in tasks] == [
+        (done, "completed"),
+        (kept, "pending"),
+    ]
+    conn.rollback()
+    time.sleep(CHANGE_SETTLE_TIME)
+    assert done in get_changes_since(conn, token)["deleted"]
+
+
+@pytest.mark.testWriteBehind
+def test_write_behind_group_commit(conn):
+    # zapisovač dostane vlastní připojení, kontrola čte přes conn
+    writer_conn = connect_to_database(
+        os.getenv("DB_HOST"), os.getenv("DB_USER"), os.getenv("DB_PASSWORD"), os.getenv("DB_NAME")
+    )
+    writer = enable_write_behind(writer_conn, batch_size=50, flush_interval=0.05)
+    futures = [queue_add_task(writer_conn, f"Fronta {i}", "Popis", "pending") for i in range(100)]
+    flush_writes(writer_conn)
+    ids = [future.result() for future in futures]
+    assert writer.batches < len(ids)
+
+    missing = queue_update_task_state(writer_conn, 999999, "completed")
+    queue_update_task_state(writer_conn, ids[0], "completed")
+    close_connection(writer_conn)  # dopíše zbývající zápisy
+    with pytest.raises(ValueError):
+        missing.result()
+
+    conn.commit()  # nový snímek dat pro čtení přes conn
+    names = {task["id"]: task for task in get_tasks(conn, name_prefix="Fronta")}
+    assert set(names) == set(ids)
+    assert names[ids[0]]["state"] == "completed" and names[ids[0]]["version"] == 2
+
+
+@pytest.mark.testTenants
+def test_tenant_listing_reads_only_own_rows(conn):
+    # počet řádků přečtených serverem (Handler_read_*) pro výpis jednoho
+    # vlastníka nezávisí na tom, kolik úkolů mají ostatní vlastníci
+    add_tasks(conn, [(f"Úkol nájemce {i}", "Popis", "pending") for i in range(20)], owner="a")
+    add_tasks(conn, [("Cizí úkol", "Popis", "pending")] * 100, owner="b")
+    cursor = conn.cursor()
+
+    def handler_reads():
+        cursor.execute("SHOW SESSION STATUS LIKE 'Handler_read%'")
+        return sum(int(value) for _, value in cursor.fetchall())
+
+    def listing_reads():
+        cursor.execute("ANALYZE TABLE tasks")
+        cursor.fetchall()
+        start = handler_reads()
+        assert len(get_tasks(conn, owner="a")) == 20
+        get_tasks_page(conn, limit=10, owner="a")
+        assert count_tasks_by_state(conn, owner="a")["pending"] == 20
+        return handler_reads() - start
+
+    before = listing_reads()
+    add_tasks(conn, [("Cizí úkol", "Popis", "pending")] * 5000, owner="b")
+    assert listing_reads() == before
+    cursor.close()
+
+
+@pytest.mark.testReconnect
+def test_read_reconnects_after_connection_is_killed(conn):
+    add_task(conn, "Úkol po výpadku", "Popis", "pending")
+    conn.commit()
+    killer = connect_to_database(
+        os.getenv("DB_HOST"), os.getenv("DB_USER"), os.getenv("DB_PASSWORD"), os.getenv("DB_NAME")
+    )
+    old_id = conn.connection_id
+    cursor = killer.cursor()
+    cursor.execute(f"KILL {old_id}")  # simulace spadlého spojení (např. wait_timeout)
+    cursor.close()
+    close_connection(killer)
+
+    # čtení spojení obnoví a zopakuje se, připravené dotazy se připraví znovu
+    assert get_tasks(conn, name_prefix="Úkol po výpadku")[0]["name"] == "Úkol po výpadku"
+    assert conn.connection_id != old_id
+
+
+@pytest.mark.testReconnect
+def test_write_on_killed_connection_reports_unreachable_server(conn):
+    killer = connect_to_database(
+        os.getenv("DB_HOST"), os.getenv("DB_USER"), os.getenv("DB_PASSWORD"), os.getenv("DB_NAME")
+    )
+    cursor = killer.cursor()
+    cursor.execute(f"KILL {conn.connection_id}")
+    cursor.close()
+    close_connection(killer)
+
+    # zápis se neopakuje a neúspěšný rollback nezakryje původní chybu
+    with pytest.raises(ServerUnreachableError):
+        add_task(conn, "Zápis po výpadku", "Popis", "pending")
+    assert get_tasks(conn, name_prefix="Zápis po výpadku") == []
+
+
+@pytest.mark.testWriteBehind
+def test_write_behind_reconnects_after_connection_is_killed(conn):
+    writer_conn = connect_to_database(
+        os.getenv("DB_HOST"), os.getenv("DB_USER"), os.getenv("DB_PASSWORD"), os.getenv("DB_NAME")
+    )
+    enable_write_behind(writer_conn, flush_interval=0)
+    queue_add_task(writer_conn, "Před výpadkem", "Popis", "pending").result()
+    cursor = conn.cursor()
+    cursor.execute(f"KILL {writer_conn.connection_id}")
+    cursor.close()
+
+    # dávka na spadlém spojení selže, další už jde přes obnovené spojení
+    with pytest.raises(ServerUnreachableError):
+        queue_add_task(writer_conn, "Při výpadku", "Popis", "pending").result()
+    task_id = queue_add_task(writer_conn, "Po výpadku", "Popis", "pending").result()
+    close_connection(writer_conn)
+
+    conn.commit()
+    assert get_tasks(conn, name_prefix="Po výpadku")[0]["id"] == task_id
+
+
+@pytest.mark.testReconnect
+def test_missing_schema_and_unreachable_server_are_distinguished(conn):
+    assert check_schema(conn) == MIGRATIONS[-1][0]
+    with pytest.raises(SchemaMissingError):
+        connect_to_database(
+            os.getenv("DB_HOST"),
+            os.getenv("DB_USER"),
+            os.getenv("DB_PASSWORD"),
+            os.getenv("DB_NAME") + "_chybi",
+        )
+
+
+@pytest.mark.testReconnect
+def test_unreachable_server():
+    # neexistující hostitel, test nepotřebuje běžící MySQL
+    with pytest.raises(ServerUnreachableError):
+        connect_to_database("server.invalid", "user", "heslo", "task_manager", connect_timeout=1)
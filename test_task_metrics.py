@@ -0,0 +1,133 @@
+from src import task_manager_db
+from src.task_manager_db import (
+    add_task,
+    close_connection,
+    connect_to_database,
+    disable_metrics,
+    enable_metrics,
+    get_tasks,
+    update_task_state,
+)
+from src.task_metrics import Histogram, TaskMetrics, redact
+import json
+import logging
+import pytest
+
+
+@pytest.fixture
+def metrics():
+    yield enable_metrics(slow_query_ms=0)
+    disable_metrics()
+
+
+@pytest.fixture
+def memory_conn():
+    conn = connect_to_database(None, None, None, None, backend="memory")
+    yield conn
+    close_connection(conn)
+
+
+class FakeCursor:
+    def execute(self, query, params):
+        pass
+
+
+def test_operations_record_calls_rows_and_errors(metrics, memory_conn):
+    for i in range(3):
+        add_task(memory_conn, f"Úkol {i}", "Popis", "pending")
+    assert len(get_tasks(memory_conn)) == 3
+    with pytest.raises(ValueError):
+        update_task_state(memory_conn, 99, "completed")
+
+    snapshot = metrics.snapshot()
+    assert snapshot["add_task"]["calls"] == 3
+    assert snapshot["get_tasks"]["rows"] == 3
+    assert snapshot["update_task_state"]["errors"] == 1
+    assert snapshot["get_tasks"]["latency_buckets"]["+Inf"] == 1
+
+
+def test_queries_count_as_round_trips_of_current_operation(metrics):
+    with metrics.collect() as calls:
+        with metrics.operation("update_task_states") as call:
+            task_manager_db._run(FakeCursor(), "UPDATE tasks SET state = %s", ("completed",))
+            task_manager_db._run(FakeCursor(), "SELECT id FROM tasks", ())
+            # vnořené volání se počítá do vnější operace
+            with metrics.operation("delete_task"):
+                task_manager_db._run(FakeCursor(), "DELETE FROM tasks", ())
+
+    assert [(c.operation, c.round_trips) for c in calls] == [("update_task_states", 3)]
+    assert call.round_trips == 3
+    assert metrics.snapshot()["update_task_states"]["queries"] == 3
+
+
+def test_nested_call_does_not_overwrite_outer_call(metrics):
+    with metrics.operation("sync_replica") as call:
+        call.rows = 5
+        # vnější funkce chybu vnořeného volání zachytí a pokračuje
+        with pytest.raises(ValueError):
+            with metrics.operation("delete_task") as nested:
+                nested.rows = 1
+                raise ValueError("Invalid task ID.")
+
+    snapshot = metrics.snapshot()
+    assert list(snapshot) == ["sync_replica"]
+    assert snapshot["sync_replica"]["rows"] == 5 and snapshot["sync_replica"]["errors"] == 0
+    assert nested.error and not call.error
+
+
+def test_slow_query_log_redacts_params(metrics, caplog):
+    with caplog.at_level(logging.WARNING, logger="task_manager.slow_query"):
+        with metrics.operation("get_tasks"):
+            task_manager_db._run(
+                FakeCursor(), "SELECT * FROM tasks\n    WHERE name = %s", ("Tajný úkol", 7)
+            )
+
+    assert "Tajný" not in caplog.text
+    assert "slow query in get_tasks" in caplog.text
+    assert "SELECT * FROM tasks WHERE name = %s; params: (str, int)" in caplog.text
+    assert metrics.snapshot()["get_tasks"]["slow_queries"] == 1
+
+
+def test_fast_queries_are_not_logged(caplog):
+    metrics = TaskMetrics(slow_query_ms=1000)
+    with caplog.at_level(logging.WARNING, logger="task_manager.slow_query"):
+        metrics.record_query("SELECT 1", (), 0.001, "iter_tasks")
+
+    assert caplog.text == ""
+    assert metrics.snapshot()["iter_tasks"]["round_trips"] == 1
+
+
+def test_prometheus_and_json_export():
+    metrics = TaskMetrics()
+    with metrics.operation("get_tasks_page") as call:
+        call.rows = 20
+    metrics.record_query("COMMIT", (), 0.002, "add_task")
+
+    text = metrics.to_prometheus()
+    assert "# TYPE task_db_operation_seconds histogram" in text
+    assert 'task_db_operation_seconds_bucket{operation="get_tasks_page",le="+Inf"} 1' in text
+    assert 'task_db_query_seconds_bucket{operation="add_task",le="0.0025"} 1' in text
+    assert 'task_db_rows_total{operation="get_tasks_page"} 20' in text
+    assert 'task_db_round_trips_total{operation="add_task"} 1' in text
+    assert json.loads(metrics.to_json())["get_tasks_page"]["rows"] == 20
+
+
+def test_histogram_quantile():
+    histogram = Histogram()
+    for seconds in (0.0004, 0.003, 0.003, 0.2, 10.0):
+        histogram.observe(seconds)
+
+    assert histogram.quantile(0.5) == 0.005
+    assert histogram.quantile(0.99) == 5.0
+    assert histogram.cumulative()[-1] == (float("inf"), 5)
+
+
+def test_redact():
+    assert redact(()) == "()"
+    assert redact(["Název", None]) == "(str, NoneType)"
+    assert redact([("a", "b", "pending")] * 3) == "3 rows"
+
+
+def test_invalid_threshold():
+    with pytest.raises(ValueError):
+        TaskMetrics(slow_query_ms=-1)
@@ -0,0 +1,201 @@
+from src import task_manager_db
+from src.task_manager_db import (
+    add_task,
+    close_connection,
+    connect_to_database,
+    count_tasks_by_state,
+    delete_task,
+    get_tasks,
+    open_replica,
+    purge_changes,
+    search_tasks,
+    sync_replica,
+    update_task_state,
+)
+import datetime
+import sqlite3
+import pytest
+
+
+@pytest.fixture
+def server(tmp_path):
+    # "server" je úložiště SQLite, replika s ním mluví stejnými funkcemi jako s MySQL
+    conn = connect_to_database(None, None, None, str(tmp_path / "server.db"), backend="sqlite")
+    yield conn
+    close_connection(conn)
+
+
+@pytest.fixture
+def replica(tmp_path):
+    replica = open_replica(str(tmp_path / "replika.db"), owner="jan")
+    yield replica
+    close_connection(replica)
+
+
+def tasks_of(connection, **filters):
+    tasks = get_tasks(connection, **filters)
+    return [(task["id"], task["name"], task["state"]) for task in tasks]
+
+
+def raw_update(server, sql, *params):
+    # zápis jiného klienta přímo do databáze serveru (mimo task_manager_db)
+    raw = sqlite3.connect(server.path)
+    raw.execute(sql, params)
+    raw.commit()
+    raw.close()
+
+
+def test_replica_reads_locally_and_pushes_journal(server, replica):
+    first = add_task(server, "První", "Popis", "pending", owner="jan")
+    add_task(server, "Cizí", "Popis", "pending", owner="eva")
+    second = add_task(server, "Druhý", "Popis", "pending", owner="jan")
+
+    assert sync_replica(replica, server) == {
+        "pulled": 2,
+        "pushed": 0,
+        "conflicts": 0,
+        "pending": 0,
+    }
+    assert tasks_of(replica) == [(first, "První", "pending"), (second, "Druhý", "pending")]
+    assert [task["name"] for task in search_tasks(replica, "prv")] == ["První"]
+
+    # zápisy offline jdou do žurnálu, server je uvidí až po synchronizaci
+    third = add_task(replica, "Třetí", "Popis", "pending", owner="jan")
+    update_task_state(replica, first, "completed", owner="jan")
+    delete_task(replica, second, owner="jan")
+    counts = count_tasks_by_state(replica, "jan")
+    assert counts == {"pending": 1, "in_progress": 0, "completed": 1}
+    assert tasks_of(server, owner="jan")[0] == (first, "První", "pending")
+
+    result = sync_replica(replica, server)
+    assert result["pushed"] == 3 and result["pending"] == 0 and result["conflicts"] == 0
+    assert tasks_of(server, owner="jan") == tasks_of(replica)
+    assert [name for _, name, _ in tasks_of(server, owner="jan")] == ["První", "Třetí"]
+    assert third in [task_id for task_id, _, _ in tasks_of(replica)]
+
+
+def test_sync_transfers_only_deltas(server, replica):
+    ids = [add_task(server, f"Úkol {i}", "Popis", "pending", owner="jan") for i in range(50)]
+    assert sync_replica(replica, server)["pulled"] == 50
+
+    update_task_state(server, ids[7], "in_progress")
+    delete_task(server, ids[8])
+    assert sync_replica(replica, server)["pulled"] == 2
+    assert sync_replica(replica, server)["pulled"] == 0
+    tasks = get_tasks(replica)
+    assert len(tasks) == 49 and tasks[7]["state"] == "in_progress"
+
+
+def test_conflicts_resolved_by_server_version(server, replica):
+    early = add_task(server, "Dříve na serveru", "Popis", "pending", owner="jan")
+    late = add_task(server, "Později na serveru", "Popis", "pending", owner="jan")
+    kept = add_task(server, "Beze změny na serveru", "Popis", "pending", owner="jan")
+    sync_replica(replica, server)
+
+    update_task_state(replica, early, "completed")
+    delete_task(replica, late)
+    update_task_state(replica, kept, "completed")
+    # dva úkoly mezitím změnil jiný klient; o výsledku rozhoduje verze na
+    # serveru, ne čas změny (hodiny klienta i serveru se mohou lišit)
+    for task_id, updated_at in ((early, "2000-01-01 00:00:00"), (late, "2999-01-01 00:00:00")):
+        raw_update(
+            server,
+            "UPDATE tasks SET state = 'in_progress', version = version + 1, updated_at = ? "
+            "WHERE id = ?",
+            updated_at,
+            task_id,
+        )
+
+    result = sync_replica(replica, server)
+    assert result["conflicts"] == 2 and result["pushed"] == 1 and result["pending"] == 0
+    assert tasks_of(server) == tasks_of(replica)
+    states = [state for _, _, state in tasks_of(replica)]
+    assert states == ["in_progress", "in_progress", "completed"]
+
+
+def test_offline_delete_checks_server_version(server, replica, monkeypatch):
+    task_id = add_task(server, "Úkol", "Popis", "pending", owner="jan")
+    sync_replica(replica, server)
+    delete_task(replica, task_id)
+
+    # úkol se na serveru změní až po stažení změn, těsně před odesláním smazání
+    pull = task_manager_db._pull_changes
+
+    def pull_then_update(*args):
+        result = pull(*args)
+        update_task_state(server, task_id, "completed")
+        return result
+
+    monkeypatch.setattr(task_manager_db, "_pull_changes", pull_then_update)
+    assert sync_replica(replica, server)["pending"] == 1
+    monkeypatch.undo()
+    assert tasks_of(server) == [(task_id, "Úkol", "completed")]
+
+    # příští synchronizace vrátí do repliky změnu ze serveru
+    assert sync_replica(replica, server)["conflicts"] == 1
+    assert tasks_of(replica) == tasks_of(server)
+
+
+def test_server_delete_wins_over_offline_change(server, replica):
+    task_id = add_task(server, "Úkol", "Popis", "pending", owner="jan")
+    sync_replica(replica, server)
+    update_task_state(replica, task_id, "completed")
+    delete_task(server, task_id)
+
+    assert sync_replica(replica, server)["pending"] == 0
+    assert get_tasks(replica) == get_tasks(server) == []
+
+
+def test_offline_task_gets_server_id(server, replica):
+    add_task(server, "Na serveru", "Popis", "pending", owner="jan")
+    sync_replica(replica, server)
+    offline = add_task(replica, "Offline", "Popis", "pending", owner="jan")
+    # jiný klient mezitím na serveru obsadil stejné ID
+    assert add_task(server, "Jiný klient", "Popis", "pending", owner="jan") == offline
+
+    assert sync_replica(replica, server)["pushed"] == 1
+    names = [(task_id, name) for task_id, name, _ in tasks_of(server)]
+    assert names[:2] == [(1, "Na serveru"), (2, "Jiný klient")]
+    assert names[2][1] == "Offline" and names[2][0] > offline
+    assert tasks_of(replica) == tasks_of(server)
+
+
+def test_expired_token_reloads_replica(server, replica):
+    kept = add_task(server, "Zůstane", "Popis", "pending", owner="jan")
+    removed = add_task(server, "Zmizí", "Popis", "pending", owner="jan")
+    sync_replica(replica, server)
+    delete_task(server, removed)
+    purge_changes(server, datetime.datetime.now() + datetime.timedelta(days=1))
+
+    sync_replica(replica, server)
+    assert [task["id"] for task in get_tasks(replica)] == [kept]
+
+
+def test_replica_belongs_to_one_owner(server, tmp_path):
+    path = str(tmp_path / "vlastnik.db")
+    replica = open_replica(path, owner="jan")
+    sync_replica(replica, server)
+    close_connection(replica)
+
+    with pytest.raises(ValueError, match="Replica belongs to another owner."):
+        open_replica(path, owner="eva")
+    with pytest.raises(ValueError, match="Invalid task owner."):
+        open_replica(path, owner="x" * 51)
+
+
+@pytest.mark.testReplica
+def test_replica_sync_with_mysql(conn, tmp_path):
+    replica = open_replica(str(tmp_path / "replika.db"), owner="replika")
+    server_id = add_task(conn, "Na serveru", "Popis", "pending", owner="replika")
+    conn.rollback()  # synchronizace nesmí začít v otevřené transakci
+    sync_replica(replica, conn)
+    add_task(replica, "Offline", "Popis", "pending", owner="replika")
+    update_task_state(replica, server_id, "completed", owner="replika")
+
+    assert sync_replica(replica, conn)["pushed"] == 2
+    assert tasks_of(conn, owner="replika") == tasks_of(replica)
+    assert [(name, state) for _, name, state in tasks_of(replica)] == [
+        ("Na serveru", "completed"),
+        ("Offline", "pending"),
+    ]
+    close_connection(replica)
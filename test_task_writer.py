@@ -0,0 +1,107 @@
+from src.task_writer import TaskWriter
+import threading
+import pytest
+
+
+class RecordingBatches:
+    # zapisuje "dávky" do seznamu; volitelně čeká na uvolnění (pomalý COMMIT)
+    def __init__(self):
+        self.batches = []
+        self.release = threading.Event()
+        self.release.set()
+
+    def __call__(self, writes):
+        self.release.wait()
+        self.batches.append([args for _, args in writes])
+        return [ValueError("Invalid task ID.") if args < 0 else args * 10 for _, args in writes]
+
+
+def test_writes_are_grouped_into_batches():
+    batches = RecordingBatches()
+    batches.release.clear()  # první dávka se zdrží, další zápisy se mezitím sejdou
+    writer = TaskWriter(batches, batch_size=4, flush_interval=0)
+    futures = [writer.submit("insert", i) for i in range(9)]
+    batches.release.set()
+    writer.flush(timeout=5)
+
+    assert [future.result() for future in futures] == [i * 10 for i in range(9)]
+    assert sum(batches.batches, []) == list(range(9))
+    assert max(len(batch) for batch in batches.batches) == 4
+    assert writer.written == 9 and writer.batches == len(batches.batches)
+    writer.close()
+
+
+def test_time_threshold_writes_partial_batch():
+    batches = RecordingBatches()
+    writer = TaskWriter(batches, batch_size=100, flush_interval=0.01)
+    assert writer.submit("insert", 1).result(timeout=5) == 10
+    assert batches.batches == [[1]]
+    writer.close()
+
+
+def test_back_pressure_when_queue_is_full():
+    batches = RecordingBatches()
+    batches.release.clear()
+    writer = TaskWriter(batches, max_pending=1, batch_size=1, flush_interval=0)
+    writer.submit("insert", 1)  # vlákno ho vezme a čeká na COMMIT
+    writer.submit("insert", 2)  # počká, až vlákno vezme první, a zaplní frontu
+    with pytest.raises(RuntimeError) as error:
+        writer.submit("insert", 3, timeout=0.05)
+    assert str(error.value) == "Write-behind queue is full."
+    batches.release.set()
+    writer.close()
+
+
+def test_waiting_producer_does_not_block_others():
+    batches = RecordingBatches()
+    batches.release.clear()
+    writer = TaskWriter(batches, max_pending=1, batch_size=1, flush_interval=0)
+    writer.submit("insert", 1)
+    writer.submit("insert", 2)
+    # producent bez timeout čeká na místo ve frontě
+    waiting = threading.Thread(target=writer.submit, args=("insert", 3))
+    waiting.start()
+    with pytest.raises(RuntimeError) as error:
+        writer.submit("insert", 4, timeout=0.05)
+    assert str(error.value) == "Write-behind queue is full."
+    with pytest.raises(TimeoutError):
+        writer.flush(timeout=0.05)  # značka se zařadí i do plné fronty
+    batches.release.set()
+    waiting.join(timeout=5)
+    writer.close()
+    assert sum(batches.batches, []) == [1, 2, 3]
+
+
+def test_flush_reports_failed_write_once():
+    writer = TaskWriter(RecordingBatches())
+    failed = writer.submit("update", -1)
+    with pytest.raises(ValueError):
+        writer.flush(timeout=5)
+    writer.flush(timeout=5)
+    assert str(failed.exception()) == "Invalid task ID."
+    writer.close()
+
+
+def test_failed_transaction_fails_whole_batch():
+    def broken(writes):
+        raise ConnectionError("Database connection failed.")
+
+    writer = TaskWriter(broken, flush_interval=0.05)
+    futures = [writer.submit("insert", i) for i in range(3)]
+    writer.close()
+    assert all(isinstance(future.exception(), ConnectionError) for future in futures)
+
+
+def test_close_drains_queue_and_rejects_new_writes():
+    batches = RecordingBatches()
+    writer = TaskWriter(batches, flush_interval=60)
+    future = writer.submit("insert", 1)
+    writer.close()
+    assert future.result(timeout=0) == 10
+    with pytest.raises(RuntimeError):
+        writer.submit("insert", 2)
+
+
+def test_invalid_settings():
+    with pytest.raises(ValueError):
+        TaskWriter(RecordingBatches(), max_pending=0)